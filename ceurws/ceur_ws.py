@@ -1,21 +1,32 @@
 import calendar
 import datetime
 import re
-from typing import Optional
-from urllib.request import Request, urlopen
+import time
+from collections.abc import Container, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Optional
+from urllib.error import URLError
 
 import dateutil.parser
 from bs4 import BeautifulSoup
-from geograpy.locator import City, Country, Location, LocationContext, Region
 from lodentity.entity import EntityManager
 from lodentity.jsonable import JSONAble, JSONAbleList
 
 from ceurws.config import CEURWS
+from ceurws.entity_upsert import EntityUpsertMixin
 from ceurws.indexparser import IndexHtmlParser, ParserConfig
 from ceurws.loctime import LoctimeParser
+from ceurws.loctime_cache import LoctimeCache
 from ceurws.papertocparser import PaperTocParser
+from ceurws.resources import get_geograpy_locator, get_location_context, get_loctime_parser
 from ceurws.utils.download import Download
-from ceurws.volumeparser import VolumeParser
+from ceurws.utils.webscrape import RetryPolicy, WebScrape
+from ceurws.volume_fingerprint import VolumeFingerprints
+from ceurws.volume_pipeline import FailedVolumes, VolumePageFetcher
+from ceurws.volumeparser import VolumePageCache, VolumeParser
+
+if TYPE_CHECKING:
+    from geograpy.locator import Location
 
 
 class Volume(JSONAble):
@@ -172,31 +183,64 @@ class Volume(JSONAble):
             loctime = None
         return loctime
 
-    def resolveLoctime(self):
+    def resolveLoctime(self, loctime_cache: LoctimeCache | None = None):
         """
         Resolve the loctime property by breaking it down to city, region, country, dateFrom, and dateTo
+
+        Args:
+            loctime_cache(LoctimeCache): optional cache of already resolved loctimes
         """
         loctime = self.get_loctime()
         if loctime is None:
             return None
+        values = loctime_cache.get(loctime) if loctime_cache is not None else None
+        if values is None:
+            values = self.resolveLoctimeValues(loctime)
+            if loctime_cache is not None:
+                loctime_cache.put(loctime, values)
+        for key, value in values.items():
+            setattr(self, key, value)
+
+    def resolveLoctimeValues(self, loctime: str) -> dict:
+        """
+        get the values resolved from the given loctime without setting them
+
+        Args:
+            loctime: the loctime to resolve
+
+        Returns:
+            dict: the resolved values e.g. dateFrom, dateTo, city and countryWikidataId
+        """
+        values = {}
         dateFrom, dateTo = self.extractDates(loctime)
         if dateFrom is not None:
-            self.dateFrom = dateFrom
+            values["dateFrom"] = dateFrom
         if dateTo is not None:
-            self.dateTo = dateTo
-        self.extractAndSetLocation(locationStr=loctime)
+            values["dateTo"] = dateTo
+        values.update(self.extractLocation(locationStr=loctime))
+        return values
 
     def extractAndSetLocation(self, locationStr: str):
+        """
+        Extracts the location from the given string and sets the found city and country
+        Args:
+            locationStr: string to extract the locations from
+        """
+        for key, value in self.extractLocation(locationStr).items():
+            setattr(self, key, value)
+
+    def extractLocation(self, locationStr: str) -> dict:
         """
         Extracts the location from the given string and returns the found city and country
         ToDo: Once the EventReferenceParser from cc is updated to support city country combinations switch to it
         Args:
             locationStr: string to extract the locations from
+
+        Returns:
+            dict: the found city, country, their wikidata ids and the virtualEvent flag
         """
-        parser = self.__class__.__dict__.get("locationparser")
-        if parser is None:
-            parser = LocationContext.fromCache()
-            self.__class__.locationparser = parser
+        parser = get_location_context()
+        locator = get_geograpy_locator()
         locationStr = self.removePartsMatching(locationStr, pattern=r"\d")
         for month in calendar.month_name:
             if month == "":
@@ -210,23 +254,25 @@ class Volume(JSONAble):
         countryWikidataId = None
         if locations is not None and len(locations) > 0:
             bestMatch = locations[0]
-            if isinstance(bestMatch, City):
+            if isinstance(bestMatch, locator.City):
                 city = bestMatch.name
                 cityWikidataId = bestMatch.wikidataid
                 country = bestMatch.country.name
                 countryWikidataId = bestMatch.country.wikidataid
-            elif isinstance(bestMatch, Country):
+            elif isinstance(bestMatch, locator.Country):
                 country = bestMatch.wikidataid
+        values: dict = {}
         virtualEventKeywords = ["virtual", "online"]
         for keyword in virtualEventKeywords:
             if keyword in locationStr.lower():
-                self.virtualEvent = True
+                values["virtualEvent"] = True
         if city is not None:
-            self.city = city
-            self.cityWikidataId = cityWikidataId
+            values["city"] = city
+            values["cityWikidataId"] = cityWikidataId
         if countryWikidataId is not None:
-            self.country = country
-            self.countryWikidataId = countryWikidataId
+            values["country"] = country
+            values["countryWikidataId"] = countryWikidataId
+        return values
 
     def extractDates(
         self, dateStr: str, durationThreshold: int = 11
@@ -306,25 +352,26 @@ class Volume(JSONAble):
         return resValue
 
     @staticmethod
-    def rankLocations(locationStr: str, locations: list[Location]):
+    def rankLocations(locationStr: str, locations: list["Location"]):
         """
         rank the given locations to find the best match to the given location string
         Args:
             locationStr: location string
             locations: list of locations objects
         """
+        locator = get_geograpy_locator()
         rankedLocations = []
         for location in locations:
             locationsToCheck = []
-            if isinstance(location, City):
+            if isinstance(location, locator.City):
                 locationsToCheck = [
                     location,
                     location.region,
                     location.country,
                 ]
-            elif isinstance(location, Region):
+            elif isinstance(location, locator.Region):
                 locationsToCheck = [location, location.country]
-            elif isinstance(location, Country):
+            elif isinstance(location, locator.Country):
                 locationsToCheck = [location]
             score = 0
             for ltc in locationsToCheck:
@@ -360,19 +407,49 @@ class Volume(JSONAble):
         """
         return
 
-    def extractValuesFromVolumePage(self, timeout: float = 3) -> tuple[dict | None, BeautifulSoup | None]:
+    def extractValuesFromVolumePage(
+        self, timeout: float = 3, recache: bool = False
+    ) -> tuple[dict | None, BeautifulSoup | None]:
         """
         extract values from the given volume page
+
+        Args:
+            timeout: the number of seconds to wait for the volume page
+            recache: if True revalidate the cached volume page with a conditional request -
+                if the page has not been modified my values are kept and None, None is returned
         """
+        volumeParser = VolumeParser(timeout=timeout)
+        if recache and self.url is not None:
+            html, modified = volumeParser.revalidate_volume_page(self.getVolumeNumber())
+            if not modified:
+                return None, None
+            return self.extractValuesFromVolumeHtml(html, volumeParser)
         self.desc = "?"
         self.h1 = "?"
         if self.url is None:
             return None, None
-        volumeParser = VolumeParser(timeout=timeout)
         parseDict, soup = volumeParser.parse_volume(self.getVolumeNumber())
         self.fromDict(parseDict)
         return parseDict, soup
 
+    def extractValuesFromVolumeHtml(
+        self, html: str | bytes | None, volumeParser: VolumeParser
+    ) -> tuple[dict | None, BeautifulSoup | None]:
+        """
+        extract values from the given already fetched html of my volume page
+
+        Args:
+            html: the html of my volume page
+            volumeParser: the parser to use
+        """
+        self.desc = "?"
+        self.h1 = "?"
+        if self.url is None:
+            return None, None
+        parseDict, soup = volumeParser.parse_volume_page(self.getVolumeNumber(), html)
+        self.fromDict(parseDict)
+        return parseDict, soup
+
     def getSubmittingEditor(self):
         """
         Returns the Editor that submitted the volume
@@ -386,11 +463,14 @@ class Volume(JSONAble):
         return submitter
 
 
-class VolumeManager(EntityManager, JSONAbleList):
+class VolumeManager(EntityUpsertMixin, EntityManager, JSONAbleList):
     """
     Contains multiple ceurws volumes
     """
 
+    # the fields derived from the position of the volume in index.html
+    indexPositionFields = ["fromLine", "toLine"]
+
     def __init__(self, tableName: str = "volumes"):
         super().__init__(
             listName="volumes",
@@ -404,6 +484,8 @@ class VolumeManager(EntityManager, JSONAbleList):
             name=self.__class__.__name__,
         )
         self.volumes: list[Volume] = []
+        # hashes of the <tr> blocks of the volumes in index.html by volume number
+        self.indexBlockHashes: dict[int, str] = {}
 
     def load(self):
         """
@@ -450,43 +532,91 @@ class VolumeManager(EntityManager, JSONAbleList):
         """
         recreate or update me by parsing the index.html file
 
+        volumes whose fingerprint (index.html block, volume page and parser configuration) did not change
+        since the last run are not reparsed unless parser_config.force_download is set
+
         Args:
             parser_config: parser configuration
         """
         progress_bar = parser_config.progress_bar
-        loctime_parser = LoctimeParser()
-        pm = PaperManager()
-        if parser_config.down_to_volume != 1:
-            pm.fromStore(cacheFile=CEURWS.CACHE_FILE)
-        paper_list = pm.getList()
+        loctime_parser = get_loctime_parser()
+        loctime_parser.reset_counters()
+        # distinct loctimes are resolved only once - also across runs unless forced
+        loctime_cache = LoctimeCache()
+        if not parser_config.force_download:
+            loctime_cache.load()
+        # the volumes and papers of the last run
+        previousVolumes = {volume.number: volume for volume in self.volumes if volume.number is not None}
+        previousPositions = {number: self.getIndexPositions(volume) for number, volume in previousVolumes.items()}
+        volumeFingerprints = VolumeFingerprints()
+        storedFingerprints = volumeFingerprints.get_fingerprints() if not parser_config.force_download else {}
+        # the volume pages that could not be fetched in the last run are fetched again
+        failedVolumes = FailedVolumes()
+        retryNumbers = failedVolumes.load()
 
         # first reload me from the main index
         self.loadFromIndexHtml(parser_config)
+        volumes = [
+            volume for volume in self.volumes if not volume.number or volume.number >= parser_config.down_to_volume
+        ]
+        volumes.extend(self.getRetryVolumes(volumes, retryNumbers, previousVolumes))
         if progress_bar is not None:
-            progress_bar.reset(total=len(self.volumes))
+            progress_bar.reset(total=len(volumes))
             progress_bar.set_description("fetching volumes")
+        # fetch the volume pages concurrently but parse them in order
+        fetcher = VolumePageFetcher(parser_config)
+        numbers = [volume.number if volume.url is not None else None for volume in volumes]
+        pages = fetcher.fetch(numbers)
+        fingerprints: dict[int, str] = {}
+        skipped: dict[int, Volume] = {}
+        changed = self.iterChangedVolumes(
+            volumes,
+            pages,
+            storedFingerprints,
+            previousVolumes,
+            fingerprints,
+            skipped,
+            progress_bar,
+            failed=fetcher.failed_volumes,
+            parserKey=VolumeFingerprints.parser_key(fetcher.volume_parser.scrape.html_parser),
+        )
+        in_pool = parser_config.parse_workers > 1
+        if in_pool:
+            results = self.parseVolumesInPool(changed, parser_config)
+        else:
+            results = (
+                (
+                    volume,
+                    self.parseVolume(volume, html, fetcher.volume_parser, loctime_parser, debug=parser_config.debug),
+                )
+                for volume, html in changed
+            )
         invalid = 0
-        for volume in self.volumes:
-            if volume.number and volume.number < parser_config.down_to_volume:
-                break
-            _volume_record, soup = volume.extractValuesFromVolumePage()
-            if soup:
-                ptp = PaperTocParser(number=str(volume.number), soup=soup, debug=parser_config.debug)
-                paper_records = ptp.parsePapers()
-                for paper_record in paper_records:
-                    paper = Paper()
-                    paper.fromDict(paper_record)
-                    paper_list.append(paper)
+        added = 0
+        updated = 0
+        new_paper_list = []
+        for volume, result in results:
+            if volume.number in previousVolumes:
+                updated += 1
+            else:
+                added += 1
+            if in_pool:
+                # merge the plain dicts from the worker process
+                volume.fromDict(result["volume_dict"])
+                loctime_parser.merge_counters(result["loctime_counters"], result["total_loctimes"])
+            for paper_record in result["papers"]:
+                paper = Paper()
+                paper.fromDict(paper_record)
+                new_paper_list.append(paper)
             if not volume.valid:
                 invalid += 1
             else:
-                loctime = volume.get_loctime()
-                if loctime:
-                    loc_time_dict = loctime_parser.parse(loctime)
+                loc_time_dict = result["loctime"]
+                if loc_time_dict is not None:
                     for key, value in loc_time_dict.items():
                         attr = f"loc_{key}"
                         setattr(volume, attr, value)
-                    volume.resolveLoctime()
+                    volume.resolveLoctime(loctime_cache)
             # update progress bar
             if progress_bar is not None:
                 if volume.valid:
@@ -494,10 +624,298 @@ class VolumeManager(EntityManager, JSONAbleList):
                     description = volume.acronym[:20] if volume.acronym else "?"
                     progress_bar.set_description(f"{description}")
                 progress_bar.update()
-        print(f"storing recreated volume table for {len(self.volumes)} volumes ({invalid} invalid)")
-        self.store(replace=True)
-        print(f"storing {len(paper_list)} papers")
-        pm.store(replace=True)
+        # keep the unchanged volumes and the volumes below down_to_volume from the last run
+        indexNumbers = {volume.number for volume in self.volumes}
+        self.volumes = [
+            skipped.get(volume.number, volume) if volume.number is not None else volume for volume in self.volumes
+        ]
+        self.volumes.extend(volume for number, volume in previousVolumes.items() if number not in indexNumbers)
+        print(f"{added} volumes added, {updated} updated, {len(skipped)} skipped as unchanged")
+        failed = failedVolumes.merge([number for number in numbers if number is not None], fetcher.failed_volumes)
+        if failed:
+            print(
+                f"{len(failed)} volume pages could not be fetched "
+                f"and will be retried in the next run - see {failedVolumes.path}"
+            )
+        # write only the rows of the parsed volumes and their papers
+        start_time = time.time()
+        parsedVolumes = [volume for volume in volumes if volume.number not in skipped]
+        parsedNumbers = [str(volume.number) for volume in parsedVolumes]
+        written = self.upsertVolumes(parsedVolumes, skipped, previousPositions)
+        if written is None:
+            print(f"storing recreated volume table for {len(self.volumes)} volumes ({invalid} invalid)")
+            self.store(replace=True)
+        else:
+            print(f"upserted {written} of {len(self.volumes)} volumes ({invalid} invalid)")
+        pm = PaperManager()
+        written = pm.upsert(new_paper_list, deleteColumn="vol_number", deleteValues=parsedNumbers)
+        if written is None:
+            if parser_config.down_to_volume != 1 or skipped:
+                # keep the papers of the volumes that have not been parsed
+                pm.fromStore(cacheFile=CEURWS.CACHE_FILE)
+            parsedNumberSet = set(parsedNumbers)
+            paper_list = [paper for paper in pm.getList() if getattr(paper, "vol_number", None) not in parsedNumberSet]
+            paper_list.extend(new_paper_list)
+            pm.papers = paper_list
+            print(f"storing {len(paper_list)} papers")
+            pm.store(replace=True)
+        else:
+            print(f"upserted {written} papers")
+        volumeFingerprints.store_fingerprints(fingerprints)
+        loctime_cache.save()
+        loctime_cache.show_stats()
+        print(f"write phase done after {time.time() - start_time:5.1f} secs")
+
+    def iterChangedVolumes(
+        self,
+        volumes: list[Volume],
+        pages: Iterator[str | bytes | None],
+        storedFingerprints: dict[int, str],
+        previousVolumes: dict[int, Volume],
+        fingerprints: dict[int, str],
+        skipped: dict[int, Volume],
+        progress_bar=None,
+        failed: Container[int] = (),
+        parserKey: str = "",
+    ) -> Iterator[tuple[Volume, str | bytes | None]]:
+        """
+        filter the given volumes and their pages by their fingerprints
+
+        Args:
+            volumes(list): the volumes from the index
+            pages: the volume pages from the fetch stage
+            storedFingerprints(dict): the fingerprints of the last run by volume number
+            previousVolumes(dict): the volumes of the last run by volume number
+            fingerprints(dict): the current fingerprints by volume number to fill
+            skipped(dict): the unchanged volumes of the last run by volume number to fill
+            progress_bar: optional progress bar to update for skipped volumes
+            failed: the numbers of the volumes whose page could not be fetched due to a transient error
+                which keep the volume of the last run and get no fingerprint so that they are parsed
+                after the next successful fetch
+            parserKey(str): the key of the parser configuration see VolumeFingerprints.parser_key
+
+        Yields:
+            tuple: the volumes that need to be parsed and their pages
+        """
+        for volume, html in zip(volumes, pages, strict=True):
+            number = volume.number
+            if number in failed:
+                if number in previousVolumes:
+                    skipped[number] = self.updateIndexPositions(previousVolumes[number], volume)
+                    if progress_bar is not None:
+                        progress_bar.update()
+                else:
+                    yield volume, html
+                continue
+            indexHash = self.indexBlockHashes.get(number) if number is not None else None
+            fingerprint = VolumeFingerprints.fingerprint(indexHash, html, parserKey)
+            if number is not None:
+                fingerprints[number] = fingerprint
+            if number in previousVolumes and storedFingerprints.get(number) == fingerprint:
+                skipped[number] = self.updateIndexPositions(previousVolumes[number], volume)
+                if progress_bar is not None:
+                    progress_bar.update()
+            else:
+                yield volume, html
+
+    @staticmethod
+    def getRetryVolumes(
+        volumes: list[Volume], retryNumbers: Container[int], previousVolumes: dict[int, Volume]
+    ) -> list[Volume]:
+        """
+        get the volumes of the last run whose page could not be fetched and that are not in the given volumes
+        the index walk of an update stops at down_to_volume so these volumes would never be fetched again
+
+        Args:
+            volumes(list): the volumes from the index that are fetched anyway
+            retryNumbers: the numbers of the volumes whose page could not be fetched in the last run
+            previousVolumes(dict): the volumes of the last run by volume number
+
+        Returns:
+            list: the volumes to fetch again in descending order of their numbers
+        """
+        indexNumbers = {volume.number for volume in volumes}
+        retryVolumes = [
+            volume
+            for number, volume in sorted(previousVolumes.items(), reverse=True)
+            if number in retryNumbers and number not in indexNumbers
+        ]
+        return retryVolumes
+
+    def upsertVolumes(
+        self,
+        parsedVolumes: list[Volume],
+        skipped: dict[int, Volume],
+        previousPositions: dict[int, tuple],
+        cacheFile: str | None = None,
+    ) -> int | None:
+        """
+        upsert the parsed volumes and the skipped volumes whose index.html line range moved
+
+        Args:
+            parsedVolumes(list): the volumes parsed in this run
+            skipped(dict): the unchanged volumes of the last run by volume number
+            previousPositions(dict): the index positions of the volumes of the last run by volume number
+            cacheFile(str): the SQLite database - defaults to the cache file of my config
+
+        Returns:
+            int: the number of written rows or None if the whole table needs to be stored
+        """
+        movedVolumes = [
+            volume
+            for number, volume in skipped.items()
+            if self.getIndexPositions(volume) != previousPositions.get(number)
+        ]
+        written = self.upsert(parsedVolumes + movedVolumes, cacheFile=cacheFile)
+        return written
+
+    @staticmethod
+    def getIndexPositions(volume: Volume) -> tuple:
+        """
+        get the index.html line range of the given volume
+
+        Args:
+            volume(Volume): the volume
+
+        Returns:
+            tuple: the values of the indexPositionFields
+        """
+        return tuple(getattr(volume, attr, None) for attr in VolumeManager.indexPositionFields)
+
+    @staticmethod
+    def updateIndexPositions(previousVolume: Volume, indexVolume: Volume) -> Volume:
+        """
+        update the index.html line range of the given volume of the last run from the current index
+        the lines shift whenever new volumes are added at the top of index.html
+        while the fingerprint only covers the content of the index block
+
+        Args:
+            previousVolume(Volume): the unchanged volume of the last run
+            indexVolume(Volume): the volume of the current index
+
+        Returns:
+            Volume: the previous volume with the current line range
+        """
+        for attr in VolumeManager.indexPositionFields:
+            setattr(previousVolume, attr, getattr(indexVolume, attr, None))
+        return previousVolume
+
+    @staticmethod
+    def parseVolume(
+        volume: Volume,
+        html: str | bytes | None,
+        volume_parser: VolumeParser,
+        loctime_parser: LoctimeParser,
+        debug: bool = False,
+    ) -> dict:
+        """
+        parse the given html of the volume page of the given volume
+        setting the values of the volume page and parsing the papers and the loctime
+
+        Args:
+            volume(Volume): the volume to parse the page for
+            html: the html of the volume page
+            volume_parser(VolumeParser): the parser for the volume page
+            loctime_parser(LoctimeParser): the parser for the loctime
+            debug(bool): if True show debug information
+
+        Returns:
+            dict: plain dict with the "volume" page record, the "papers" records and the "loctime" record
+        """
+        volume_record, soup = volume.extractValuesFromVolumeHtml(html, volume_parser)
+        paper_records = []
+        if soup:
+            ptp = PaperTocParser(number=str(volume.number), soup=soup, debug=debug)
+            paper_records = ptp.parsePapers()
+        loctime_record = None
+        if volume.valid:
+            loctime = volume.get_loctime()
+            if loctime:
+                loctime_record = loctime_parser.parse(loctime)
+        result = {
+            "volume": volume_record,
+            "papers": paper_records,
+            "loctime": loctime_record,
+        }
+        return result
+
+    @staticmethod
+    def initParseWorker(debug: bool = False, html_parser: str | None = None):
+        """
+        initialize a worker process for parsing volume pages
+
+        Args:
+            debug(bool): if True show debug information
+            html_parser(str): the BeautifulSoup tree builder for the volume pages
+        """
+        VolumeManager.workerDebug = debug
+        VolumeManager.workerVolumeParser = VolumeParser(debug=debug, html_parser=html_parser)
+        VolumeManager.workerLoctimeParser = get_loctime_parser()
+
+    @staticmethod
+    def parseVolumeInWorker(volume_page: tuple[dict, str | bytes | None]) -> dict:
+        """
+        parse the fetched volume page for the given index volume record
+        in a worker process initialized by initParseWorker
+
+        Args:
+            volume_page(tuple): the plain record of the volume from the index and its page from the fetch stage
+
+        Returns:
+            dict: plain dict with the parse results see parseVolume
+            and the "volume_dict" and loctime counters to be merged by the parent process
+        """
+        volume_record, html = volume_page
+        volume = Volume()
+        volume.fromDict(volume_record)
+        loctime_parser = VolumeManager.workerLoctimeParser
+        loctime_parser.reset_counters()
+        result = VolumeManager.parseVolume(
+            volume,
+            html,
+            VolumeManager.workerVolumeParser,
+            loctime_parser,
+            debug=VolumeManager.workerDebug,
+        )
+        result["volume_dict"] = {key: value for key, value in volume.__dict__.items() if not key.startswith("_")}
+        result["loctime_counters"] = {
+            category: dict(counter) for category, counter in loctime_parser.counters.items() if counter
+        }
+        result["total_loctimes"] = loctime_parser.total_loctimes
+        return result
+
+    def parseVolumesInPool(
+        self,
+        volume_pages: Iterable[tuple[Volume, str | bytes | None]],
+        parser_config: ParserConfig,
+    ) -> Iterator[tuple[Volume, dict]]:
+        """
+        parse the pages of the given volumes with a pool of parser_config.parse_workers processes
+        the pages are handed to the workers as they arrive from the fetch stage
+
+        Args:
+            volume_pages: the volumes to parse with their pages from the fetch stage
+            parser_config(ParserConfig): the parser configuration
+
+        Yields:
+            tuple: each volume and its parse result in the order of the given volumes
+        """
+        volumes: list[Volume] = []
+
+        def iterWorkerPages() -> Iterator[tuple[dict, str | bytes | None]]:
+            for volume, html in volume_pages:
+                volumes.append(volume)
+                volume_record = {key: value for key, value in volume.__dict__.items() if not key.startswith("_")}
+                yield volume_record, html
+
+        with ProcessPoolExecutor(
+            max_workers=parser_config.parse_workers,
+            initializer=VolumeManager.initParseWorker,
+            initargs=(parser_config.debug, parser_config.html_parser),
+        ) as executor:
+            # map submits all pages before it returns so that the volumes are complete for the zip
+            results = executor.map(VolumeManager.parseVolumeInWorker, iterWorkerPages(), chunksize=8)
+            yield from zip(volumes, results, strict=True)
 
     def loadFromIndexHtml(self, parser_config: ParserConfig | None = None, vol_limit: int | None = None):
         """
@@ -505,6 +923,28 @@ class VolumeManager(EntityManager, JSONAbleList):
 
         Args:
             parser_config(ParserConfig): the parser Configuration to use
+            vol_limit(int): the maximum number of volumes to parse
+        """
+        volumesByNumber: dict[int, Volume] = {}
+        for volume in self.iterVolumesFromIndexHtml(parser_config, vol_limit):
+            if volume.number is not None:
+                volumesByNumber[volume.number] = volume
+        self.volumes = list(volumesByNumber.values())
+        self.bumpDataVersion()
+
+    def iterVolumesFromIndexHtml(
+        self, parser_config: ParserConfig | None = None, vol_limit: int | None = None
+    ) -> Iterator[Volume]:
+        """
+        iterate over the volumes of the index.html file as they are parsed
+        stopping at parser_config.down_to_volume
+
+        Args:
+            parser_config(ParserConfig): the parser Configuration to use
+            vol_limit(int): the maximum number of volumes to parse
+
+        Yields:
+            Volume: the volumes in the order of the index
         """
         force = parser_config.force_download if parser_config else True
         htmlText = self.getIndexHtml(force)
@@ -513,30 +953,58 @@ class VolumeManager(EntityManager, JSONAbleList):
             vol_count_estimate = htmlText.count("ceur-ws.org/Vol-")
             parser_config.progress_bar.reset(total=vol_count_estimate)
             parser_config.progress_bar.set_description("parsing index")
-        volumeRecords = indexParser.parse(vol_limit)
-        self.volumes = []
-        for volumeRecord in volumeRecords.values():
+        for volumeRecord in indexParser.iter_volumes(vol_limit):
             volume = Volume()
             volume.fromDict(volumeRecord)
+            if volume.number is not None:
+                blockLines = indexParser.lines[volume.fromLine - 1 : volume.toLine]
+                self.indexBlockHashes[volume.number] = VolumeFingerprints.hash_index_block(blockLines)
             for attr in ["desc", "h1"]:
                 if not hasattr(volume, attr):
                     setattr(volume, attr, "?")
-            self.volumes.append(volume)
+            yield volume
 
     def getIndexHtml(self, force: bool = False):
         """
         get the index html
+
+        Args:
+            force: if True revalidate the cached index html with a conditional request
+                using the ETag and Last-Modified metadata of the last fetch.
+                self.indexModified is set to False if the cached index is still valid
+
+        Raises:
+            URLError: the HTTPError or URLError if index.html can not be fetched
         """
         cacheHtml = CEURWS.CACHE_HTML
+        self.indexModified = True
         if cacheHtml.is_file() and not force:
             with open(cacheHtml, encoding="utf-8") as file:
                 html_page = file.read()
+            self.indexModified = False
         else:
-            req = Request(CEURWS.URL, headers={"User-Agent": "pyCEURMake"})
-            html_page = urlopen(req).read().decode()
+            meta = VolumePageCache.read_meta(CEURWS.CACHE_HTML_META) if cacheHtml.is_file() else None
+            scrape = WebScrape(agent="pyCEURMake", retry_policy=RetryPolicy())
+            fetch_result = scrape.fetch(
+                CEURWS.URL,
+                etag=meta.get("etag") if meta else None,
+                last_modified=meta.get("last_modified") if meta else None,
+            )
             CEURWS.CACHE_DIR.mkdir(parents=True, exist_ok=True)  # @UndefinedVariable
-            with open(cacheHtml, mode="w", encoding="utf-8") as htmlFile:
-                print(html_page, file=htmlFile)
+            if fetch_result.not_modified:
+                self.indexModified = False
+                with open(cacheHtml, encoding="utf-8") as file:
+                    html_page = file.read()
+            else:
+                html = fetch_result.html
+                if html is None:
+                    if fetch_result.error is not None:
+                        raise fetch_result.error
+                    raise URLError(f"could not fetch {CEURWS.URL} - status {fetch_result.status}")
+                html_page = html.decode(errors="replace") if isinstance(html, bytes) else html
+                with open(cacheHtml, mode="w", encoding="utf-8") as htmlFile:
+                    print(html_page, file=htmlFile)
+            VolumePageCache.write_meta(CEURWS.CACHE_HTML_META, fetch_result.as_meta())
         return html_page
 
 
@@ -625,7 +1093,7 @@ class Paper(JSONAble):
         return text
 
 
-class PaperManager(EntityManager, JSONAbleList):
+class PaperManager(EntityUpsertMixin, EntityManager, JSONAbleList):
     """
     Contains multiple ceurws papers
     """
@@ -4,6 +4,7 @@ Created on 2024-02-22
 @author: wf
 """
 
+import os
 import sys
 from argparse import ArgumentParser
 from dataclasses import asdict
@@ -15,6 +16,9 @@ from tqdm import tqdm
 from ceurws.ceur_ws import VolumeManager
 from ceurws.indexparser import ParserConfig
 from ceurws.namedqueries import NamedQueries
+from ceurws.resources import ResourceRegistry
+from ceurws.utils.webscrape import HttpPool, WebScrape
+from ceurws.volumeparser import VolumePageCache
 from ceurws.webserver import CeurWsWebServer
 from ceurws.wikidatasync import WikidataSync
 
@@ -37,12 +41,34 @@ class CeurWsCmd(WebserverCmd):
         override the default argparser call
         """
         parser = super().getArgParser(description, version_msg)
+        parser.add_argument(
+            "--archive",
+            action="store_true",
+            help="keep the volume pages in a single compressed archive importing the volume page directory if needed"
+            " - later runs keep using the archive until --directory is given",
+        )
+        parser.add_argument(
+            "--directory",
+            action="store_true",
+            help="keep the volume pages in one file per volume in the volume page directory again",
+        )
+        parser.add_argument(
+            "--export_volume_pages",
+            action="store_true",
+            help="export the volume pages of the archive to the volume page directory",
+        )
         parser.add_argument(
             "-dbu",
             "--dblp_update",
             action="store_true",
             help="update dblp cache",
         )
+        parser.add_argument(
+            "--html_parser",
+            choices=WebScrape.HTML_PARSERS,
+            default=WebScrape.default_html_parser(),
+            help="tree builder for the volume pages [default: %(default)s]",
+        )
         parser.add_argument(
             "-nq",
             "--namedqueries",
@@ -66,6 +92,13 @@ class CeurWsCmd(WebserverCmd):
             action="store_true",
             help="recreate caches e.g. volume table",
         )
+        parser.add_argument(
+            "-w",
+            "--workers",
+            type=int,
+            default=1,
+            help="number of processes to parse volume pages with --recreate - 0 for all cores [default: %(default)s]",
+        )
         parser.add_argument(
             "-uv",
             "--update",
@@ -90,6 +123,15 @@ class CeurWsCmd(WebserverCmd):
         """
         handle the command line arguments
         """
+        if args.archive:
+            imported = VolumePageCache.use_archive()
+            if imported:
+                print(f"imported {imported} volume pages to {VolumePageCache.archive_location}")
+        if args.directory:
+            VolumePageCache.use_directory()
+        if args.export_volume_pages:
+            exported = VolumePageCache.export_directory()
+            print(f"exported {exported} volume pages to {VolumePageCache.cache_location}")
         if args.namedqueries:
             nq = NamedQueries()
             yaml = nq.toYaml()
@@ -103,12 +145,22 @@ class CeurWsCmd(WebserverCmd):
             manager = VolumeManager()
             manager.load()
             progress_bar = tqdm()
-            parser_config = ParserConfig(progress_bar, force_download=args.force, debug=args.debug)
+            parse_workers = args.workers if args.workers > 0 else os.cpu_count() or 1
+            parser_config = ParserConfig(
+                progress_bar,
+                force_download=args.force,
+                debug=args.debug,
+                parse_workers=parse_workers if args.recreate else 1,
+                html_parser=args.html_parser,
+            )
 
             if args.recreate:
                 manager.recreate(parser_config)
             else:
                 manager.update(parser_config)
+            if args.debug:
+                ResourceRegistry.show_metrics()
+                HttpPool.get_shared().show_stats()
         if args.wikidata_update:
             wdsync = WikidataSync.from_args(args)
             wdsync.update(withStore=True)
@@ -118,21 +170,22 @@ class CeurWsCmd(WebserverCmd):
             print(f"updating dblp cache from SPARQL endpoint {endpoint.sparql.url}")
             # Instantiate the progress bar
             pbar = tqdm(total=len(wdsync.dblpEndpoint.dblp_managers))
-            for _step, (cache_name, dblp_manager) in enumerate(endpoint.dblp_managers.items(), start=1):
-                # Call the corresponding function to refresh cache data
-                dblp_manager.load(force_query=args.force)
+
+            def on_loaded(cache_name: str, _duration: float):
                 # Update the progress bar description with the cache name and increment
                 pbar.set_description(f"{cache_name} updated ...")
+                pbar.update(1)
 
-                # Update the progress bar manually
-                pbar.update(1)  # Increment the progress bar by 1 for each iteration
-
+            # refresh the cache data - independent managers are loaded in parallel
+            timings = endpoint.load_all(force_query=args.force, on_loaded=on_loaded)
             # Close the progress bar after the loop
             pbar.close()
             table_data = []
             for _step, cache_name in enumerate(endpoint.dblp_managers.keys(), start=1):
                 cache = endpoint.cache_manager.get_cache_by_name(cache_name)
-                table_data.append(asdict(cache))
+                row = asdict(cache)
+                row["load time [s]"] = f"{timings[cache_name]:.1f}"
+                table_data.append(row)
             table = tabulate(table_data, headers="keys", tablefmt="grid")
             print(table)
             pass
@@ -19,9 +19,30 @@ class CEURWS:
             home = Path(os.environ["GITHUB_WORKSPACE"])
         return home
 
-    URL = "https://ceur-ws.org"
+    # the base url of CEUR-WS - override with the CEURWS_URL environment variable
+    # e.g. to point at a local ReplayServer
+    DEFAULT_URL = "https://ceur-ws.org"
+    URL = os.environ.get("CEURWS_URL", DEFAULT_URL).rstrip("/")
     home = get_home_path()
     CACHE_DIR = home.joinpath(".ceurws")
     CACHE_FILE = CACHE_DIR.joinpath("ceurws.db")
     CACHE_HTML = CACHE_DIR.joinpath("index.html")
+    CACHE_HTML_META = CACHE_DIR.joinpath("index.meta.json")
     CONFIG = StorageConfig(cacheFile=str(CACHE_FILE))
+
+    @classmethod
+    def rebase_url(cls, url: str) -> str:
+        """
+        rebase the given ceur-ws.org url on the configured CEURWS.URL
+
+        Args:
+            url: the url e.g. http://ceur-ws.org/Vol-2436/
+
+        Returns:
+            str: the url on the configured base e.g. http://127.0.0.1:8765/Vol-2436/
+        """
+        if cls.URL != cls.DEFAULT_URL:
+            for prefix in ("https://ceur-ws.org", "http://ceur-ws.org"):
+                if url.startswith(prefix):
+                    return cls.URL + url[len(prefix) :]
+        return url
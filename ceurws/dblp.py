@@ -5,8 +5,12 @@ Created on 2024-03-09
 """
 
 import dataclasses
+import itertools
 import os
+import threading
 import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from itertools import groupby
 from urllib.error import HTTPError
@@ -16,6 +20,7 @@ from lodstorage.lod import LOD
 from lodstorage.query import QueryManager
 from lodstorage.sparql import SPARQL
 
+from ceurws.dblp_index import DblpIndex
 from ceurws.models.dblp import DblpPaper, DblpProceeding, DblpScholar
 
 
@@ -27,8 +32,12 @@ class DblpManager:
         endpoint (DblpEndpoint): The endpoint for DBLP queries.
         cache_name (str): The name of the cache to use.
         query_name (str): The name of the query to execute.
+        dataVersion (int): The version of the loaded entities - bumped on every load.
     """
 
+    # process wide so that the versions of different manager instances never collide
+    versionCounter = itertools.count(1)
+
     def __init__(self, endpoint: "DblpEndpoint", cache_name: str, query_name: str):
         """
         Initializes the DBLP Manager with the given endpoint, cache name, and query name.
@@ -41,6 +50,9 @@ class DblpManager:
         self.endpoint = endpoint
         self.cache_name = cache_name
         self.query_name = query_name
+        # managers might be loaded concurrently by load_all and as dependencies of other managers
+        self.lock = threading.Lock()
+        self.dataVersion = next(DblpManager.versionCounter)
 
     def load(self, force_query: bool = False):
         """
@@ -50,6 +62,7 @@ class DblpManager:
             force_query (bool): If True, forces a new query to the endpoint. Defaults to False.
         """
         self.lod = self.endpoint.get_lod(self.cache_name, self.query_name, force_query=force_query)
+        self.dataVersion = next(DblpManager.versionCounter)
 
 
 class DblpAuthors(DblpManager):
@@ -65,13 +78,12 @@ class DblpAuthors(DblpManager):
         """
         load my authors
         """
-        if self.authors is None:
-            super().load(force_query=force_query)
-            self.authors = []
-            for d in self.lod:
-                author = DblpScholar(**d)
-                self.authors.append(author)
-            self.authorsById = {a.dblp_author_id: a for a in self.authors}
+        with self.lock:
+            if self.authors is None:
+                super().load(force_query=force_query)
+                authors = [DblpScholar(**d) for d in self.lod]
+                self.authorsById = {a.dblp_author_id: a for a in authors}
+                self.authors = authors
 
 
 class DblpEditors(DblpManager):
@@ -87,13 +99,12 @@ class DblpEditors(DblpManager):
         """
         load my editors
         """
-        if self.editors is None:
-            super().load(force_query=force_query)
-            self.editors = []
-            for d in self.lod:
-                editor = DblpScholar(**d)
-                self.editors.append(editor)
-            self.editorsById = {e.dblp_author_id: e for e in self.editors}
+        with self.lock:
+            if self.editors is None:
+                super().load(force_query=force_query)
+                editors = [DblpScholar(**d) for d in self.lod]
+                self.editorsById = {e.dblp_author_id: e for e in editors}
+                self.editors = editors
 
 
 class DblpPapers(DblpManager):
@@ -106,57 +117,63 @@ class DblpPapers(DblpManager):
         self.papers: list[DblpPaper] | None = None
         self.papers_by_volume: dict[str, dict] = {}
         self.papersById: dict[str, DblpPaper] = {}
+        self.papersByPdfId: dict[str, DblpPaper] = {}
         self.papersByProceeding: dict[str, list[DblpPaper]] = {}
 
     def load(self, force_query: bool = False):
         """
-        load my editors
-        """
-        if self.papers is None:
-            super().load(force_query=force_query)
-            dblp_authors = self.endpoint.dblp_authors
-            dblp_authors.load(force_query=force_query)
-            self.papers = []
-            for d in self.lod:
-                pdf_id = d.get("pdf_url", None)
-                if pdf_id and isinstance(pdf_id, str):
-                    pdf_id = pdf_id.replace("http://ceur-ws.org/", "")
-                    pdf_id = pdf_id.replace("https://ceur-ws.org/", "")
-                    pdf_id = pdf_id.replace(".pdf", "")
-                authors = []
-                # get the authors string
-                authors_str = d.get("author", "")
-                # >;<  qlever quirk until 2023-12
-                delim = ">;<" if ">;<" in authors_str else ";"
-                for dblp_author_id in authors_str.split(delim):  #
-                    author = dblp_authors.authorsById.get(dblp_author_id, None)
-                    if author:
-                        authors.append(author)
-                paper = DblpPaper(
-                    dblp_publication_id=d.get("paper"),
-                    volume_number=int(d.get("volume_number")),
-                    dblp_proceeding_id=d.get("proceeding"),
-                    title=d.get("title"),
-                    pdf_id=pdf_id,
-                    authors=authors,
-                )  # type: ignore
-                self.papers.append(paper)
-            self.papers_by_volume = LOD.getLookup(self.papers, "volume_number", withDuplicates=True)
-            self.papersByProceeding = {
-                key: list(group) for key, group in groupby(self.papers, lambda paper: paper.dblp_proceeding_id)
-            }
-            self.papersById = {p.dblp_publication_id: p for p in self.papers} if self.papers is not None else {}
-            # papers per volume
-            for volume_number, vol_papers in sorted(self.papers_by_volume.items()):
-                vol_paper_lod = [dataclasses.asdict(paper) for paper in vol_papers]
-                cache_name = f"dblp/Vol-{volume_number}/papers"
-                if self.endpoint.progress_bar:
-                    self.endpoint.progress_bar.update(30 / 3650)
-                    # print(f"caching {cache_name}")
-                self.endpoint.cache_manager.store(
-                    cache_name,
-                    vol_paper_lod,
-                )
+        load my papers
+        """
+        with self.lock:
+            if self.papers is None:
+                super().load(force_query=force_query)
+                dblp_authors = self.endpoint.dblp_authors
+                dblp_authors.load(force_query=force_query)
+                papers = []
+                for d in self.lod:
+                    pdf_id = d.get("pdf_url", None)
+                    if pdf_id and isinstance(pdf_id, str):
+                        pdf_id = pdf_id.replace("http://ceur-ws.org/", "")
+                        pdf_id = pdf_id.replace("https://ceur-ws.org/", "")
+                        pdf_id = pdf_id.replace(".pdf", "")
+                    authors = []
+                    # get the authors string
+                    authors_str = d.get("author", "")
+                    # >;<  qlever quirk until 2023-12
+                    delim = ">;<" if ">;<" in authors_str else ";"
+                    for dblp_author_id in authors_str.split(delim):  #
+                        author = dblp_authors.authorsById.get(dblp_author_id, None)
+                        if author:
+                            authors.append(author)
+                    paper = DblpPaper(
+                        dblp_publication_id=d.get("paper"),
+                        volume_number=int(d.get("volume_number")),
+                        dblp_proceeding_id=d.get("proceeding"),
+                        title=d.get("title"),
+                        pdf_id=pdf_id,
+                        authors=authors,
+                    )  # type: ignore
+                    papers.append(paper)
+                self.papers_by_volume = LOD.getLookup(papers, "volume_number", withDuplicates=True)
+                self.papersByProceeding = {
+                    key: list(group) for key, group in groupby(papers, lambda paper: paper.dblp_proceeding_id)
+                }
+                self.papersById = {p.dblp_publication_id: p for p in papers}
+                # e.g. Vol-3185/paper1
+                self.papersByPdfId = {p.pdf_id: p for p in self.papersById.values() if p.pdf_id}
+                # papers per volume
+                for volume_number, vol_papers in sorted(self.papers_by_volume.items()):
+                    vol_paper_lod = [dataclasses.asdict(paper) for paper in vol_papers]
+                    cache_name = f"dblp/Vol-{volume_number}/papers"
+                    if self.endpoint.progress_bar:
+                        self.endpoint.progress_bar.update(30 / 3650)
+                        # print(f"caching {cache_name}")
+                    self.endpoint.cache_manager.store(
+                        cache_name,
+                        vol_paper_lod,
+                    )
+                # set last since a papers list that is not None is considered loaded
+                self.papers = papers
 
 
 class DblpVolumes(DblpManager):
@@ -172,40 +189,41 @@ class DblpVolumes(DblpManager):
         """
         load my volumes
         """
-        if self.volumes is None:
-            super().load(force_query=force_query)
-            volumes = []
-            dblp_editors = self.endpoint.dblp_editors
-            dblp_editors.load(force_query=force_query)
-            dblp_papers = self.endpoint.dblp_papers
-            dblp_papers.load(force_query=force_query)
-            for d in self.lod:
-                if int(d.get("volume_number")) == 3000:
-                    pass
-                vol_editors = []
-                editor_str = d.get("editor", "")
-                # >;<  qlever quirk until 2023-12
-                delim = ">;<" if ">;<" in editor_str else ";"
-                for dblp_author_id in editor_str.split(delim):
-                    editor = dblp_editors.editorsById.get(dblp_author_id, None)
-                    if editor:
-                        vol_editors.append(editor)
-                volume = DblpProceeding(
-                    dblp_publication_id=d.get("proceeding"),
-                    volume_number=int(d.get("volume_number")),
-                    dblp_event_id=d.get("dblp_event_id"),
-                    title=d.get("title"),
-                    editors=vol_editors,
-                    papers=dblp_papers.papersByProceeding.get(d.get("proceeding")),
-                )  # type: ignore
-                volumes.append(volume)
-            volume_by_number, _errors = LOD.getLookup(volumes, "volume_number")
-            for number, volume in sorted(volume_by_number.items()):
-                cache_name = f"dblp/Vol-{number}/metadata"
-                if self.endpoint.progress_bar:
-                    self.endpoint.progress_bar.update(int(30 / 3650))
-                self.endpoint.cache_manager.store(cache_name, volume)
-            self.volumes = volumes
+        with self.lock:
+            if self.volumes is None:
+                super().load(force_query=force_query)
+                volumes = []
+                dblp_editors = self.endpoint.dblp_editors
+                dblp_editors.load(force_query=force_query)
+                dblp_papers = self.endpoint.dblp_papers
+                dblp_papers.load(force_query=force_query)
+                for d in self.lod:
+                    if int(d.get("volume_number")) == 3000:
+                        pass
+                    vol_editors = []
+                    editor_str = d.get("editor", "")
+                    # >;<  qlever quirk until 2023-12
+                    delim = ">;<" if ">;<" in editor_str else ";"
+                    for dblp_author_id in editor_str.split(delim):
+                        editor = dblp_editors.editorsById.get(dblp_author_id, None)
+                        if editor:
+                            vol_editors.append(editor)
+                    volume = DblpProceeding(
+                        dblp_publication_id=d.get("proceeding"),
+                        volume_number=int(d.get("volume_number")),
+                        dblp_event_id=d.get("dblp_event_id"),
+                        title=d.get("title"),
+                        editors=vol_editors,
+                        papers=dblp_papers.papersByProceeding.get(d.get("proceeding")),
+                    )  # type: ignore
+                    volumes.append(volume)
+                volume_by_number, _errors = LOD.getLookup(volumes, "volume_number")
+                for number, volume in sorted(volume_by_number.items()):
+                    cache_name = f"dblp/Vol-{number}/metadata"
+                    if self.endpoint.progress_bar:
+                        self.endpoint.progress_bar.update(int(30 / 3650))
+                    self.endpoint.cache_manager.store(cache_name, volume)
+                self.volumes = volumes
         return self.volumes
 
 
@@ -216,6 +234,13 @@ class DblpEndpoint:
 
     DBLP_REC_PREFIX = "https://dblp.org/rec/"
     DBLP_EVENT_PREFIX = "https://dblp.org/db/"
+    # the cache names of the managers each manager needs to be loaded before it
+    DEPENDENCIES = {
+        "dblp/authors": [],
+        "dblp/editors": [],
+        "dblp/papers": ["dblp/authors"],
+        "dblp/volumes": ["dblp/editors", "dblp/papers"],
+    }
 
     def __init__(self, endpoint, debug: bool = False):
         """
@@ -240,13 +265,77 @@ class DblpEndpoint:
             "dblp/volumes": self.dblp_volumes,
         }
         self.progress_bar = None
+        self.dblp_index: DblpIndex | None = None
+        self.index_lock = threading.Lock()
+
+    def load_manager(self, cache_name: str, force_query: bool = False) -> float:
+        """
+        load the manager with the given cache name
 
-    def load_all(self, force_query: bool = False):
+        Returns:
+            float: the duration of the loading in seconds
         """
-        load all managers
+        start_time = time.time()
+        self.dblp_managers[cache_name].load(force_query=force_query)
+        return time.time() - start_time
+
+    def load_all(
+        self,
+        force_query: bool = False,
+        max_workers: int | None = None,
+        on_loaded: Callable[[str, float], None] | None = None,
+    ) -> dict[str, float]:
         """
-        for _key, manager in self.dblp_managers.items():
-            manager.load(force_query=force_query)
+        load all managers in a thread pool
+        starting each manager as soon as the managers it depends on are loaded
+
+        Args:
+            force_query (bool): If True, forces new queries to the endpoint. Defaults to False.
+            max_workers (int): the maximum number of managers to load at the same time - default: all
+            on_loaded: callback with the cache name and loading duration of each loaded manager
+
+        Returns:
+            dict: the loading duration in seconds by cache name
+        """
+        timings: dict[str, float] = {}
+        pending = {cache_name: self.DEPENDENCIES.get(cache_name, []) for cache_name in self.dblp_managers}
+        with ThreadPoolExecutor(max_workers=max_workers or len(pending)) as executor:
+            running: dict[Future, str] = {}
+            while pending or running:
+                for cache_name, dependencies in list(pending.items()):
+                    if all(dependency in timings for dependency in dependencies):
+                        del pending[cache_name]
+                        future = executor.submit(self.load_manager, cache_name, force_query)
+                        running[future] = cache_name
+                if not running:
+                    raise ValueError(f"unresolvable dblp manager dependencies {pending}")
+                done, _not_done = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    cache_name = running.pop(future)
+                    timings[cache_name] = future.result()
+                    if on_loaded:
+                        on_loaded(cache_name, timings[cache_name])
+        self.dblp_index = None
+        return timings
+
+    def get_dblp_index(self) -> DblpIndex:
+        """
+        get the sorted and indexed papers, editors and volumes - loading them once on first use
+
+        Returns:
+            DblpIndex: the index
+        """
+        if self.dblp_index is not None:
+            return self.dblp_index
+        with self.index_lock:
+            if self.dblp_index is None:
+                self.load_all()
+                self.dblp_index = DblpIndex(
+                    papers=self.dblp_papers.papers or [],
+                    editors=self.dblp_editors.editors or [],
+                    volumes=self.dblp_volumes.volumes or [],
+                )
+        return self.dblp_index
 
     def get_lod(self, cache_name: str, query_name: str, force_query: bool = False) -> list:
         """
@@ -282,6 +371,20 @@ class DblpEndpoint:
             self.progress_bar.update(duration * 100 / 36)
         return lod
 
+    def get_ceur_volume_paper(self, volume_number: int, paper_id: str) -> DblpPaper | None:
+        """
+        get the dblp paper with the given paper id of the given volume from the in memory index
+
+        Args:
+            volume_number: number of the volume
+            paper_id: the id of the paper within the volume e.g. paper1
+
+        Returns:
+            DblpPaper: the paper or None if it is not indexed by dblp
+        """
+        self.get_dblp_index()
+        return self.dblp_papers.papersByPdfId.get(f"Vol-{volume_number}/{paper_id}")
+
     def get_ceur_volume_papers(self, volume_number: int) -> list[DblpPaper]:
         """
         Get all papers published in CEUR-WS from dblp
@@ -0,0 +1,134 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import bisect
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from ceurws.models.dblp import DblpPaper, DblpProceeding, DblpScholar
+
+
+class SortedStore:
+    """
+    precomputed store of items sorted by a unique tuple key
+    with integer position indices for offset, keyset and filtered pagination
+
+    the first element of the key is the volume number for volume range filters
+    """
+
+    def __init__(
+        self,
+        items: Iterable,
+        sort_key: Callable[[Any], tuple],
+        multi_keys: dict[str, Callable[[Any], Iterable[str]]] | None = None,
+    ):
+        """
+        constructor
+
+        Args:
+            items: the items to store
+            sort_key: the function to get the unique sort key of an item
+            multi_keys: functions to get the lookup values of an item by index name e.g. the author ids
+        """
+        keyed = sorted(((sort_key(item), item) for item in items), key=lambda pair: pair[0])
+        self.keys: list[tuple] = [key for key, _item in keyed]
+        self.items: list = [item for _key, item in keyed]
+        # sorted positions of the items by lookup value by index name
+        self.positions: dict[str, dict[str, list[int]]] = {}
+        for name, values_of in (multi_keys or {}).items():
+            lookup: dict[str, list[int]] = {}
+            for position, item in enumerate(self.items):
+                for value in values_of(item):
+                    positions = lookup.setdefault(value, [])
+                    if not positions or positions[-1] != position:
+                        positions.append(position)
+            self.positions[name] = lookup
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def query(
+        self,
+        offset: int = 0,
+        limit: int = 100,
+        after: tuple | None = None,
+        volume_from: int | None = None,
+        volume_to: int | None = None,
+        lookups: dict[str, str] | None = None,
+    ) -> tuple[list, tuple | None]:
+        """
+        get a page of the items
+
+        Args:
+            offset: the number of matching items to skip
+            limit: the maximum number of items
+            after: keyset pagination - only items with a key greater than this key
+            volume_from: the lowest volume number
+            volume_to: the highest volume number
+            lookups: the lookup value by index name e.g. {"author": "https://dblp.org/pid/b/TimBernersLee"}
+
+        Returns:
+            tuple: the items of the page and the key of the last item if there are more items
+        """
+        # the position range of the volume range and the keyset cursor
+        start = 0 if volume_from is None else bisect.bisect_left(self.keys, (volume_from,))
+        end = len(self.items) if volume_to is None else bisect.bisect_left(self.keys, (volume_to + 1,))
+        if after is not None:
+            start = max(start, bisect.bisect_right(self.keys, tuple(after)))
+        if lookups:
+            candidates: list[int] | None = None
+            for name, value in lookups.items():
+                positions = self.positions[name].get(value, [])
+                positions = positions[bisect.bisect_left(positions, start) : bisect.bisect_left(positions, end)]
+                if candidates is None:
+                    candidates = positions
+                else:
+                    positionSet = set(positions)
+                    candidates = [position for position in candidates if position in positionSet]
+            selected = candidates or []
+            page = selected[offset : offset + limit]
+            more = offset + limit < len(selected)
+        else:
+            page = list(range(start + offset, min(end, start + offset + limit)))
+            more = start + offset + limit < end
+        items = [self.items[position] for position in page]
+        last_key = self.keys[page[-1]] if more and page else None
+        return items, last_key
+
+
+class DblpIndex:
+    """
+    sorted and indexed stores of the dblp papers, editors and volumes
+    """
+
+    def __init__(
+        self,
+        papers: list[DblpPaper],
+        editors: list[DblpScholar],
+        volumes: list[DblpProceeding],
+    ):
+        """
+        constructor
+
+        Args:
+            papers: the dblp papers
+            editors: the dblp editors
+            volumes: the dblp proceedings
+        """
+        self.papers = SortedStore(
+            papers,
+            sort_key=lambda paper: (paper.volume_number, paper.dblp_publication_id),
+            multi_keys={"author": lambda paper: [author.dblp_author_id for author in paper.authors or []]},
+        )
+        self.editors = SortedStore(
+            editors,
+            sort_key=lambda editor: (editor.dblp_author_id,),
+        )
+        self.volumes = SortedStore(
+            volumes,
+            sort_key=lambda volume: (volume.volume_number, volume.dblp_publication_id),
+            multi_keys={"editor": lambda volume: [editor.dblp_author_id for editor in volume.editors or []]},
+        )
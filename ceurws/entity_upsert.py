@@ -0,0 +1,138 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import datetime
+import itertools
+from typing import Any, Protocol
+
+from lodstorage.lod import LOD
+from lodstorage.sql import SQLDB
+
+
+class UpsertableEntityManager(Protocol):
+    """
+    the attributes of the EntityManager that EntityUpsertMixin needs
+    """
+
+    config: Any
+    tableName: str
+    primaryKey: str
+    handleInvalidListTypes: bool
+    filterInvalidListTypes: bool
+    listSeparator: str
+    sqlTypes: tuple[type, ...]
+
+    def getCacheFile(self, config=None, mode=None) -> str: ...
+
+    def bumpDataVersion(self) -> int: ...
+
+
+class EntityUpsertMixin:
+    """
+    row level upsert for an EntityManager with an SQL store
+
+    instead of dropping and rewriting the whole table only the given entities
+    are written keyed by the primary key of the EntityManager
+
+    the dataVersion of the entities is bumped whenever they are reloaded or stored
+    so that derived data like cached responses can be invalidated - the mixin needs to
+    precede the EntityManager in the bases to see the setListFromLoD and storeLoD calls
+    """
+
+    sqlTypes = (str, int, float, bool, datetime.date, datetime.datetime)
+    # process wide so that the versions of different manager instances never collide
+    versionCounter = itertools.count(1)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dataVersion = next(EntityUpsertMixin.versionCounter)
+
+    def bumpDataVersion(self) -> int:
+        """
+        mark my entities as changed
+
+        Returns:
+            int: the new data version
+        """
+        self.dataVersion = next(EntityUpsertMixin.versionCounter)
+        return self.dataVersion
+
+    def setListFromLoD(self, lod: list) -> list:
+        """
+        set my entities from the given list of dicts and bump my data version
+        """
+        entities = super().setListFromLoD(lod)  # type: ignore[misc]
+        self.bumpDataVersion()
+        return entities
+
+    def storeLoD(self, listOfDicts: list, *args, **kwargs) -> str:
+        """
+        store the given list of dicts and bump my data version
+        """
+        result = super().storeLoD(listOfDicts, *args, **kwargs)  # type: ignore[misc]
+        self.bumpDataVersion()
+        return result
+
+    def upsert(
+        self: UpsertableEntityManager,
+        entities: list,
+        deleteColumn: str | None = None,
+        deleteValues: list | None = None,
+        cacheFile: str | None = None,
+    ) -> int | None:
+        """
+        insert or replace the rows of the given entities in a single transaction
+        optionally deleting the rows with the given values in the given column first
+
+        Args:
+            entities(list): the new or changed entities to write
+            deleteColumn(str): the column for deleting obsolete rows e.g. the volume number of papers
+            deleteValues(list): the values of the rows to delete
+            cacheFile(str): the SQLite database - defaults to the cache file of my config
+
+        Returns:
+            int: the number of written rows or None if the table does not exist or does not have
+            the columns of the entities in which case the whole table needs to be stored
+        """
+        if cacheFile is None:
+            cacheFile = self.getCacheFile(config=self.config, mode=self.config.mode)
+        lod = [entity.__dict__ for entity in entities]
+        if self.handleInvalidListTypes:
+            LOD.handleListTypes(lod=lod, doFilter=self.filterInvalidListTypes, separator=self.listSeparator)
+        sqldb = SQLDB(cacheFile, errorDebug=self.config.errorDebug)
+        try:
+            rows = sqldb.c.execute(f"PRAGMA table_info({self.tableName})").fetchall()
+            columns = [row[1] for row in rows]
+            if self.primaryKey not in columns:
+                return None
+            columnSet = set(columns)
+            for record in lod:
+                for key, value in record.items():
+                    if key not in columnSet and isinstance(value, self.sqlTypes):
+                        # a new column - the table needs to be recreated
+                        return None
+            records = [{column: record.get(column) for column in columns} for record in lod]
+            columnList = ",".join(columns)
+            placeholders = ":" + ",:".join(columns)
+            with sqldb.c:
+                if deleteColumn is not None and deleteValues:
+                    sqldb.c.executemany(
+                        f"DELETE FROM {self.tableName} WHERE {deleteColumn}=?",
+                        [(value,) for value in deleteValues],
+                    )
+                # the primary key might not be declared as such in older tables
+                sqldb.c.executemany(
+                    f"DELETE FROM {self.tableName} WHERE {self.primaryKey}=?",
+                    [(record[self.primaryKey],) for record in records],
+                )
+                sqldb.c.executemany(
+                    f"INSERT INTO {self.tableName} ({columnList}) values ({placeholders})",
+                    records,
+                )
+        finally:
+            sqldb.close()
+        self.bumpDataVersion()
+        return len(records)
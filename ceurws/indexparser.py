@@ -4,9 +4,12 @@ Created on 11.08.2022
 @author: wf
 """
 
+import bisect
 import datetime
 import html
 import re
+from collections.abc import Iterator, Sequence
+from typing import Any
 
 from tqdm import tqdm
 
@@ -25,6 +28,13 @@ class ParserConfig:
         force_download: bool = False,
         verbose: bool = False,
         debug: bool = False,
+        fetch_workers: int = 4,
+        requests_per_second: float = 4.0,
+        parse_workers: int = 1,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        circuit_cooldown: float = 30.0,
+        html_parser: str | None = None,
     ):
         """
         Initializes the ParserConfig with a progress bar, volume threshold, and debug mode setting.
@@ -38,12 +48,32 @@ class ParserConfig:
             verbose(bool): if True give verbose feedback
             debug (bool, optional): Indicates whether debugging mode is enabled.
                 If True, additional debug information will be provided during parsing. Defaults to False.
+            fetch_workers(int): number of volume pages to fetch concurrently. Defaults to 4.
+            requests_per_second(float): maximum number of requests per second and host
+                when fetching volume pages - 0 for no limit. Defaults to 4.0.
+            parse_workers(int): number of processes for parsing the cached volume pages.
+                Defaults to 1 which parses in the current process.
+            max_retries(int): number of retries of a volume page fetch failing with a transient error.
+                Defaults to 3.
+            backoff_factor(float): maximum delay in seconds before the first retry which is doubled
+                for each further retry. Defaults to 0.5.
+            circuit_cooldown(float): number of seconds to pause fetching from a host
+                when its error rate spikes. Defaults to 30.0.
+            html_parser(str): the BeautifulSoup tree builder for the volume pages: lxml or html.parser.
+                Defaults to lxml if it is installed.
         """
         self.progress_bar = progress_bar
         self.down_to_volume = down_to_volume
         self.force_download = force_download
         self.verbose = verbose
         self.debug = debug
+        self.fetch_workers = fetch_workers
+        self.requests_per_second = requests_per_second
+        self.parse_workers = parse_workers
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.circuit_cooldown = circuit_cooldown
+        self.html_parser = html_parser
 
 
 class IndexHtmlParser(Textparser):
@@ -74,70 +104,24 @@ class IndexHtmlParser(Textparser):
             r""".*<a\s+href=[\'"]https?://ceur-ws.org/Vol-([0-9]+)[/]?[\'"]>([^<]*)</a>.*""",
             re.I | re.DOTALL,
         )
-        # Pre-compile patterns used in find and findVolume
-        self.thColspanPattern = re.compile(r"^.*<th\s*colspan", re.I)
-        self.trStartPattern = re.compile(r"^\s*<tr>", re.I)
-        self.trEndPattern = re.compile(r"^\s*</tr>", re.I)
-        # Pre-compile patterns used in setVolumeTitle
-        self.editedByPattern = re.compile("Edited by:")
-        self.tdBgColorPattern = re.compile("<td bgcolor", re.I)
-
-    def find(self, startLine: int, compiledPattern, step: int = 1) -> int | None:
-        """
-        find the next line with the given compiled regular expression pattern
-
-        Args:
-            startLine(int): index of the line to start search
-            compiledPattern(re.Pattern): the compiled regular expression pattern to search for
-            step(int): the steps to take e.g. +1 for forward -1 for backwards
-
-        Return:
-            int: the line number of the line or None if nothing was found
-        """
-        lineNo = startLine
-        while 0 < lineNo < len(self.lines) + 1:
-            line = self.lines[lineNo - 1]
-            if compiledPattern.match(line):
-                return lineNo
-            lineNo += step
-        return None
-
-    def findVolume(
-        self,
-        volCount: int,
-        startLine: int,
-        expectedTr: int = 3,
-        progress: int = 10,
-    ) -> tuple[int | None, int | None]:
-        """
-        find Volume lines from the given startLine
-
-        Args:
-            volCount(int): the volumeCount before the startLine
-            startLine(int): index of the line to search
-            expectedTr(int): number of <tr> tags expected
-            progress(int): how often to show the progress
-
-        Returns:
-            endLine of the volume html or None
-        """
-        trStartLine = self.find(startLine, self.thColspanPattern)
-        if trStartLine is not None:
-            lineNo = trStartLine + 1
-            trCount = 1
-            while lineNo < len(self.lines):
-                trLine = self.find(lineNo, self.trStartPattern)
-                if trLine is None:
-                    break
-                else:
-                    lineNo = trLine + 1
-                    trCount += 1
-                    if trCount == expectedTr:
-                        trEndLine = self.find(lineNo + 1, self.trEndPattern)
-                        if volCount % progress == 0 and self.config.verbose:
-                            print(f"volume count {volCount + 1:4}: lines {trStartLine:6}-{trEndLine:6}")
-                        return trStartLine, trEndLine
-        return None, None
+        # Pre-compile the info patterns
+        self.infoPrefixes = {
+            "URN:": "urn",
+            "ONLINE:": "url",
+            "ARCHIVE:": "archive",
+            "Edited by:": "editors",
+            "Submitted by:": "submittedBy",
+            "Published on CEUR-WS:": "pubDate",
+        }
+        self.infoPrefixTuple = tuple(self.infoPrefixes)
+        self.infoPatterns = {info: re.compile(rf"^\s*{prefix}(.*)") for prefix, info in self.infoPrefixes.items()}
+        # Pre-compile the patterns used by the tokenizer
+        self.mainTablePattern = re.compile(r'\s*<TABLE id="MAINTABLE"', re.I)
+        self.thColspanSearch = re.compile(r"<th\s*colspan", re.I)
+        self.volLinkSearch = re.compile(r"ceur-ws.org/Vol-[0-9]", re.I)
+        # line numbers of the info and volume link lines found by the tokenizer
+        self.tokenLines: list[int] = []
+        self.lineTokens: dict[int, tuple[str | None, bool]] = {}
 
     def setVolumeNumber(self, volume, href):
         """
@@ -169,38 +153,32 @@ class IndexHtmlParser(Textparser):
                     volName = Textparser.sanitize(volName)
                     volume["volname"] = volName
 
-    def setVolumeTitle(self, volume: dict, lineIndex: int):
+    def get_td_title(self, tdLines: list[str]) -> str:
         """
-        set the volume title
+        get the title from the given lines of the "<td bgcolor" cell
+        up to but not including the "Edited by:" line
 
         Args:
-            volume(dict): the volumeRecord to modify
-            lineIndex: where to start setting the volumeTitle
+            tdLines(list): the lines of the cell
+
+        Returns:
+            str: the unescaped title
         """
-        editedByLine = self.find(lineIndex, self.editedByPattern)
-        if editedByLine is not None:
-            tdLine = self.find(editedByLine, self.tdBgColorPattern, step=-1)
-            if tdLine is not None:
-                tdIndex = tdLine - 1
-                title = ""
-                delim = ""
-                while tdIndex < len(self.lines):
-                    line = self.lines[tdIndex]
-                    if line.startswith("Edited by:"):
-                        break
-                    for tag in [
-                        '<TD bgcolor="#FFFFFF">&nbsp;</TD><TD bgcolor="#FFFFFF">',
-                        '<TD bgcolor="#FFFFFF">',
-                        '<td bgcolor="#FFFFFF">',
-                        "<BR>",
-                        "<br>",
-                    ]:
-                        line = line.replace(tag, "")
-                    line = line.replace("\r", " ")
-                    title += line + delim
-                    delim = " "
-                    tdIndex += 1
-                volume["tdtitle"] = html.unescape(title).strip()
+        title = ""
+        delim = ""
+        for line in tdLines:
+            for tag in [
+                '<TD bgcolor="#FFFFFF">&nbsp;</TD><TD bgcolor="#FFFFFF">',
+                '<TD bgcolor="#FFFFFF">',
+                '<td bgcolor="#FFFFFF">',
+                "<BR>",
+                "<br>",
+            ]:
+                line = line.replace(tag, "")
+            line = line.replace("\r", " ")
+            title += line + delim
+            delim = " "
+        return html.unescape(title).strip()
 
     def setSeeAlsoVolumes(self, volume: dict, firstLine: int, lastLine: int):
         """
@@ -268,12 +246,216 @@ class IndexHtmlParser(Textparser):
                         infoValue = href.replace("https://nbn-resolving.org/", "")
             volume[info] = infoValue
 
-    def parseVolume(self, volCount: int, fromLine: int, toLine: int, verbose: bool):
+    def parse(self, vol_limit: int | None = None) -> dict[int, dict]:
         """
-        parse a volume from the given line range
+        parse my html code for Volume info
+        with a single pass tokenizer over my lines
+
+        Args:
+            vol_limit(int): the maximum number of volumes to parse
+
+        Returns:
+            dict: the volume records by volume number
+        """
+        volumes: dict[int, dict] = {}
+        for volume in self.iter_volumes(vol_limit):
+            volumes[volume["number"]] = volume
+        return volumes
+
+    def iter_volumes(self, vol_limit: int | None = None) -> Iterator[dict]:
+        """
+        iterate over the volume records of my html code
+        each record is yielded as soon as the <tr> block of the volume is closed.
+        The iteration stops at the first volume below config.down_to_volume
+        so that only the top of the index is read for recently added volumes.
+
+        Args:
+            vol_limit(int): the maximum number of volumes to parse
+
+        Yields:
+            dict: the volume records with a volume number in the order of the index
+        """
+        volCount = 0
+        blocks = self.iter_volume_blocks()
+        while not (vol_limit and volCount >= vol_limit):
+            block = next(blocks, None)
+            if block is None:
+                break
+            volStartLine, volEndLine, tdtitle = block
+            if volCount % 10 == 0 and self.config.verbose:
+                print(f"volume count {volCount + 1:4}: lines {volStartLine:6}-{volEndLine:6}")
+            volCount += 1
+            volume = self.parse_volume_block(
+                volCount,
+                volStartLine,
+                volEndLine,
+                tdtitle,
+                verbose=self.config.verbose,
+            )
+            if "number" in volume:
+                volume_number = volume["number"]
+                if volume_number < self.config.down_to_volume:
+                    break
+                if self.config.progress_bar is not None:
+                    self.config.progress_bar.update()
+                yield volume
+            else:
+                self.log(f"volume not found for volume at {volStartLine}")
+
+    def tokenize_line(self, lineNo: int, line: str) -> list[str]:
+        """
+        tokenize the given line remembering info and volume link lines
+
+        Args:
+            lineNo(int): the 1-based number of the line
+            line(str): the line
+
+        Returns:
+            list: the structural tokens "th", "tr", "/tr", "edited" and "td" of the line
+        """
+        stripped = line.lstrip()
+        info = None
+        if stripped.startswith(self.infoPrefixTuple):
+            for prefix, prefix_info in self.infoPrefixes.items():
+                if stripped.startswith(prefix):
+                    info = prefix_info
+                    break
+        is_link = self.volLinkSearch.search(line) is not None
+        if info is not None or is_link:
+            self.tokenLines.append(lineNo)
+            self.lineTokens[lineNo] = (info, is_link)
+        tokens = []
+        if self.thColspanSearch.search(line):
+            tokens.append("th")
+        if stripped[:1] == "<":
+            if stripped[:4].lower() == "<tr>":
+                tokens.append("tr")
+            elif stripped[:5].lower() == "</tr>":
+                tokens.append("/tr")
+            if line[:11].lower() == "<td bgcolor":
+                tokens.append("td")
+        elif line.startswith("Edited by:"):
+            tokens.append("edited")
+        return tokens
+
+    def iter_volume_blocks(self) -> Iterator[tuple[int, int, str | None]]:
+        """
+        single pass over my lines yielding the line range of each volume
+        as soon as it is known:
+
+        - a volume starts at the first "<th colspan" line after the start of the previous volume
+        - it ends at the first "</tr>" line at least two lines after the second "<tr>" line
+          following its start - the ranges of neighbouring volumes may overlap
+        - the tdtitle is taken from the "<td bgcolor" cell before the first "Edited by:" line
+          after the start which may be beyond the end of the volume
+
+        Yields:
+            tuple: fromLine, toLine and the tdtitle or None if there is none
+        """
+        self.tokenLines = []
+        self.lineTokens = {}
+        lineCount = len(self.lines)
+        tokenLines: dict[str, list[int]] = {"th": [], "tr": [], "/tr": [], "edited": []}
+        titles: dict[int, str | None] = {}
+        # start of the search for the next volume
+        searchLine: int | None = None
+        # the current "<td bgcolor" cell
+        tdLines: list[str] | None = None
+        tdTitle: str | None = None
+
+        def first(token: str, startLine: int, eof: bool) -> int | None | bool:
+            """
+            get the first line with the given token at or after startLine
+            False if it is not known yet
+            """
+            lines = tokenLines[token]
+            index = bisect.bisect_left(lines, startLine)
+            if index < len(lines):
+                return lines[index]
+            return None if eof else False
+
+        def resolve(eof: bool) -> Iterator[tuple[int, int, str | None]]:
+            """
+            yield the volumes that are fully known
+            """
+            nonlocal searchLine
+            while searchLine is not None:
+                if not searchLine < lineCount:
+                    searchLine = None
+                    break
+                trStartLine = first("th", searchLine, eof)
+                if trStartLine is False:
+                    break
+                if trStartLine is None or not trStartLine + 1 < lineCount:
+                    searchLine = None
+                    break
+                trLine = first("tr", trStartLine + 1, eof)
+                if trLine is False:
+                    break
+                if trLine is None or not trLine + 1 < lineCount:
+                    searchLine = None
+                    break
+                trLine = first("tr", trLine + 1, eof)
+                if trLine is False:
+                    break
+                trEndLine = first("/tr", trLine + 2, eof) if trLine is not None else None
+                if trEndLine is False:
+                    break
+                if trEndLine is None:
+                    searchLine = None
+                    break
+                editedByLine = first("edited", trStartLine, eof)
+                if editedByLine is False:
+                    break
+                tdtitle = titles.get(editedByLine) if editedByLine is not None else None
+                # synchronize on <tr><th and not on end since trailing TR might be missing
+                searchLine = trStartLine + 1
+                yield trStartLine, trEndLine, tdtitle
+
+        mainTableFound = False
+        for lineNo, line in enumerate(self.lines, start=1):
+            if not mainTableFound and self.mainTablePattern.match(line):
+                mainTableFound = True
+                searchLine = lineNo
+            tokens = self.tokenize_line(lineNo, line)
+            if "td" in tokens:
+                tdLines = []
+                tdTitle = None
+            elif "edited" in tokens:
+                if tdLines is not None and tdTitle is None:
+                    tdTitle = self.get_td_title(tdLines)
+                titles[lineNo] = tdTitle
+            if tdLines is not None and tdTitle is None:
+                tdLines.append(line)
+            resolvable = False
+            for token in tokens:
+                if token != "td":
+                    tokenLines[token].append(lineNo)
+                    # a volume is complete when its end and its "Edited by:" line are known
+                    resolvable = resolvable or token in ("/tr", "edited")
+            if resolvable and searchLine is not None:
+                yield from resolve(eof=False)
+                if searchLine is None:
+                    # the last volume has been found
+                    return
+        yield from resolve(eof=True)
+
+    def parse_volume_block(self, volCount: int, fromLine: int, toLine: int, tdtitle: str | None, verbose: bool):
+        """
+        parse a volume from the given line range using the tokens of iter_volume_blocks
+
+        Args:
+            volCount(int): the number of the volume in the index
+            fromLine(int): the line of the start of the volume
+            toLine(int): the line of the end of the volume
+            tdtitle(str): the title of the volume cell or None
+            verbose(bool): if True print the lines of the volume
+
+        Returns:
+            dict: the volume record
         """
         lineCount = toLine - fromLine
-        volume = {
+        volume: dict[str, Any] = {
             "fromLine": fromLine,
             "toLine": toLine,
             "valid": None,
@@ -282,65 +464,27 @@ class IndexHtmlParser(Textparser):
             "title": None,
             "loctime": None,
         }
-        self.setVolumeTitle(volume, fromLine)
+        if tdtitle is not None:
+            volume["tdtitle"] = tdtitle
         self.setSeeAlsoVolumes(volume, fromLine, toLine)
-
-        infoPattern = {}
-        infoMappings = [
-            ("URN", "urn"),
-            ("ONLINE", "url"),
-            ("ARCHIVE", "archive"),
-            ("Edited by", "editors"),
-            ("Submitted by", "submittedBy"),
-            ("Published on CEUR-WS", "pubDate"),
-        ]
-        for prefix, info in infoMappings:
-            infoPattern[info] = re.compile(rf"^\s*{prefix}:(.*)")
-        for lineIndex in range(fromLine, toLine):
-            line = self.lines[lineIndex]
-            for info, pattern in infoPattern.items():
-                self.getInfo(volume, info, pattern, line)
-            self.setVolumeName(volume, line)
+        lineNos: Sequence[int]
+        if verbose:
+            lineNos = range(fromLine + 1, toLine + 1)
+        else:
+            # only the lines with info or volume link tokens
+            start = bisect.bisect_right(self.tokenLines, fromLine)
+            end = bisect.bisect_right(self.tokenLines, toLine)
+            lineNos = self.tokenLines[start:end]
+        for lineNo in lineNos:
+            line = self.lines[lineNo - 1]
+            info, is_link = self.lineTokens.get(lineNo, (None, False))
+            if info is not None:
+                self.getInfo(volume, info, self.infoPatterns[info], line)
+            if is_link:
+                self.setVolumeName(volume, line)
             if verbose:
                 print(line)
         volumeNumber = volume.get("number", "?")
         acronym = volume.get("acronym", "?")
         self.log(f"{volumeNumber:4}-{volCount:4}:{fromLine}+{lineCount} {acronym}")
         return volume
-
-    def parse(self, vol_limit: int | None = None):
-        """
-        parse my html code for Volume info
-        """
-        # Compile the regex pattern right before its usage
-        mainTablePattern = re.compile(r'\s*<TABLE id="MAINTABLE"', re.I)
-        lineNo = self.find(1, mainTablePattern)
-        volCount = 0
-        volumes = {}
-        while self.lines and lineNo and lineNo < len(self.lines):
-            if vol_limit and volCount >= vol_limit:
-                break
-            expectedTr = 3
-            volStartLine, volEndLine = self.findVolume(volCount, lineNo, expectedTr=expectedTr)
-            if volStartLine is None or volEndLine is None:
-                break
-            else:
-                volCount += 1
-                volume = self.parseVolume(
-                    volCount,
-                    volStartLine,
-                    volEndLine,
-                    verbose=self.config.verbose,
-                )
-                # synchronize on <tr><th and not on end since trailing TR might be missing
-                lineNo = volStartLine + 1
-                if "number" in volume:
-                    volume_number = volume["number"]
-                    if volume_number < self.config.down_to_volume:
-                        break
-                    volumes[volume_number] = volume
-                    if self.config.progress_bar is not None:
-                        self.config.progress_bar.update()
-                else:
-                    self.log(f"volume not found for volume at {volStartLine}")
-        return volumes
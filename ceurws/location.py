@@ -6,8 +6,7 @@ Created on 2023-07-15
 
 import sys
 
-from geograpy.locator import LocationContext
-from geograpy.nominatim import NominatimWrapper
+from ceurws.resources import ResourceRegistry, get_geograpy_locator, get_location_context
 
 
 class LocationLookup:
@@ -43,10 +42,11 @@ class LocationLookup:
         Constructor for LocationLookup.
         """
         LocationLookup.initPredefinedLocations()
-        self.locationContext = LocationContext.fromCache()
-        cacheRootDir = LocationContext.getDefaultConfig().cacheRootDir
+        self.locationContext = get_location_context()
+        cacheRootDir = get_geograpy_locator().LocationContext.getDefaultConfig().cacheRootDir
         cacheDir = f"{cacheRootDir}/.nominatim"
-        self.nominatimWrapper = NominatimWrapper(cacheDir=cacheDir)
+        nominatim = ResourceRegistry.get("geograpy.nominatim")
+        self.nominatimWrapper = nominatim.NominatimWrapper(cacheDir=cacheDir)
 
     def getCityByWikiDataId(self, wikidataID: str):
         """
@@ -12,7 +12,7 @@ from pathlib import Path
 import yaml
 from tabulate import tabulate
 
-from ceurws.ceur_ws import CEURWS
+from ceurws.config import CEURWS
 
 
 class LoctimeParser:
@@ -48,16 +48,37 @@ class LoctimeParser:
             self.file_path = Path(filepath)
         self.lookups = self.load()
         self.setup()
+        self.reset_counters()
+
+        # Compile a pattern to match a 4-digit year
+        self.year_pattern = re.compile(r"\b\d{4}\b")
+
+    def reset_counters(self):
+        """
+        reset the counters and the total count of processed loctimes
+        """
         self.counters: dict[str, Counter] = {"4digit-year": Counter()}
         for reverse_pos in range(1, 8):
             self.counters[str(reverse_pos)] = Counter()
         for key in self.lookups:
             self.counters[key] = Counter()
-
-        # Compile a pattern to match a 4-digit year
-        self.year_pattern = re.compile(r"\b\d{4}\b")
         self.total_loctimes = 0
 
+    def merge_counters(self, counters: dict[str, dict[str, int]], total_loctimes: int):
+        """
+        merge the given counters e.g. from a parser running in a worker process
+        into my counters
+
+        Args:
+            counters(dict): counts by part for each counter category
+            total_loctimes(int): the number of loctimes the counts are based on
+        """
+        for category, counts in counters.items():
+            if category not in self.counters:
+                self.counters[category] = Counter()
+            self.counters[category].update(counts)
+        self.total_loctimes += total_loctimes
+
     def setup(self):
         """
         Prepares the parser by initializing multi-word handling and creating
@@ -0,0 +1,184 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import datetime
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from ceurws.config import CEURWS
+
+
+class LoctimeCache:
+    """
+    bounded least recently used cache of resolved loctime strings
+    e.g. "Vienna, Austria, July 25th, 2022" → city, country, wikidata ids and date range
+
+    many volumes share the same loctime so that the expensive geograpy location lookup
+    and the date parsing only need to be done once per distinct loctime
+    the cache can be persisted to a table of the SQLite cache file
+    """
+
+    dateKeys = ("dateFrom", "dateTo")
+
+    def __init__(
+        self,
+        maxsize: int = 20000,
+        db_path: Path | None = None,
+        table_name: str = "loctime_cache",
+    ):
+        """
+        constructor
+
+        Args:
+            maxsize: the maximum number of cached loctimes
+            db_path: the SQLite database - defaults to the ceurws.db cache file
+            table_name: the name of the cache table
+        """
+        self.maxsize = maxsize
+        self.db_path = Path(db_path) if db_path is not None else CEURWS.CACHE_FILE
+        self.table_name = table_name
+        self.entries: OrderedDict[str, dict] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(loctime: str) -> str:
+        """
+        normalize the given loctime to be used as cache key
+
+        Args:
+            loctime: the loctime string
+
+        Returns:
+            str: the loctime with collapsed whitespace and without trailing dots
+        """
+        return " ".join(loctime.split()).strip(" .")
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, loctime: str) -> dict | None:
+        """
+        get the resolved values of the given loctime
+
+        Args:
+            loctime: the loctime string
+
+        Returns:
+            dict: a copy of the resolved values or None if the loctime is not cached
+        """
+        key = self.normalize(loctime)
+        with self.lock:
+            values = self.entries.get(key)
+            if values is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return dict(values)
+
+    def put(self, loctime: str, values: dict):
+        """
+        cache the resolved values of the given loctime
+        evicting the least recently used loctime if the cache is full
+
+        Args:
+            loctime: the loctime string
+            values: the resolved values e.g. city, countryWikidataId and dateFrom
+        """
+        key = self.normalize(loctime)
+        with self.lock:
+            self.entries[key] = dict(values)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def get_stats(self) -> dict:
+        """
+        get the cache statistics
+
+        Returns:
+            dict: hits, misses, hit_rate and size
+        """
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups if lookups else 0.0
+        stats = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": hit_rate,
+            "size": len(self.entries),
+        }
+        return stats
+
+    def show_stats(self):
+        """
+        show the cache statistics
+        """
+        stats = self.get_stats()
+        print(
+            f"loctime cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%} hit rate) for {stats['size']} distinct loctimes"
+        )
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        connect to the database creating the cache table if necessary
+        """
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        with connection:
+            connection.execute(
+                f"""CREATE TABLE IF NOT EXISTS {self.table_name}(
+  loctime TEXT PRIMARY KEY,
+  resolved TEXT NOT NULL
+)"""
+            )
+        return connection
+
+    def load(self) -> int:
+        """
+        load the persisted cache entries in least recently used order
+
+        Returns:
+            int: the number of loaded entries
+        """
+        connection = self.connect()
+        try:
+            rows = connection.execute(f"SELECT loctime, resolved FROM {self.table_name} ORDER BY rowid").fetchall()
+        finally:
+            connection.close()
+        for loctime, resolved in rows:
+            values = json.loads(resolved)
+            for key in self.dateKeys:
+                if values.get(key) is not None:
+                    values[key] = datetime.date.fromisoformat(values[key])
+            self.put(loctime, values)
+        return len(rows)
+
+    def save(self) -> int:
+        """
+        persist the cache entries replacing the previously persisted ones
+
+        Returns:
+            int: the number of saved entries
+        """
+        with self.lock:
+            rows = [(loctime, json.dumps(values, default=str)) for loctime, values in self.entries.items()]
+        connection = self.connect()
+        try:
+            with connection:
+                connection.execute(f"DELETE FROM {self.table_name}")
+                connection.executemany(
+                    f"INSERT INTO {self.table_name}(loctime, resolved) VALUES (?, ?)",
+                    rows,
+                )
+        finally:
+            connection.close()
+        return len(rows)
@@ -6,7 +6,9 @@ refactored 2024-03-09 by wf
 """
 
 from dataclasses import field
+from typing import Any
 
+import orjson
 from basemkit.yamlable import lod_storable
 
 
@@ -68,3 +70,40 @@ class DblpProceeding:
             for i, paper in enumerate(self.papers):
                 if isinstance(paper, dict):
                     self.papers[i] = DblpPaper(**paper)
+
+
+# field names by lod_storable class
+_field_names: dict[type, tuple[str, ...]] = {}
+
+
+def lod_storable_default(obj: Any) -> dict:
+    """
+    orjson default function for lod_storable instances
+
+    orjson serializes dataclasses natively but does not recognize the subclass created by
+    the lod_storable decorator so the fields are returned as a shallow dict - nested
+    instances are passed to this function again by orjson
+
+    Raises:
+        TypeError: if the object is not a dataclass instance
+    """
+    cls = type(obj)
+    names = _field_names.get(cls)
+    if names is None:
+        fields = getattr(cls, "__dataclass_fields__", None)
+        if fields is None:
+            raise TypeError(f"Type is not JSON serializable: {cls.__name__}")
+        names = tuple(fields)
+        _field_names[cls] = names
+    return {name: getattr(obj, name) for name in names}
+
+
+def dumps(records: Any) -> bytes:
+    """
+    serialize the given dblp records directly to JSON bytes
+    giving the same result as the to_json() of the records
+
+    Args:
+        records: a DblpScholar, DblpPaper or DblpProceeding or a list of them
+    """
+    return orjson.dumps(records, default=lod_storable_default)
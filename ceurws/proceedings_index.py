@@ -0,0 +1,281 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import time
+
+from lodstorage.sql import SQLDB
+
+
+class ProceedingsIndex:
+    """
+    in memory index of the CEUR-WS proceedings records of the Proceedings table
+    that WikidataSync.update pulls from Wikidata
+
+    the index answers the existence checks for proceedings, their events and their
+    property values without a network round trip as long as the snapshot is fresh
+
+    only positive hits are answered - a key missing from the snapshot might have been
+    created on Wikidata since the last update and needs a live query
+    """
+
+    # the Proceedings table columns of the proceedings properties
+    columnsByProperty = {
+        "P1476": "title",
+        "P1813": "short_name",
+        "P407": "language_of_work_or_name",
+        "P4109": "URN_NBN",
+        "P4745": "event",
+        "P577": "publication_date",
+        "P6721": "ppnId",
+        "P856": "homePage",
+        "P8978": "dblpProceedingsId",
+        "P953": "fullWorkUrl",
+        "P973": "described_at_URL",
+    }
+    entityPrefix = "http://www.wikidata.org/entity/"
+    metaTableName = "ProceedingsUpdated"
+
+    def __init__(self, records: list[dict] | None = None, updated: float | None = None, max_age: float = 86400):
+        """
+        constructor
+
+        Args:
+            records: the proceedings records
+            updated: the timestamp of the snapshot - None if unknown
+            max_age: the number of seconds after which the snapshot is stale
+        """
+        self.updated = updated
+        self.max_age = max_age
+        self.recordsByVolnumber: dict[int, list[dict]] = {}
+        self.recordsByUrn: dict[str, dict] = {}
+        self.recordsByQid: dict[str, dict] = {}
+        self.recordsByEventQid: dict[str, list[dict]] = {}
+        # keys that changed since the snapshot and need a live query
+        self.invalidVolnumbers: set[int] = set()
+        self.invalidUrns: set[str] = set()
+        self.invalidQids: set[str] = set()
+        for record in records or []:
+            self.add(record)
+
+    @classmethod
+    def toQid(cls, value: str | None) -> str | None:
+        """
+        get the Qid of the given entity url
+        """
+        if value is None:
+            return None
+        return value[len(cls.entityPrefix) :] if value.startswith(cls.entityPrefix) else value
+
+    @staticmethod
+    def getVolnumber(record: dict) -> int | None:
+        """
+        get the volume number of the given proceedings record from the qualifier or the direct property
+        """
+        for key in ["sVolume", "Volume"]:
+            value = record.get(key)
+            if value is not None:
+                try:
+                    return int(value)
+                except ValueError:
+                    pass
+        return None
+
+    @classmethod
+    def getEventQids(cls, record: dict) -> list[str]:
+        """
+        get the Qids of the events of the given proceedings record
+        """
+        events = record.get("event")
+        if not events:
+            return []
+        eventQids = [cls.toQid(event) for event in str(events).split("|") if event]
+        return [eventQid for eventQid in eventQids if eventQid is not None]
+
+    def add(self, record: dict):
+        """
+        add the given proceedings record to the index
+        """
+        volnumber = self.getVolnumber(record)
+        if volnumber is not None:
+            self.recordsByVolnumber.setdefault(volnumber, []).append(record)
+        urn = record.get("URN_NBN")
+        if urn:
+            self.recordsByUrn[urn] = record
+        qid = self.toQid(record.get("item"))
+        if qid:
+            self.recordsByQid[qid] = record
+        for eventQid in self.getEventQids(record):
+            self.recordsByEventQid.setdefault(eventQid, []).append(record)
+
+    def __len__(self) -> int:
+        return len(self.recordsByQid)
+
+    def isFresh(self) -> bool:
+        """
+        check whether the snapshot is younger than max_age
+        """
+        return self.updated is not None and time.time() - self.updated < self.max_age
+
+    def invalidate(self, volnumber: int | None = None, urn: str | None = None, qid: str | None = None):
+        """
+        mark the given keys as changed since the snapshot e.g. after adding items to Wikidata
+        """
+        if volnumber is not None:
+            self.invalidVolnumbers.add(volnumber)
+        if urn is not None:
+            self.invalidUrns.add(urn)
+        if qid is not None:
+            self.invalidQids.add(qid)
+
+    def canAnswerVolume(self, volnumber: int) -> bool:
+        """
+        check whether the lookups for the given volume number can be answered from the index
+
+        only volumes with proceedings in the snapshot are answered
+        """
+        return self.isFresh() and volnumber in self.recordsByVolnumber and volnumber not in self.invalidVolnumbers
+
+    def canAnswerUrn(self, urn: str) -> bool:
+        """
+        check whether the lookups for the given URN can be answered from the index
+
+        only URNs of proceedings in the snapshot are answered
+        """
+        return self.isFresh() and urn in self.recordsByUrn and urn not in self.invalidUrns
+
+    def canAnswerItem(self, qid: str) -> bool:
+        """
+        check whether the property lookups for the given proceedings item can be answered from the index
+
+        only proceedings items are indexed - other items always need a live query
+        """
+        return self.isFresh() and qid in self.recordsByQid and qid not in self.invalidQids
+
+    def getQidByVolnumber(self, volnumber: int) -> str | None:
+        """
+        get the Qid of the proceedings of the given volume - None if it is missing or not unique
+        """
+        records = self.recordsByVolnumber.get(volnumber, [])
+        qids = {self.toQid(record.get("item")) for record in records}
+        if len(qids) > 1:
+            print(f"CEUR-WS volume number {volnumber} is not unique")
+            return None
+        return qids.pop() if qids else None
+
+    def getEventQidsByVolnumber(self, volnumber: int) -> list[str]:
+        """
+        get the Qids of the events of the proceedings of the given volume
+        """
+        eventQids = []
+        for record in self.recordsByVolnumber.get(volnumber, []):
+            eventQids.extend(self.getEventQids(record))
+        return eventQids
+
+    def getProceedingUrlsByUrn(self, urn: str) -> list[str]:
+        """
+        get the entity urls of the proceedings with the given URN
+        """
+        record = self.recordsByUrn.get(urn)
+        item = record.get("item") if record is not None else None
+        return [item] if item is not None else []
+
+    def hasPropertyValue(self, qid: str, propertyId: str) -> bool | None:
+        """
+        check whether the given proceedings item has a value for the given property
+
+        Returns:
+            bool: True if a value exists or None if the property is not part of the Proceedings table
+        """
+        column = self.columnsByProperty.get(propertyId)
+        if column is None:
+            return None
+        record = self.recordsByQid.get(qid, {})
+        return bool(record.get(column))
+
+    @staticmethod
+    def createVolumeIndices(sqldb: SQLDB) -> list[str]:
+        """
+        create the SQL indices on the volume number columns of the Proceedings table
+
+        Args:
+            sqldb: the database with the Proceedings table
+
+        Returns:
+            list: the volume number columns of the table - empty if the table does not exist
+        """
+        rows = sqldb.c.execute("PRAGMA table_info(Proceedings)").fetchall()
+        columns = {row[1] for row in rows}
+        volumeColumns = [column for column in ["sVolume", "Volume"] if column in columns]
+        with sqldb.c:
+            for column in volumeColumns:
+                sqldb.c.execute(f"CREATE INDEX IF NOT EXISTS Proceedings_{column} ON Proceedings({column})")
+        return volumeColumns
+
+    @staticmethod
+    def queryVolume(sqldb: SQLDB, volnumber: int, volumeColumns: list[str]) -> dict | None:
+        """
+        get the proceedings record of the given volume with an indexed query
+
+        the volume number of the P179/P478 qualifier (sVolume) is used and
+        the P478 property (Volume) as fallback
+
+        Args:
+            sqldb: the database with the Proceedings table
+            volnumber: the number of the volume
+            volumeColumns: the volume number columns see createVolumeIndices
+
+        Returns:
+            dict: the proceedings record or None if there is none
+        """
+        conditions = []
+        params: list = []
+        if "sVolume" in volumeColumns:
+            conditions.append("sVolume=?")
+            params.append(volnumber)
+        if "Volume" in volumeColumns:
+            fallback = "(sVolume IS NULL AND Volume=?)" if "sVolume" in volumeColumns else "Volume=?"
+            conditions.append(fallback)
+            params.append(str(volnumber))
+        if not conditions:
+            return None
+        # the last record wins as in the former lookup dict
+        sqlQuery = f"SELECT * FROM Proceedings WHERE {' OR '.join(conditions)} ORDER BY rowid DESC LIMIT 1"
+        records = sqldb.query(sqlQuery, tuple(params))
+        return records[0] if records else None
+
+    @classmethod
+    def storeUpdated(cls, sqldb: SQLDB, updated: float | None = None):
+        """
+        store the timestamp of the Proceedings table snapshot
+        """
+        updated = updated if updated is not None else time.time()
+        with sqldb.c:
+            sqldb.c.execute(f"CREATE TABLE IF NOT EXISTS {cls.metaTableName}(updated REAL)")
+            sqldb.c.execute(f"DELETE FROM {cls.metaTableName}")
+            sqldb.c.execute(f"INSERT INTO {cls.metaTableName}(updated) VALUES (?)", (updated,))
+
+    @classmethod
+    def fromSqlDB(cls, sqldb: SQLDB, max_age: float = 86400) -> "ProceedingsIndex":
+        """
+        create the index from the Proceedings table of the given database
+
+        Args:
+            sqldb: the database with the Proceedings table
+            max_age: the number of seconds after which the snapshot is stale
+
+        Returns:
+            ProceedingsIndex: the index - empty and stale if the table does not exist
+        """
+        rows = sqldb.c.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
+        tableNames = {row[0] for row in rows}
+        if "Proceedings" not in tableNames:
+            return cls(max_age=max_age)
+        records = sqldb.query("SELECT * FROM Proceedings")
+        updated = None
+        if cls.metaTableName in tableNames:
+            row = sqldb.c.execute(f"SELECT updated FROM {cls.metaTableName}").fetchone()
+            updated = row[0] if row else None
+        return cls(records, updated=updated, max_age=max_age)
@@ -0,0 +1,212 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import base64
+import bisect
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+import orjson
+
+
+class RecordPager:
+    """
+    cursor based pagination, field selection and NDJSON streaming
+    of the records of a list sorted by a unique key
+
+    the cursor is the opaque encoded key of the last record of a page so that
+    the next page starts right after it even if records have been added meanwhile
+    """
+
+    def __init__(self, key: str, max_limit: int = 10000):
+        """
+        constructor
+
+        Args:
+            key: the name of the unique key attribute e.g. "number" of volumes or "id" of papers
+            max_limit: the maximum number of records per page
+        """
+        self.key = key
+        self.max_limit = max_limit
+        self.sorted_records: tuple[int | None, list, list] | None = None
+
+    @staticmethod
+    def encode_cursor(value: Any) -> str:
+        """
+        encode the given key value as an url safe cursor
+        """
+        return base64.urlsafe_b64encode(orjson.dumps(value)).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Any:
+        """
+        decode the given cursor
+
+        Raises:
+            ValueError: if the cursor is invalid
+        """
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            return orjson.loads(base64.urlsafe_b64decode(cursor + padding))
+        except (ValueError, orjson.JSONDecodeError) as ex:
+            raise ValueError(f"invalid cursor {cursor}") from ex
+
+    @staticmethod
+    def parse_fields(fields: str | None) -> list[str] | None:
+        """
+        parse the given comma separated field list
+
+        Returns:
+            list: the field names or None for all fields
+        """
+        if not fields:
+            return None
+        return [field.strip() for field in fields.split(",") if field.strip()]
+
+    @staticmethod
+    def get_value(record: Any, name: str) -> Any:
+        """
+        get the value of the given field of the given dict or object record
+        """
+        if isinstance(record, dict):
+            return record.get(name)
+        return getattr(record, name, None)
+
+    @staticmethod
+    def select(record: Any, fields: list[str] | None = None) -> dict:
+        """
+        get the given fields of the given dict or object record as a dict
+
+        Args:
+            record: a dict or an object e.g. a Volume or Paper
+            fields: the fields to select - None for all public fields
+        """
+        if isinstance(record, dict):
+            source = record
+        else:
+            source = {name: value for name, value in vars(record).items() if not name.startswith("_")}
+        if fields is None:
+            return dict(source)
+        return {field: source.get(field) for field in fields}
+
+    def check_limit(self, limit: int | None) -> int | None:
+        """
+        check the given page size
+
+        Raises:
+            ValueError: if the limit is not positive or too large
+        """
+        if limit is not None and not 0 < limit <= self.max_limit:
+            raise ValueError(f"limit must be between 1 and {self.max_limit}")
+        return limit
+
+    def prepare(self, records: list, version: int | None = None) -> tuple[list, list]:
+        """
+        sort the given records by my key - the sorted order is reused as long as the version is unchanged
+        records without a key value are not paged
+
+        Args:
+            records: the records to sort
+            version: the data version of the records e.g. the dataVersion of their manager - None to sort every time
+
+        Returns:
+            tuple: the sorted keys and the sorted records
+        """
+        # a single tuple so that concurrent requests see consistent keys and records
+        sorted_records = self.sorted_records
+        if version is None or sorted_records is None or sorted_records[0] != version:
+            keyed = [(self.get_value(record, self.key), record) for record in records]
+            keyed = [(key, record) for key, record in keyed if key is not None]
+            keyed.sort(key=lambda pair: pair[0])
+            sorted_records = (version, [key for key, _record in keyed], [record for _key, record in keyed])
+            if version is not None:
+                self.sorted_records = sorted_records
+        return sorted_records[1], sorted_records[2]
+
+    def position_after(self, keys: list, cursor: str | None) -> int:
+        """
+        get the position of the first record after the given cursor in the given sorted keys
+
+        Raises:
+            ValueError: if the cursor is invalid or its key is not of the type of my keys
+        """
+        if cursor is None:
+            return 0
+        after = self.decode_cursor(cursor)
+        if keys and not isinstance(after, type(keys[0])):
+            raise ValueError(f"invalid cursor {cursor} - the {self.key} must be a {type(keys[0]).__name__}")
+        try:
+            return bisect.bisect_right(keys, after)
+        except TypeError as ex:
+            raise ValueError(f"invalid cursor {cursor}") from ex
+
+    def iter_records(
+        self,
+        records: list,
+        cursor: str | None = None,
+        limit: int | None = None,
+        fields: list[str] | None = None,
+        version: int | None = None,
+    ) -> Iterator[dict]:
+        """
+        iterate over the selected fields of the records after the given cursor
+        the cursor is checked before the iteration starts
+
+        Args:
+            records: the records to page
+            cursor: the cursor of the previous page - None for the first page
+            limit: the maximum number of records - None for all
+            fields: the fields to select - None for all public fields
+            version: the data version of the records see prepare
+
+        Raises:
+            ValueError: if the cursor is invalid
+        """
+        keys, sorted_records = self.prepare(records, version)
+        start = self.position_after(keys, cursor)
+        end = len(sorted_records) if limit is None else min(len(sorted_records), start + limit)
+        return (self.select(record, fields) for record in sorted_records[start:end])
+
+    def page(
+        self,
+        records: list,
+        cursor: str | None = None,
+        limit: int = 100,
+        fields: list[str] | None = None,
+        version: int | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """
+        get a page of the given records
+
+        Args:
+            records: the records to page
+            cursor: the cursor of the previous page - None for the first page
+            limit: the number of records per page
+            fields: the fields to select - None for all public fields
+            version: the data version of the records see prepare
+
+        Returns:
+            tuple: the selected records of the page and the cursor of the next page - None for the last page
+
+        Raises:
+            ValueError: if the cursor or the limit is invalid
+        """
+        self.check_limit(limit)
+        keys, sorted_records = self.prepare(records, version)
+        start = self.position_after(keys, cursor)
+        end = min(len(sorted_records), start + limit)
+        items = [self.select(record, fields) for record in sorted_records[start:end]]
+        # the key of the last record - the key field might not be selected
+        next_cursor = self.encode_cursor(keys[end - 1]) if items and end < len(keys) else None
+        return items, next_cursor
+
+    @staticmethod
+    def to_ndjson(records: Iterable[dict]) -> Iterator[bytes]:
+        """
+        encode the given records as newline delimited JSON lines
+        """
+        for record in records:
+            yield orjson.dumps(record, default=str) + b"\n"
@@ -0,0 +1,412 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import argparse
+import gzip
+import hashlib
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+from ceurws.config import CEURWS
+from ceurws.volume_page_store import DirectoryVolumePageStore, SqliteVolumePageStore, VolumePageStore
+from ceurws.volumeparser import VolumePageCache
+
+
+class ReplayCorpus:
+    """
+    synthetic fixture corpus of an index.html and volume pages in the ceur-ws.org layout
+    """
+
+    @staticmethod
+    def make_index_html(numbers: list[int]) -> str:
+        """
+        make an index.html with an entry for each of the given volume numbers
+
+        Args:
+            numbers: the volume numbers in the order of the index - usually descending
+
+        Returns:
+            str: the html of the index page
+        """
+        lines = ["<html>", '<td bgcolor="#FFFFFF">header', '<TABLE id="MAINTABLE" width="100%">']
+        for number in numbers:
+            lines.append(f'<tr><th colspan="3" align="left"><a name="Vol-{number}">Vol-{number}</a></th></tr>')
+            lines.append("<tr>")
+            lines.append(f'<td bgcolor="#FFFFFF"><a href="https://ceur-ws.org/Vol-{number}/">WS{number} 2020</a>')
+            lines.append(f"Proceedings of the Workshop {number} &amp; more<BR>")
+            lines.append(f"co-located with Conference {number}<br>")
+            lines.append(f"Vienna, Austria, March {number % 28 + 1}, 2020.<br>")
+            lines.append(f"Edited by: Alice {number}, Bob<br>")
+            lines.append(f"  Submitted by: Alice {number}<br>")
+            lines.append(f"Published on CEUR-WS: {number % 28 + 1:02d}-Apr-2020<br>")
+            lines.append(
+                f'ONLINE: <a href="https://ceur-ws.org/Vol-{number}/">https://ceur-ws.org/Vol-{number}/</a><br>'
+            )
+            lines.append(f'URN: <a href="https://nbn-resolving.org/urn:nbn:de:0074-{number}-1">urn</a><br>')
+            lines.append("</td>")
+            lines.append("</tr>")
+            lines.extend(["<tr>", "<td>&nbsp;</td>", "</tr>"])
+        lines.append("</TABLE>")
+        lines.append("</html>")
+        return "\n".join(lines)
+
+    @staticmethod
+    def make_volume_html(number: int, papers: int = 10) -> str:
+        """
+        make the volume page of the given volume number with the given number of papers
+        """
+        toc = []
+        for index in range(1, papers + 1):
+            toc.append(
+                f'<li id="paper{index}"><a href="paper{index}.pdf">'
+                f'<span class="CEURTITLE">Paper {index} of Workshop {number}</span></a>\n'
+                f'<span class="CEURPAGES">{index * 10 - 9}-{index * 10}</span><br>\n'
+                f'<span class="CEURAUTHOR">Alice {index}</span>, <span class="CEURAUTHOR">Bob {number}</span></li>'
+            )
+        toc_html = "\n".join(toc)
+        html = f"""<html><head><title>CEUR-WS.org/Vol-{number} - Workshop {number}</title></head>
+<body>
+<h1><a href="https://ws{number}.example.org">WS{number} 2020</a><br>
+Workshop {number}</h1>
+<h3><span class="CEURLOCTIME">Vienna, Austria, March {number % 28 + 1}, 2020</span>.</h3>
+<div class="CEURTOC"><ul>
+{toc_html}
+</ul></div></body></html>"""
+        return html
+
+    @classmethod
+    def generate(
+        cls,
+        location: Path,
+        volumes: int = 100,
+        papers: int = 10,
+        index_path: Path | None = None,
+    ) -> DirectoryVolumePageStore:
+        """
+        generate a corpus of the given number of volumes in the VolumePageCache directory layout
+
+        Args:
+            location: the directory of the volume pages
+            volumes: the number of volumes - numbered from volumes down to 1
+            papers: the number of papers per volume
+            index_path: the path of the index.html - default: index.html in the location directory
+
+        Returns:
+            DirectoryVolumePageStore: the store of the generated volume pages
+        """
+        store = DirectoryVolumePageStore(location)
+        numbers = list(range(volumes, 0, -1))
+        for number in numbers:
+            store.put(number, cls.make_volume_html(number, papers))
+        if index_path is None:
+            index_path = Path(location) / "index.html"
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        index_path.write_text(cls.make_index_html(numbers), encoding="utf-8")
+        return store
+
+    @classmethod
+    def get_location(cls, location: Path | None = None) -> Path:
+        """
+        get the directory to generate a corpus in - never the live VolumePageCache directory
+
+        Args:
+            location: the requested directory - default: a new temporary directory
+
+        Returns:
+            Path: the directory for the generated corpus
+
+        Raises:
+            ValueError: if the location is the directory of the cached ceur-ws.org volume pages
+        """
+        if location is None:
+            return Path(tempfile.mkdtemp(prefix="ceurws-replay-"))
+        if Path(location).resolve() == Path(VolumePageCache.cache_location).resolve():
+            raise ValueError(f"refusing to overwrite the cached volume pages in {location} with a generated corpus")
+        return Path(location)
+
+
+class ReplayRequestHandler(BaseHTTPRequestHandler):
+    """
+    keep-alive handler replaying the pages of a ReplayServer
+    """
+
+    protocol_version = "HTTP/1.1"
+    vol_path_pattern = re.compile(r"^/Vol-([0-9]+)(/|/index\.html)?$")
+
+    def do_GET(self):
+        replay: ReplayServer = self.server.replay  # type: ignore[attr-defined]
+        replay.count("requests")
+        fault = replay.inject_fault()
+        if fault == "drop":
+            # close the connection without a response
+            self.close_connection = True
+            return
+        if fault == "error":
+            self.send_body(replay.error_status, b"injected error", {"Retry-After": replay.retry_after})
+            return
+        path = urlparse(self.path).path
+        page = replay.get_page(path)
+        if page is None:
+            replay.count("not_found")
+            self.send_body(404, b"not found")
+            return
+        if isinstance(page, str):
+            page = page.encode("utf-8")
+        etag = f'"{hashlib.blake2b(page, digest_size=16).hexdigest()}"'
+        headers = {"ETag": etag, "Content-Type": "text/html; charset=utf-8"}
+        if self.headers.get("If-None-Match") == etag:
+            replay.count("not_modified")
+            self.send_body(304, b"", headers)
+            return
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            page = gzip.compress(page, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+        replay.count("served")
+        self.send_body(200, page, headers)
+
+    def send_body(self, status: int, body: bytes, headers: dict[str, str | None] | None = None):
+        """
+        send a response with the given status, body and headers
+        """
+        self.send_response(status)
+        if headers:
+            for name, value in headers.items():
+                if value is not None:
+                    self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        replay: ReplayServer = self.server.replay  # type: ignore[attr-defined]
+        if replay.debug:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class ReplayServer:
+    """
+    local HTTP server replaying the index.html and the Vol-N pages of a VolumePageCache
+    with configurable latency and error injection to benchmark and test
+    the fetch and parse pipeline offline
+
+    point CEURWS.URL at the url of the server e.g. with the CEURWS_URL environment variable
+    """
+
+    def __init__(
+        self,
+        store: VolumePageStore | None = None,
+        index_path: Path | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        retry_after: str | None = "0",
+        drop_rate: float = 0.0,
+        seed: int | None = None,
+        debug: bool = False,
+    ):
+        """
+        constructor
+
+        Args:
+            store: the store of the volume pages to replay - default: the store of the VolumePageCache
+            index_path: the path of the index.html to replay - default: CEURWS.CACHE_HTML
+            host: the host to bind to
+            port: the port to bind to - 0 picks a free port
+            latency: the number of seconds to delay each response
+            jitter: the maximum number of seconds of random delay added to the latency
+            error_rate: the fraction of requests to answer with the error_status
+            error_status: the HTTP status code of the injected errors
+            retry_after: the Retry-After header value of the injected errors - None for none
+            drop_rate: the fraction of requests whose connection is closed without a response
+            seed: the seed of the random fault injection and jitter
+            debug: if True log the requests
+        """
+        self.store = store if store is not None else VolumePageCache.get_store()
+        self.index_path = index_path if index_path is not None else CEURWS.CACHE_HTML
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.drop_rate = drop_rate
+        self.debug = debug
+        self.rnd = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats: Counter = Counter()
+        self.httpd = ThreadingHTTPServer((host, port), ReplayRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.replay = self  # type: ignore[attr-defined]
+        self.thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """
+        the base url of the server
+        """
+        host, port = self.httpd.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+    def count(self, name: str):
+        """
+        count a request of the given kind
+        """
+        with self.lock:
+            self.stats[name] += 1
+
+    def inject_fault(self) -> str | None:
+        """
+        delay the response by the configured latency and pick the fault to inject if any
+
+        Returns:
+            str: "drop", "error" or None
+        """
+        with self.lock:
+            delay = self.latency + (self.rnd.uniform(0, self.jitter) if self.jitter > 0 else 0.0)
+            roll = self.rnd.random()
+        if delay > 0:
+            time.sleep(delay)
+        fault = None
+        if roll < self.drop_rate:
+            fault = "drop"
+        elif roll < self.drop_rate + self.error_rate:
+            fault = "error"
+        if fault is not None:
+            self.count("dropped" if fault == "drop" else "errors")
+        return fault
+
+    def get_page(self, path: str) -> str | bytes | None:
+        """
+        get the page to replay for the given request path
+
+        Args:
+            path: the path of the request e.g. / /index.html /Vol-2436/
+
+        Returns:
+            the page or None if there is none
+        """
+        if path in ("", "/", "/index.html"):
+            if self.index_path.is_file():
+                return self.index_path.read_bytes()
+            return None
+        match = ReplayRequestHandler.vol_path_pattern.match(path)
+        if match is None:
+            return None
+        return self.store.get(int(match.group(1)))
+
+    def start(self) -> "ReplayServer":
+        """
+        start serving in a background thread
+        """
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="replay-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """
+        stop serving and close the socket
+        """
+        if self.thread is not None:
+            self.httpd.shutdown()
+            self.thread.join()
+            self.thread = None
+        self.httpd.server_close()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *_args):
+        self.stop()
+
+
+def main(argv=None):
+    """
+    replay the cached ceur-ws.org pages from a local server
+    """
+    parser = argparse.ArgumentParser(description="replay the cached CEUR-WS index and volume pages locally")
+    parser.add_argument("--host", default="127.0.0.1", help="the host to bind to [default: %(default)s]")
+    parser.add_argument("--port", type=int, default=8765, help="the port to bind to [default: %(default)s]")
+    parser.add_argument(
+        "--volumes_dir",
+        type=Path,
+        help="the VolumePageCache directory to replay "
+        f"[default: {VolumePageCache.cache_location} or a temporary directory for a generated corpus]",
+    )
+    parser.add_argument("--archive", type=Path, help="replay the volume pages of this SQLite archive instead")
+    parser.add_argument(
+        "--index",
+        type=Path,
+        help="the index.html to replay [default: CEURWS.CACHE_HTML or index.html of a generated corpus]",
+    )
+    parser.add_argument("--generate", type=int, help="generate a synthetic corpus of this many volumes first")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to delay each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="maximum random seconds added to the latency")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="fraction of requests to fail")
+    parser.add_argument("--error_status", type=int, default=503, help="status of failed requests")
+    parser.add_argument("--drop_rate", type=float, default=0.0, help="fraction of connections to drop")
+    parser.add_argument("--seed", type=int, help="seed of the fault injection")
+    parser.add_argument("-d", "--debug", action="store_true", help="log the requests")
+    args = parser.parse_args(argv)
+    index_path = args.index
+    volumes_dir = args.volumes_dir
+    if args.generate:
+        try:
+            volumes_dir = ReplayCorpus.get_location(volumes_dir)
+        except ValueError as ex:
+            parser.error(str(ex))
+        if index_path is None:
+            index_path = volumes_dir / "index.html"
+        elif Path(index_path).resolve() == Path(CEURWS.CACHE_HTML).resolve():
+            parser.error(f"refusing to overwrite the cached {index_path} with a generated index")
+        ReplayCorpus.generate(volumes_dir, volumes=args.generate, index_path=index_path)
+        print(f"generated {args.generate} volumes in {volumes_dir}")
+    elif volumes_dir is None:
+        volumes_dir = VolumePageCache.cache_location
+    store: VolumePageStore
+    if args.archive is not None:
+        store = SqliteVolumePageStore(args.archive)
+    else:
+        store = DirectoryVolumePageStore(volumes_dir)
+    replay = ReplayServer(
+        store=store,
+        index_path=index_path,
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        drop_rate=args.drop_rate,
+        seed=args.seed,
+        debug=args.debug,
+    )
+    print(f"replaying {replay.index_path} and {len(store.numbers())} volume pages at {replay.url}")
+    print(f"export CEURWS_URL={replay.url}")
+    try:
+        replay.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        replay.httpd.server_close()
+        store.close()
+        print(dict(replay.stats), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import importlib
+import threading
+import time
+from collections.abc import Callable
+from types import ModuleType
+from typing import Any
+
+from ceurws.loctime import LoctimeParser
+
+
+class ResourceRegistry:
+    """
+    process wide registry of heavy resources such as the geograpy LocationContext
+    each resource is built lazily on first use exactly once - also when
+    requested from multiple threads at the same time - and the load time is recorded
+    """
+
+    loaders: dict[str, Callable[[], Any]] = {}
+    resources: dict[str, Any] = {}
+    load_times: dict[str, float] = {}
+    locks: dict[str, threading.Lock] = {}
+    registry_lock = threading.Lock()
+
+    @classmethod
+    def register(cls, name: str, loader: Callable[[], Any]):
+        """
+        register the loader of the resource with the given name
+
+        Args:
+            name(str): the name of the resource
+            loader(Callable): the function that builds the resource
+        """
+        with cls.registry_lock:
+            cls.loaders[name] = loader
+
+    @classmethod
+    def get(cls, name: str) -> Any:
+        """
+        get the resource with the given name building it on first use
+
+        Args:
+            name(str): the name of the resource
+
+        Returns:
+            the resource
+        """
+        if name in cls.resources:
+            return cls.resources[name]
+        with cls.registry_lock:
+            if name not in cls.loaders:
+                raise KeyError(f"unknown resource {name}")
+            lock = cls.locks.setdefault(name, threading.Lock())
+        with lock:
+            # another thread might have built the resource while we were waiting
+            if name not in cls.resources:
+                start_time = time.time()
+                resource = cls.loaders[name]()
+                cls.load_times[name] = time.time() - start_time
+                cls.resources[name] = resource
+        return cls.resources[name]
+
+    @classmethod
+    def is_loaded(cls, name: str) -> bool:
+        """
+        check whether the resource with the given name has already been built
+        """
+        return name in cls.resources
+
+    @classmethod
+    def reset(cls, name: str | None = None):
+        """
+        forget the given resource or all resources so that they are rebuilt on next use
+        """
+        with cls.registry_lock:
+            names = [name] if name is not None else list(cls.resources)
+            for resource_name in names:
+                cls.resources.pop(resource_name, None)
+                cls.load_times.pop(resource_name, None)
+
+    @classmethod
+    def get_metrics(cls) -> dict[str, float]:
+        """
+        get the load times of the resources built so far
+
+        Returns:
+            dict: load time in seconds by resource name
+        """
+        return dict(cls.load_times)
+
+    @classmethod
+    def show_metrics(cls):
+        """
+        show the load times of the resources built so far
+        """
+        for name, load_time in cls.get_metrics().items():
+            print(f"{name}: loaded in {load_time:5.2f} secs")
+
+
+def get_geograpy_locator() -> ModuleType:
+    """
+    get the geograpy.locator module - importing geograpy takes about a second
+    so it is only imported when a location is actually resolved
+    """
+    return ResourceRegistry.get("geograpy.locator")
+
+
+def get_location_context():
+    """
+    get the cached geograpy LocationContext
+    """
+    return ResourceRegistry.get("location_context")
+
+
+def get_loctime_parser() -> LoctimeParser:
+    """
+    get the LoctimeParser with the lookups of loctime.yaml
+    """
+    return ResourceRegistry.get("loctime_parser")
+
+
+ResourceRegistry.register("geograpy.locator", lambda: importlib.import_module("geograpy.locator"))
+ResourceRegistry.register("geograpy.nominatim", lambda: importlib.import_module("geograpy.nominatim"))
+ResourceRegistry.register("location_context", lambda: get_geograpy_locator().LocationContext.fromCache())
+ResourceRegistry.register("loctime_parser", LoctimeParser)
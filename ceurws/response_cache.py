@@ -0,0 +1,156 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import gzip
+import hashlib
+from collections import Counter
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:
+    # brotli is optional - without it only gzip bodies are offered
+    brotli = None
+
+
+@dataclass
+class CachedBody:
+    """
+    a serialized response body of a dataset version with its precompressed variants
+    """
+
+    version: Hashable
+    etag: str
+    # the body by content encoding e.g. identity, gzip, br
+    bodies: dict[str, bytes] = field(default_factory=dict)
+
+    def etag_for(self, encoding: str) -> str:
+        """
+        get the entity tag of the body with the given content encoding
+        """
+        if encoding == "identity":
+            return self.etag
+        return f'{self.etag[:-1]}-{encoding}"'
+
+
+class ResponseCache:
+    """
+    cache of serialized JSON responses keyed by the version of the dataset they are built from
+    answering conditional requests with If-None-Match by comparing entity tags
+    """
+
+    def __init__(self, min_compress_size: int = 1024, media_type: str = "application/json"):
+        """
+        constructor
+
+        Args:
+            min_compress_size: the minimum size of a body to precompress
+            media_type: the media type of the responses
+        """
+        self.min_compress_size = min_compress_size
+        self.media_type = media_type
+        self.entries: dict[str, CachedBody] = {}
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    def lookup(self, name: str, version: Hashable) -> CachedBody | None:
+        """
+        get the cached body of the given response for the given dataset version
+
+        Returns:
+            CachedBody: the cached body or None if it is missing or outdated
+        """
+        entry = self.entries.get(name)
+        if entry is None or entry.version != version:
+            self.misses[name] += 1
+            return None
+        self.hits[name] += 1
+        return entry
+
+    def store(self, name: str, version: Hashable, body: bytes) -> CachedBody:
+        """
+        store the given serialized body with its compressed variants
+
+        Returns:
+            CachedBody: the cached body
+        """
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        entry = CachedBody(version=version, etag=etag, bodies={"identity": body})
+        if len(body) >= self.min_compress_size:
+            if brotli is not None:
+                entry.bodies["br"] = brotli.compress(body, quality=9)
+            entry.bodies["gzip"] = gzip.compress(body, compresslevel=9)
+        self.entries[name] = entry
+        return entry
+
+    def build(
+        self,
+        name: str,
+        version: Hashable,
+        get_data: Callable[[], Any],
+        default: Callable[[Any], Any] | None = None,
+    ) -> CachedBody:
+        """
+        serialize the data of the given dataset version and cache it
+
+        Args:
+            name: the name of the response e.g. volumes
+            version: the version of the dataset
+            get_data: the function to get the data
+            default: the orjson default function for types orjson does not serialize natively
+        """
+        body = orjson.dumps(get_data(), default=default)
+        return self.store(name, version, body)
+
+    def choose_encoding(self, entry: CachedBody, accept_encoding: str) -> str:
+        """
+        choose the content encoding of the given entry for the given Accept-Encoding header
+        """
+        accepted = set()
+        for part in accept_encoding.split(","):
+            coding, _, params = part.partition(";")
+            quality = 1.0
+            params = params.replace(" ", "")
+            if params.startswith("q="):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    quality = 0.0
+            if quality > 0:
+                accepted.add(coding.strip().lower())
+        for encoding in ("br", "gzip"):
+            if encoding in entry.bodies and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+    @staticmethod
+    def matches(if_none_match: str, etag: str) -> bool:
+        """
+        check whether the given If-None-Match header matches the given entity tag with weak comparison
+        """
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    def response(self, request: Request, entry: CachedBody) -> Response:
+        """
+        get the response of the given cached body for the given request
+        which is 304 Not Modified if the client already has it
+        """
+        encoding = self.choose_encoding(entry, request.headers.get("accept-encoding", ""))
+        etag = entry.etag_for(encoding)
+        headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None and self.matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=entry.bodies[encoding], media_type=self.media_type, headers=headers)
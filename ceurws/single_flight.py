@@ -0,0 +1,74 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from nicegui import run
+
+
+class SingleFlight:
+    """
+    run blocking calls in a thread pool off the event loop
+    so that concurrent calls with the same key share a single call
+    """
+
+    def __init__(self, offload: Callable[..., Awaitable[Any]] | None = None):
+        """
+        constructor
+
+        Args:
+            offload: the coroutine function to run a blocking function with - defaults to nicegui's run.io_bound
+        """
+        self.offload = offload if offload is not None else run.io_bound
+        self.inflight: dict[str, asyncio.Future] = {}
+        # number of calls and of calls that joined a running call by key
+        self.calls: Counter = Counter()
+        self.joined: Counter = Counter()
+
+    async def do(self, key: str, func: Callable[..., Any], *args) -> Any:
+        """
+        call the given blocking function in the thread pool
+        unless a call with the given key is already running in which case its result is shared
+
+        Args:
+            key: the key of the call e.g. "dblp/papers"
+            func: the blocking function
+            *args: the arguments of the function
+
+        Returns:
+            the result of the function
+        """
+        self.calls[key] += 1
+        future = self.inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self.offload(func, *args))
+            self.inflight[key] = future
+            future.add_done_callback(lambda _future: self.inflight.pop(key, None))
+        else:
+            self.joined[key] += 1
+        # a cancelled waiter must not cancel the shared call
+        return await asyncio.shield(future)
+
+    async def warm_up(self, calls: dict[str, Callable[[], Any]]) -> dict[str, Exception]:
+        """
+        run the given calls one after the other e.g. at server start
+
+        Args:
+            calls: the blocking functions by key
+
+        Returns:
+            dict: the exceptions of the failed calls by key
+        """
+        errors = {}
+        for key, func in calls.items():
+            try:
+                await self.do(key, func)
+            except Exception as ex:
+                errors[key] = ex
+        return errors
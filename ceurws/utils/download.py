@@ -12,6 +12,8 @@ import time
 import urllib.request
 from pathlib import Path
 
+from ceurws.config import CEURWS
+
 
 class Download:
     """
@@ -20,7 +22,7 @@ class Download:
 
     @staticmethod
     def getURLContent(url: str):
-        with urllib.request.urlopen(url) as urlResponse:
+        with urllib.request.urlopen(CEURWS.rebase_url(url)) as urlResponse:
             content = urlResponse.read().decode()
             return content
 
@@ -6,13 +6,28 @@ Created on 2020-08-20
 this is a redundant copy of the sources at https://github.com/WolfgangFahl/ConferenceCorpus/blob/main/corpus/datasources/webscrape.py
 """
 
+import datetime
+import email.message
+import email.utils
+import os
+import random
 import re
-import urllib.request
+import threading
+import time
+import urllib.error
+from collections import deque
 from dataclasses import dataclass
-from urllib.error import HTTPError
-from urllib.request import HTTPCookieProcessor, build_opener
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlparse
 
-from bs4 import BeautifulSoup
+import urllib3
+from bs4 import BeautifulSoup, Tag
+
+try:
+    import lxml
+except ImportError:
+    # lxml is optional - without it the pages are parsed with the html.parser tree builder
+    lxml = None
 
 
 class WebScrape:
@@ -33,6 +48,11 @@ class WebScrape:
         showHtml: bool = False,
         timeout: float = 20,
         agent: str = "Mozilla/5.0",
+        rate_limiter: "HostRateLimiter | None" = None,
+        http_pool: "HttpPool | None" = None,
+        retry_policy: "RetryPolicy | None" = None,
+        circuit_breaker: "CircuitBreaker | None" = None,
+        html_parser: str | None = None,
     ):
         """
         Constructor
@@ -42,6 +62,12 @@ class WebScrape:
             showHtml(bool): if True show the HTML retrieved
             timeout(float): the default timeout
             agent(str): the agent to mimic
+            rate_limiter(HostRateLimiter): optional rate limiter to be polite to the hosts being scraped
+            http_pool(HttpPool): the connection pool to use - default: the pool shared by all instances
+            retry_policy(RetryPolicy): how to retry failed fetches - default: no retries
+            circuit_breaker(CircuitBreaker): optional circuit breaker pausing the fetches of failing hosts
+            html_parser(str): the BeautifulSoup tree builder - lxml or html.parser
+                default: lxml if it is installed otherwise html.parser
         """
         self.err: Exception | None = None
         self.valid = False
@@ -49,6 +75,26 @@ class WebScrape:
         self.showHtml = showHtml
         self.timeout = timeout
         self.agent = agent
+        self.rate_limiter = rate_limiter
+        self.http_pool = http_pool if http_pool is not None else HttpPool.get_shared()
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy(max_retries=0)
+        self.circuit_breaker = circuit_breaker
+        self.html_parser = html_parser if html_parser is not None else WebScrape.default_html_parser()
+        if self.html_parser not in WebScrape.HTML_PARSERS:
+            raise ValueError(f"unknown html parser {self.html_parser} - use one of {WebScrape.HTML_PARSERS}")
+
+    # the supported tree builders
+    HTML_PARSERS = ("lxml", "html.parser")
+
+    @staticmethod
+    def default_html_parser() -> str:
+        """
+        get the default tree builder
+
+        Returns:
+            str: lxml if it is installed otherwise html.parser
+        """
+        return "lxml" if lxml is not None else "html.parser"
 
     def findLinkForRegexp(self, regex: str):
         """
@@ -131,7 +177,7 @@ class WebScrape:
         Returns:
             BeautifulSoup: the html parser
         """
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, self.html_parser)
         if show_html:
             self.printPrettyHtml(soup)
         return soup
@@ -162,15 +208,8 @@ class WebScrape:
         """
         scrapeDict = dict()
         if isinstance(scrapeDescr, list):
-            for scrapeItem in scrapeDescr:
-                value = self.fromTag(
-                    soup,
-                    scrapeItem.tag,
-                    scrapeItem.attribute,
-                    scrapeItem.value,
-                    multi=scrapeItem.multi,
-                )
-                scrapeDict[scrapeItem.key] = value
+            # a single traversal for all descriptions - same results as fromTag for each of them
+            scrapeDict = ScrapeExtractor.compile(scrapeDescr).extract(soup)
         self.valid = True
         return scrapeDict
 
@@ -216,23 +255,134 @@ class WebScrape:
             bytes: If the content of the url contains encoding errors
             None: If the url is not reachable
         """
-        req = urllib.request.Request(url, headers={"User-Agent": f"{self.agent}"})
-        # handle cookies
-        opener = build_opener(HTTPCookieProcessor())
-        try:
-            response = opener.open(req, timeout=self.timeout)
-        except HTTPError as herr:
-            self.err = herr
+        fetch_result = self.fetch(url, debug=debug)
+        if fetch_result.error is not None:
+            self.err = fetch_result.error
+        return fetch_result.html
+
+    def fetch(
+        self,
+        url: str,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        debug: bool = False,
+    ) -> "FetchResult":
+        """
+        fetch the given url - conditionally if an etag or last_modified value
+        of a previous fetch is given
+
+        Args:
+            url: url to the get the content from
+            etag: the ETag of a previous fetch to send as If-None-Match
+            last_modified: the Last-Modified value of a previous fetch to send as If-Modified-Since
+            debug(bool): if True show non available urls
+
+        Returns:
+            FetchResult: the result of the fetch - with status 304 and no html if not modified
+        """
+        headers = {"User-Agent": f"{self.agent}"}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        attempt = 0
+        # the error stays local - a WebScrape is shared by the threads of a VolumePageFetcher
+        error: Exception | None = None
+        while True:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.wait(url)
+            if self.rate_limiter is not None:
+                self.rate_limiter.wait(url)
+            response = None
+            try:
+                response = self.http_pool.request(url, headers=headers, timeout=self.timeout)
+                status = response.status
+            except URLError as uerr:
+                error = uerr
+                status = None
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record(url, success=not RetryPolicy.is_retryable_status(status))
+            if not self.retry_policy.is_retryable(status) or attempt >= self.retry_policy.max_retries:
+                break
+            retry_after = response.headers.get("Retry-After") if response is not None else None
+            delay = self.retry_policy.get_delay(attempt, retry_after)
+            if debug:
+                print(f"retrying {url} in {delay:.1f} s after {status or error}")
+            time.sleep(delay)
+            attempt += 1
+        if response is None:
+            if debug:
+                print(f"{url.split('/')[-1]} not available: {error}")
+            return FetchResult(url=url, error=error)
+        if response.status == 304:
+            return FetchResult(
+                url=url,
+                status=304,
+                etag=response.headers.get("ETag", etag),
+                last_modified=response.headers.get("Last-Modified", last_modified),
+            )
+        if response.status >= 400:
+            herr = HTTPError(url, response.status, response.reason or "", response.headers, None)
             if debug:
                 print(f"{url.split('/')[-1]} not available")
-            return None
-        html = response.read()
+            return FetchResult(url=url, status=response.status, error=herr)
+        html = response.data
         try:
-            html = html.decode(response.headers.get_content_charset())
+            html = html.decode(HttpPool.get_charset(response.headers.get("Content-Type")) or "utf-8")
         except UnicodeDecodeError as ex:
             print(f"ERROR: Could not properly decode the html code of <{url}>")
             print(ex)
-        return html
+        fetch_result = FetchResult(
+            url=url,
+            status=response.status,
+            html=html,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return fetch_result
+
+
+@dataclass
+class FetchResult:
+    """
+    the result of a (conditional) fetch of an url
+    """
+
+    url: str
+    status: int | None = None  # the HTTP status code
+    html: str | bytes | None = None  # the content - None if not modified or not available
+    etag: str | None = None  # the ETag response header
+    last_modified: str | None = None  # the Last-Modified response header
+    error: Exception | None = None  # the HTTPError or URLError of a failed fetch
+
+    @property
+    def failed(self) -> bool:
+        """
+        True if the fetch failed with a transient error that might be gone on a later retry
+        """
+        return RetryPolicy.is_retryable_status(self.status)
+
+    @property
+    def not_modified(self) -> bool:
+        """
+        True if the server confirmed that the content has not been modified
+        """
+        return self.status == 304
+
+    def as_meta(self) -> dict:
+        """
+        get the cache metadata for this fetch result
+
+        Returns:
+            dict: the etag, last_modified and fetched timestamp
+        """
+        meta = {
+            "url": self.url,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "fetched": datetime.datetime.now().isoformat(),
+        }
+        return meta
 
 
 @dataclass
@@ -246,3 +396,471 @@ class ScrapeDescription:
     attribute: str  # the attribute to expect
     value: str  # the value to expect
     multi: bool = False  # do we expect multiple elements?
+
+
+class ScrapeExtractor:
+    """
+    compiled extractor for a list of ScrapeDescriptions
+
+    groups the descriptions by tag, attribute and value and collects the elements
+    of all of them in a single traversal of the tree instead of one find_all per description
+    """
+
+    # the compiled extractors by the fields of their descriptions
+    compiled: dict[tuple, "ScrapeExtractor"] = {}
+
+    def __init__(self, scrapeDescr: list[ScrapeDescription]):
+        """
+        constructor
+
+        Args:
+            scrapeDescr: the descriptions of the elements to extract
+        """
+        self.scrapeDescr = list(scrapeDescr)
+        # the distinct attribute, value matches by tag name
+        self.matches: dict[str, list[tuple[str | None, str | None]]] = {}
+        for scrapeItem in self.scrapeDescr:
+            tag_matches = self.matches.setdefault(scrapeItem.tag, [])
+            match = self.get_match(scrapeItem)
+            if match not in tag_matches:
+                tag_matches.append(match)
+
+    @classmethod
+    def compile(cls, scrapeDescr: list[ScrapeDescription]) -> "ScrapeExtractor":
+        """
+        get the compiled extractor for the given descriptions
+
+        Args:
+            scrapeDescr: the descriptions of the elements to extract
+
+        Returns:
+            ScrapeExtractor: the cached extractor for descriptions with the same fields
+        """
+        key = tuple((item.key, item.tag, item.attribute, item.value, item.multi) for item in scrapeDescr)
+        extractor = cls.compiled.get(key)
+        if extractor is None:
+            extractor = ScrapeExtractor(scrapeDescr)
+            cls.compiled[key] = extractor
+        return extractor
+
+    @staticmethod
+    def get_match(scrapeItem: ScrapeDescription) -> tuple[str | None, str | None]:
+        """
+        get the attribute, value match of the given description - None, None for any element of the tag
+        """
+        if scrapeItem.attribute is not None and scrapeItem.value is not None:
+            return scrapeItem.attribute, scrapeItem.value
+        return None, None
+
+    @staticmethod
+    def matches_attribute(node: Tag, attribute: str, value: str) -> bool:
+        """
+        check whether the given attribute of the given element has the given value
+        the way find_all does - for multi valued attributes like class
+        one of the values or all of them separated by spaces
+        """
+        node_value = node.attrs.get(attribute)
+        if node_value is None:
+            return False
+        if isinstance(node_value, str):
+            return node_value == value
+        return value in node_value or " ".join(node_value) == value
+
+    def collect(self, soup: BeautifulSoup | Tag) -> dict[tuple[str, str | None, str | None], list[Tag]]:
+        """
+        collect the matching elements of the given tree in document order in a single traversal
+
+        Args:
+            soup: the tree to search - the root element itself is not included like with find_all
+
+        Returns:
+            dict: the elements by tag, attribute and value
+        """
+        found: dict[tuple[str, str | None, str | None], list[Tag]] = {
+            (tag, attribute, value): [] for tag, tag_matches in self.matches.items() for attribute, value in tag_matches
+        }
+        matches = self.matches
+        for node in soup.descendants:
+            if not isinstance(node, Tag):
+                continue
+            tag_matches = matches.get(node.name)
+            if tag_matches is None:
+                continue
+            for attribute, value in tag_matches:
+                if attribute is None or value is None or self.matches_attribute(node, attribute, value):
+                    found[(node.name, attribute, value)].append(node)
+        return found
+
+    def extract(self, soup: BeautifulSoup | Tag) -> dict:
+        """
+        extract the text of the described elements from the given tree
+
+        Args:
+            soup: the tree to extract from
+
+        Returns:
+            dict: the text of the first element or None or the list of texts of all elements
+            for multi descriptions by the key of the description
+        """
+        found = self.collect(soup)
+        scrapeDict: dict = {}
+        for scrapeItem in self.scrapeDescr:
+            nodes = found[(scrapeItem.tag, *self.get_match(scrapeItem))]
+            if scrapeItem.multi:
+                scrapeDict[scrapeItem.key] = [node.get_text() for node in nodes]
+            else:
+                scrapeDict[scrapeItem.key] = nodes[0].get_text() if nodes else None
+        return scrapeDict
+
+
+class RetryPolicy:
+    """
+    retry of failed fetches with jittered exponential backoff
+    honoring the Retry-After header
+    """
+
+    # the HTTP status codes of transient errors
+    RETRY_STATUSES = frozenset([408, 429, 500, 502, 503, 504])
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        max_retry_after: float = 300.0,
+    ):
+        """
+        constructor
+
+        Args:
+            max_retries(int): the maximum number of retries of a fetch - 0 for no retries
+            backoff_factor(float): the maximum delay in seconds before the first retry - doubled for each retry
+            max_backoff(float): the maximum backoff delay in seconds
+            max_retry_after(float): the maximum delay in seconds accepted from a Retry-After header
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+
+    @classmethod
+    def is_retryable_status(cls, status: int | None) -> bool:
+        """
+        check whether a fetch with the given status failed with a transient error
+        a status of None means that the host was not reachable or the request timed out
+        """
+        return status is None or status in cls.RETRY_STATUSES
+
+    def is_retryable(self, status: int | None) -> bool:
+        """
+        check whether a fetch with the given status should be retried
+        """
+        return self.max_retries > 0 and self.is_retryable_status(status)
+
+    def parse_retry_after(self, retry_after: str | None) -> float | None:
+        """
+        parse the given Retry-After header value given in seconds or as HTTP date
+
+        Returns:
+            float: the delay in seconds or None if the value is missing or invalid
+        """
+        if not retry_after:
+            return None
+        retry_after = retry_after.strip()
+        if retry_after.isdigit():
+            delay = float(retry_after)
+        else:
+            try:
+                retry_date = email.utils.parsedate_to_datetime(retry_after)
+            except (TypeError, ValueError):
+                return None
+            if retry_date.tzinfo is None:
+                retry_date = retry_date.replace(tzinfo=datetime.timezone.utc)
+            delay = (retry_date - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+        return min(max(delay, 0.0), self.max_retry_after)
+
+    def get_delay(self, attempt: int, retry_after: str | None = None) -> float:
+        """
+        get the delay before the retry after the given attempt
+
+        Args:
+            attempt(int): the number of the failed attempt starting with 0
+            retry_after(str): the Retry-After header of the failed attempt
+
+        Returns:
+            float: the Retry-After delay if given else a random delay up to the exponential backoff
+        """
+        delay = self.parse_retry_after(retry_after)
+        if delay is None:
+            # full jitter so that concurrent fetches do not retry in lock step
+            delay = random.uniform(0, min(self.max_backoff, self.backoff_factor * 2**attempt))
+        return delay
+
+
+class CircuitBreaker:
+    """
+    thread safe per host circuit breaker
+
+    opens the circuit of a host when the error rate of its recent fetches spikes
+    which pauses all fetches to that host for the cooldown period.
+    After the cooldown the circuit is half open: the next failure opens it again
+    while the next success closes it
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        window: int = 20,
+        min_requests: int = 5,
+        cooldown: float = 30.0,
+    ):
+        """
+        constructor
+
+        Args:
+            failure_rate(float): the failure rate of the recent fetches that opens the circuit
+            window(int): the number of recent fetches per host to consider
+            min_requests(int): the minimum number of recent fetches before the circuit might open
+            cooldown(float): the number of seconds to pause the fetches of a host with an open circuit
+        """
+        self.failure_rate = failure_rate
+        self.window = window
+        self.min_requests = min_requests
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.outcomes: dict[str, deque[bool]] = {}
+        self.open_until: dict[str, float] = {}
+        self.half_open: set[str] = set()
+        self.opened = 0
+        self.total_pause = 0.0
+
+    def is_open(self, url: str) -> bool:
+        """
+        check whether the circuit of the host of the given url is open
+        """
+        host = urlparse(url).netloc
+        with self.lock:
+            return self.open_until.get(host, 0.0) > time.monotonic()
+
+    def wait(self, url: str) -> float:
+        """
+        wait until the circuit of the host of the given url is no longer open
+
+        Returns:
+            float: the number of seconds waited
+        """
+        host = urlparse(url).netloc
+        with self.lock:
+            delay = self.open_until.get(host, 0.0) - time.monotonic()
+            if delay > 0:
+                self.total_pause += delay
+        if delay > 0:
+            time.sleep(delay)
+            return delay
+        return 0.0
+
+    def record(self, url: str, success: bool):
+        """
+        record the outcome of a fetch of the given url
+        """
+        host = urlparse(url).netloc
+        with self.lock:
+            if self.open_until.get(host, 0.0) > time.monotonic():
+                # the fetch was started before the circuit opened
+                return
+            if host in self.half_open:
+                self.half_open.discard(host)
+                if success:
+                    self.outcomes.pop(host, None)
+                else:
+                    self.trip(host)
+                return
+            outcomes = self.outcomes.setdefault(host, deque(maxlen=self.window))
+            outcomes.append(success)
+            failures = outcomes.count(False)
+            if len(outcomes) >= self.min_requests and failures / len(outcomes) >= self.failure_rate:
+                self.trip(host)
+
+    def trip(self, host: str):
+        """
+        open the circuit of the given host - the lock must be held
+        """
+        self.open_until[host] = time.monotonic() + self.cooldown
+        self.half_open.add(host)
+        self.outcomes.pop(host, None)
+        self.opened += 1
+
+
+class HttpPool:
+    """
+    thread safe pool of keep-alive connections to the hosts being scraped
+    requesting gzip/deflate compressed content
+
+    HTTP/2 is not used: urllib3's HTTP/2 support is still experimental and
+    the volume pages are fetched with many short requests to a single host
+    for which reusing HTTP/1.1 keep-alive connections already saves the handshakes
+    """
+
+    shared: "HttpPool | None" = None
+    shared_lock = threading.Lock()
+
+    def __init__(self, maxsize: int = 16, num_pools: int = 10, max_redirects: int = 10):
+        """
+        constructor
+
+        Args:
+            maxsize(int): the maximum number of idle connections kept per host
+            num_pools(int): the maximum number of hosts to keep connections for
+            max_redirects(int): the maximum number of redirects to follow
+        """
+        self.maxsize = maxsize
+        self.num_pools = num_pools
+        self.retries = urllib3.Retry(total=None, connect=0, read=0, status=0, other=0, redirect=max_redirects)
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        self.pool_manager = self.create_pool_manager()
+        # the connection pools that have been used by id
+        self.pools: dict[int, urllib3.HTTPConnectionPool] = {}
+
+    def create_pool_manager(self) -> urllib3.PoolManager:
+        """
+        create the urllib3 pool manager
+        """
+        headers = urllib3.make_headers(accept_encoding="gzip,deflate")
+        pool_manager = urllib3.PoolManager(
+            num_pools=self.num_pools,
+            maxsize=self.maxsize,
+            block=False,
+            headers=headers,
+        )
+        return pool_manager
+
+    @classmethod
+    def get_shared(cls) -> "HttpPool":
+        """
+        get the pool shared by all WebScrape instances of this process
+        """
+        with cls.shared_lock:
+            if cls.shared is None:
+                cls.shared = HttpPool()
+            return cls.shared
+
+    @staticmethod
+    def get_charset(content_type: str | None) -> str | None:
+        """
+        get the charset of the given Content-Type header
+        """
+        if not content_type:
+            return None
+        message = email.message.Message()
+        message["Content-Type"] = content_type
+        return message.get_content_charset()
+
+    def request(self, url: str, headers: dict | None = None, timeout: float = 20) -> urllib3.BaseHTTPResponse:
+        """
+        get the given url reusing a pooled connection to its host
+
+        Args:
+            url(str): the url to get
+            headers(dict): additional request headers
+            timeout(float): the connect and read timeout in seconds
+
+        Returns:
+            the response with the decoded content
+
+        Raises:
+            URLError: if the host is not reachable or the request timed out
+        """
+        with self.lock:
+            if self.pid != os.getpid():
+                # connections must not be shared with a forked parent process
+                self.pid = os.getpid()
+                self.pool_manager = self.create_pool_manager()
+                self.pools = {}
+            pool_manager = self.pool_manager
+            pool = pool_manager.connection_from_url(url)
+            self.pools[id(pool)] = pool
+        try:
+            response = pool_manager.request(
+                "GET",
+                url,
+                headers=headers,
+                timeout=urllib3.Timeout(connect=timeout, read=timeout),
+                retries=self.retries,
+            )
+        except urllib3.exceptions.HTTPError as ex:
+            raise urllib.error.URLError(ex) from ex
+        return response
+
+    def get_stats(self) -> dict:
+        """
+        get the connection statistics
+
+        Returns:
+            dict: requests, connections, reused connections and reuse_rate
+        """
+        with self.lock:
+            pools = list(self.pools.values())
+        requests = sum(pool.num_requests for pool in pools)
+        connections = sum(pool.num_connections for pool in pools)
+        reused = max(requests - connections, 0)
+        stats = {
+            "requests": requests,
+            "connections": connections,
+            "reused": reused,
+            "reuse_rate": reused / requests if requests else 0.0,
+        }
+        return stats
+
+    def show_stats(self):
+        """
+        show the connection statistics
+        """
+        stats = self.get_stats()
+        print(
+            f"http pool: {stats['requests']} requests on {stats['connections']} connections "
+            f"({stats['reuse_rate']:.0%} reused)"
+        )
+
+
+class HostRateLimiter:
+    """
+    thread safe rate limiter that spaces the requests to each host
+    so that at most requests_per_second requests per host are started
+    """
+
+    def __init__(self, requests_per_second: float = 4.0):
+        """
+        constructor
+
+        Args:
+            requests_per_second(float): maximum number of requests per second and host - 0 for no limit
+        """
+        self.requests_per_second = requests_per_second
+        self.min_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_slot: dict[str, float] = {}
+        self.total_wait = 0.0
+
+    def wait(self, url: str) -> float:
+        """
+        wait until the next request to the host of the given url is allowed
+
+        Args:
+            url(str): the url that is about to be requested
+
+        Returns:
+            float: the number of seconds waited
+        """
+        if self.min_interval <= 0:
+            return 0.0
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.min_interval
+            delay = slot - now
+            self.total_wait += delay
+        if delay > 0:
+            time.sleep(delay)
+        return delay
@@ -0,0 +1,134 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import datetime
+import hashlib
+import sqlite3
+from pathlib import Path
+
+import ceurws
+from ceurws.config import CEURWS
+
+
+class VolumeFingerprints:
+    """
+    content fingerprints of the volumes stored in the SQLite cache
+    to skip the reparsing of unchanged volumes
+
+    a fingerprint is the sha256 hash of the <tr> block of the volume in index.html
+    together with the volume page and the parser configuration so that a parser change
+    or a switch of the html parser invalidates all fingerprints
+    """
+
+    # to be increased whenever a change of the volume or paper parsers changes their results
+    parser_version = 2
+
+    def __init__(self, db_path: Path | None = None, table_name: str = "volume_fingerprints"):
+        """
+        constructor
+
+        Args:
+            db_path: the SQLite database - defaults to the ceurws.db cache file
+            table_name: the name of the fingerprint table
+        """
+        self.db_path = Path(db_path) if db_path is not None else CEURWS.CACHE_FILE
+        self.table_name = table_name
+
+    @staticmethod
+    def hash_index_block(lines: list[str]) -> str:
+        """
+        get the hash of the given lines of the <tr> block of a volume in index.html
+
+        Args:
+            lines: the lines of the block
+
+        Returns:
+            str: the hex digest
+        """
+        return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def parser_key(html_parser: str) -> str:
+        """
+        get the key of the parser configuration the volumes are parsed with
+
+        Args:
+            html_parser: the BeautifulSoup tree builder of the volume pages
+
+        Returns:
+            str: the package version, the parser version and the tree builder
+        """
+        return f"{ceurws.__version__}:{VolumeFingerprints.parser_version}:{html_parser}"
+
+    @staticmethod
+    def fingerprint(index_hash: str | None, html: str | bytes | None, parser_key: str = "") -> str:
+        """
+        get the fingerprint of a volume
+
+        Args:
+            index_hash: the hash of the index.html block of the volume
+            html: the volume page
+            parser_key: the key of the parser configuration see parser_key
+
+        Returns:
+            str: the hex digest
+        """
+        sha = hashlib.sha256()
+        sha.update(parser_key.encode("utf-8"))
+        sha.update(b"\0")
+        sha.update((index_hash or "").encode("utf-8"))
+        sha.update(b"\0")
+        if html is not None:
+            sha.update(html.encode("utf-8") if isinstance(html, str) else html)
+        return sha.hexdigest()
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        connect to the database creating the fingerprint table if necessary
+        """
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        with connection:
+            connection.execute(
+                f"""CREATE TABLE IF NOT EXISTS {self.table_name}(
+  number INTEGER PRIMARY KEY,
+  fingerprint TEXT NOT NULL,
+  updated TEXT
+)"""
+            )
+        return connection
+
+    def get_fingerprints(self) -> dict[int, str]:
+        """
+        get the stored fingerprints
+
+        Returns:
+            dict: the fingerprints by volume number
+        """
+        connection = self.connect()
+        try:
+            rows = connection.execute(f"SELECT number, fingerprint FROM {self.table_name}").fetchall()
+        finally:
+            connection.close()
+        return {number: fingerprint for number, fingerprint in rows}
+
+    def store_fingerprints(self, fingerprints: dict[int, str]):
+        """
+        store the given fingerprints in a single transaction
+
+        Args:
+            fingerprints: the fingerprints by volume number
+        """
+        updated = datetime.datetime.now().isoformat()
+        connection = self.connect()
+        try:
+            with connection:
+                connection.executemany(
+                    f"INSERT OR REPLACE INTO {self.table_name}(number, fingerprint, updated) VALUES (?, ?, ?)",
+                    [(number, fingerprint, updated) for number, fingerprint in fingerprints.items()],
+                )
+        finally:
+            connection.close()
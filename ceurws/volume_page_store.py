@@ -0,0 +1,364 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from pathlib import Path
+
+
+class VolumePageStore(ABC):
+    """
+    storage backend for ceur-ws volume pages and their fetch metadata
+    """
+
+    @abstractmethod
+    def is_cached(self, number: int) -> bool:
+        """
+        check if the volume page of the given volume number is stored
+        """
+
+    @abstractmethod
+    def get(self, number: int) -> str | bytes | None:
+        """
+        get the stored volume page of the given volume number or None
+        """
+
+    @abstractmethod
+    def put(self, number: int, html: str | bytes):
+        """
+        store the given volume page
+        """
+
+    @abstractmethod
+    def delete(self, number: int):
+        """
+        delete the volume page and the metadata of the given volume number
+        """
+
+    @abstractmethod
+    def get_meta(self, number: int) -> dict | None:
+        """
+        get the fetch metadata of the given volume number or None
+        """
+
+    @abstractmethod
+    def set_meta(self, number: int, meta: dict):
+        """
+        set the fetch metadata of the given volume number
+        """
+
+    @abstractmethod
+    def numbers(self) -> list[int]:
+        """
+        get the sorted volume numbers of all stored volume pages
+        """
+
+    def close(self):
+        """
+        release the resources of this store - it may still be used afterwards
+        the default has nothing to release
+        """
+        return None
+
+    def iter_pages(self) -> Iterator[tuple[int, str | bytes]]:
+        """
+        iterate over all stored volume pages in the order of the volume numbers
+
+        Yields:
+            tuple: volume number and volume page
+        """
+        for number in self.numbers():
+            html = self.get(number)
+            if html is not None:
+                yield number, html
+
+    def copy_from(self, other: "VolumePageStore") -> int:
+        """
+        copy all volume pages and their metadata from the given store into this store
+        e.g. to import or export the directory layout of the volume page cache
+
+        Args:
+            other: the store to copy from
+
+        Returns:
+            int: the number of copied volume pages
+        """
+        count = 0
+        for number, html in other.iter_pages():
+            self.put(number, html)
+            meta = other.get_meta(number)
+            if meta is not None:
+                self.set_meta(number, meta)
+            count += 1
+        return count
+
+
+class DirectoryVolumePageStore(VolumePageStore):
+    """
+    one Vol-N.html file (and Vol-N.meta.json metadata file) per volume in a directory
+    """
+
+    def __init__(self, location: Path):
+        """
+        constructor
+
+        Args:
+            location: the directory of the volume pages
+        """
+        self.location = Path(location)
+
+    def page_path(self, number: int) -> Path:
+        """
+        get the path of the volume page file
+        """
+        return self.location / f"Vol-{number}.html"
+
+    def meta_path(self, number: int) -> Path:
+        """
+        get the path of the volume page metadata file
+        """
+        return self.location / f"Vol-{number}.meta.json"
+
+    def is_cached(self, number: int) -> bool:
+        return self.page_path(number).is_file()
+
+    def get(self, number: int) -> str | bytes | None:
+        volume_page: str | bytes | None = None
+        if self.is_cached(number):
+            filepath = self.page_path(number)
+            try:
+                volume_page = filepath.read_text()
+            except UnicodeDecodeError as _ex:
+                volume_page = filepath.read_bytes()
+        return volume_page
+
+    def put(self, number: int, html: str | bytes):
+        self.location.mkdir(parents=True, exist_ok=True)
+        mode = "wb" if isinstance(html, bytes) else "w"
+        encoding = None if isinstance(html, bytes) else "utf-8"
+        with open(self.page_path(number), mode=mode, encoding=encoding) as f:
+            f.write(html)
+
+    def delete(self, number: int):
+        for filepath in [self.page_path(number), self.meta_path(number)]:
+            if filepath.is_file():
+                os.remove(filepath)
+
+    @staticmethod
+    def read_meta(meta_path: Path) -> dict | None:
+        """
+        read the fetch metadata from the given json file
+
+        Args:
+            meta_path: path of the metadata file
+
+        Returns:
+            dict: the metadata or None if the file does not exist or is invalid
+        """
+        meta = None
+        if meta_path.is_file():
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            except ValueError:
+                meta = None
+        return meta
+
+    @staticmethod
+    def write_meta(meta_path: Path, meta: dict):
+        """
+        write the given fetch metadata to the given json file
+
+        Args:
+            meta_path: path of the metadata file
+            meta: the metadata to write
+        """
+        meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    def get_meta(self, number: int) -> dict | None:
+        return self.read_meta(self.meta_path(number))
+
+    def set_meta(self, number: int, meta: dict):
+        self.location.mkdir(parents=True, exist_ok=True)
+        self.write_meta(self.meta_path(number), meta)
+
+    def numbers(self) -> list[int]:
+        numbers = []
+        if self.location.is_dir():
+            for filepath in self.location.glob("Vol-*.html"):
+                number_str = filepath.stem[len("Vol-") :]
+                if number_str.isdigit():
+                    numbers.append(int(number_str))
+        return sorted(numbers)
+
+
+class SqliteVolumePageStore(VolumePageStore):
+    """
+    all volume pages as zlib compressed blobs in a single SQLite archive
+    indexed by the volume number
+    """
+
+    def __init__(self, db_path: Path, compress_level: int = 6, batch_size: int = 64):
+        """
+        constructor
+
+        Args:
+            db_path: the path of the SQLite archive file
+            compress_level: the zlib compression level
+            batch_size: the number of pages read per query when iterating
+        """
+        self.db_path = Path(db_path)
+        self.compress_level = compress_level
+        self.batch_size = batch_size
+        self.connection: sqlite3.Connection | None = None
+        # the fetch threads share my connection
+        self.lock = threading.RLock()
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        get the connection to my archive - opening it and creating the table on first use
+
+        the connection is kept open until close is called - callers must hold my lock
+        """
+        if self.connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            # readers in other processes e.g. the replay server do not block the writer
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with connection:
+                connection.execute(
+                    """CREATE TABLE IF NOT EXISTS volume_pages(
+  number INTEGER PRIMARY KEY,
+  is_text INTEGER NOT NULL,
+  page BLOB,
+  meta TEXT
+)"""
+                )
+            self.connection = connection
+        return self.connection
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+    def is_cached(self, number: int) -> bool:
+        with self.lock:
+            row = (
+                self.connect()
+                .execute("SELECT 1 FROM volume_pages WHERE number=? AND page IS NOT NULL", (number,))
+                .fetchone()
+            )
+        return row is not None
+
+    def decode(self, is_text: int, page: bytes) -> str | bytes:
+        """
+        decompress the given stored page
+        """
+        html = zlib.decompress(page)
+        if is_text:
+            return html.decode("utf-8")
+        return html
+
+    def get(self, number: int) -> str | bytes | None:
+        with self.lock:
+            row = self.connect().execute("SELECT is_text, page FROM volume_pages WHERE number=?", (number,)).fetchone()
+        if row is None or row[1] is None:
+            return None
+        return self.decode(row[0], row[1])
+
+    def put(self, number: int, html: str | bytes):
+        is_text = isinstance(html, str)
+        raw = html.encode("utf-8") if isinstance(html, str) else html
+        page = zlib.compress(raw, self.compress_level)
+        with self.lock:
+            connection = self.connect()
+            with connection:
+                connection.execute(
+                    """INSERT INTO volume_pages(number, is_text, page) VALUES (?, ?, ?)
+ON CONFLICT(number) DO UPDATE SET is_text=excluded.is_text, page=excluded.page""",
+                    (number, int(is_text), page),
+                )
+
+    def delete(self, number: int):
+        with self.lock:
+            connection = self.connect()
+            with connection:
+                connection.execute("DELETE FROM volume_pages WHERE number=?", (number,))
+
+    def get_meta(self, number: int) -> dict | None:
+        with self.lock:
+            row = self.connect().execute("SELECT meta FROM volume_pages WHERE number=?", (number,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    def set_meta(self, number: int, meta: dict):
+        with self.lock:
+            connection = self.connect()
+            with connection:
+                connection.execute(
+                    """INSERT INTO volume_pages(number, is_text, meta) VALUES (?, 1, ?)
+ON CONFLICT(number) DO UPDATE SET meta=excluded.meta""",
+                    (number, json.dumps(meta)),
+                )
+
+    def numbers(self) -> list[int]:
+        with self.lock:
+            rows = (
+                self.connect()
+                .execute("SELECT number FROM volume_pages WHERE page IS NOT NULL ORDER BY number")
+                .fetchall()
+            )
+        return [row[0] for row in rows]
+
+    def iter_pages(self) -> Iterator[tuple[int, str | bytes]]:
+        # one query per batch instead of one per volume - the lock is not held while yielding
+        last_number = None
+        while True:
+            with self.lock:
+                rows = (
+                    self.connect()
+                    .execute(
+                        """SELECT number, is_text, page FROM volume_pages
+WHERE page IS NOT NULL AND (? IS NULL OR number > ?) ORDER BY number LIMIT ?""",
+                        (last_number, last_number, self.batch_size),
+                    )
+                    .fetchall()
+                )
+            for number, is_text, page in rows:
+                yield number, self.decode(is_text, page)
+            if len(rows) < self.batch_size:
+                break
+            last_number = rows[-1][0]
+
+    def copy_from(self, other: VolumePageStore) -> int:
+        # one transaction for the bulk import
+        count = 0
+        with self.lock:
+            connection = self.connect()
+            with connection:
+                for number, html in other.iter_pages():
+                    is_text = isinstance(html, str)
+                    raw = html.encode("utf-8") if isinstance(html, str) else html
+                    meta = other.get_meta(number)
+                    connection.execute(
+                        "INSERT OR REPLACE INTO volume_pages(number, is_text, page, meta) VALUES (?, ?, ?, ?)",
+                        (
+                            number,
+                            int(is_text),
+                            zlib.compress(raw, self.compress_level),
+                            json.dumps(meta) if meta is not None else None,
+                        ),
+                    )
+                    count += 1
+        return count
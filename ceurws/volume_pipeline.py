@@ -0,0 +1,158 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import datetime
+import json
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from ceurws.config import CEURWS
+from ceurws.indexparser import ParserConfig
+from ceurws.utils.webscrape import CircuitBreaker, HostRateLimiter, RetryPolicy
+from ceurws.volumeparser import VolumeParser
+
+
+class VolumePageFetcher:
+    """
+    fetch stage for volume pages
+
+    keeps up to parser_config.fetch_workers volume pages in flight
+    while yielding the pages in the order of the requested volume numbers
+    so that the parsing can stay sequential and ordered
+    """
+
+    def __init__(self, parser_config: ParserConfig, timeout: float = 3):
+        """
+        constructor
+
+        Args:
+            parser_config(ParserConfig): the parser configuration with the worker count and rate limit
+            timeout(float): the number of seconds to wait for a volume page
+        """
+        self.parser_config = parser_config
+        self.rate_limiter = HostRateLimiter(parser_config.requests_per_second)
+        self.retry_policy = RetryPolicy(
+            max_retries=parser_config.max_retries,
+            backoff_factor=parser_config.backoff_factor,
+        )
+        self.circuit_breaker = CircuitBreaker(cooldown=parser_config.circuit_cooldown)
+        self.volume_parser = VolumeParser(
+            timeout=timeout,
+            debug=parser_config.debug,
+            rate_limiter=self.rate_limiter,
+            retry_policy=self.retry_policy,
+            circuit_breaker=self.circuit_breaker,
+            html_parser=parser_config.html_parser,
+        )
+
+    @property
+    def failed_volumes(self) -> dict[int, str]:
+        """
+        the volumes whose page could not be fetched due to a transient error with the reason by number
+        """
+        return self.volume_parser.failed_volumes
+
+    def fetch(self, numbers: Iterable[int | None], use_cache: bool = True) -> Iterator[str | bytes | None]:
+        """
+        fetch the volume pages for the given volume numbers
+
+        Args:
+            numbers: the volume numbers to fetch - None entries are passed through as None pages
+            use_cache: If True use volume page from cache if present otherwise load from web and cache
+
+        Yields:
+            the html of each volume page in the order of the given numbers or None if not available
+        """
+        workers = max(1, self.parser_config.fetch_workers)
+        pending: deque[Future | None] = deque()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="volume-fetch") as executor:
+            for number in numbers:
+                if number is None:
+                    pending.append(None)
+                else:
+                    future = executor.submit(self.volume_parser.get_volume_page, number, not use_cache)
+                    pending.append(future)
+                # bounded: never more than workers pages in flight
+                while len(pending) > workers:
+                    yield self.result(pending.popleft())
+            while pending:
+                yield self.result(pending.popleft())
+
+    def result(self, future: Future | None) -> str | bytes | None:
+        """
+        get the page of the given future waiting for it if necessary
+        """
+        page = future.result() if future is not None else None
+        return page
+
+
+class FailedVolumes:
+    """
+    the numbers of the volumes whose page could not be fetched
+    due to a transient error for a follow-up retry pass
+    """
+
+    def __init__(self, path: Path | None = None):
+        """
+        constructor
+
+        Args:
+            path: the path of the json file - default: failed_volumes.json in the CEUR-WS cache directory
+        """
+        self.path = path if path is not None else CEURWS.CACHE_DIR.joinpath("failed_volumes.json")
+
+    def load(self) -> dict[int, str]:
+        """
+        load the failed volumes of the last run
+
+        Returns:
+            dict: the reason of the failure by volume number
+        """
+        if not self.path.is_file():
+            return {}
+        with open(self.path, encoding="utf-8") as json_file:
+            record = json.load(json_file)
+        failed = {int(number): reason for number, reason in record.get("volumes", {}).items()}
+        return failed
+
+    def save(self, failed: dict[int, str]):
+        """
+        save the given failed volumes replacing the failed volumes of the last run
+
+        Args:
+            failed: the reason of the failure by volume number
+        """
+        if not failed:
+            self.path.unlink(missing_ok=True)
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        record = {
+            "updated": datetime.datetime.now().isoformat(),
+            "volumes": {str(number): reason for number, reason in sorted(failed.items())},
+        }
+        with open(self.path, "w", encoding="utf-8") as json_file:
+            json.dump(record, json_file, indent=2)
+
+    def merge(self, fetched: Iterable[int], failed: dict[int, str]) -> dict[int, str]:
+        """
+        merge the failed volumes of a run into the failed volumes of the last runs
+        keeping the failed volumes that have not been fetched in this run
+
+        Args:
+            fetched: the numbers of the volumes whose page was fetched in this run
+            failed: the reason of the failure by volume number of this run
+
+        Returns:
+            dict: the saved failed volumes
+        """
+        merged = self.load()
+        for number in fetched:
+            merged.pop(number, None)
+        merged.update(failed)
+        self.save(merged)
+        return merged
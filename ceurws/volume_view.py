@@ -285,9 +285,10 @@ class VolumeListView(View):
             self.clear_msg(msg)
             # First, sort selected_rows by the volume number in ascending order
             sorted_rows = sorted(selected_rows, key=lambda row: row["#"])
-            for row in sorted_rows:
-                vol_number = row["#"]
-                volume = self.wdSync.volumesByNumber[vol_number]
+            volumes = [self.wdSync.volumesByNumber[row["#"]] for row in sorted_rows]
+            # one batched lookup for all selected volumes instead of several queries per volume
+            self.wdSync.prefetchVolumes(volumes)
+            for volume in volumes:
                 self.add_or_update_volume_in_wikidata(volume)
             pass
         except Exception as ex:
@@ -4,8 +4,8 @@ Created on 2022-08-14
 @author: wf
 """
 
-import os
 import re
+from collections.abc import Iterator
 from pathlib import Path
 
 from bs4 import BeautifulSoup, NavigableString, PageElement, Tag
@@ -13,7 +13,8 @@ from bs4 import BeautifulSoup, NavigableString, PageElement, Tag
 from ceurws.config import CEURWS
 from ceurws.textparser import Textparser
 from ceurws.urn import URN
-from ceurws.utils.webscrape import ScrapeDescription, WebScrape
+from ceurws.utils.webscrape import CircuitBreaker, HostRateLimiter, RetryPolicy, ScrapeDescription, WebScrape
+from ceurws.volume_page_store import DirectoryVolumePageStore, SqliteVolumePageStore, VolumePageStore
 
 
 class VolumeParser(Textparser):
@@ -23,25 +24,41 @@ class VolumeParser(Textparser):
 
     def __init__(
         self,
-        baseurl: str = "http://ceur-ws.org",
+        baseurl: str | None = None,
         timeout: float = 3,
         showHtml: bool = False,
         debug: bool = False,
+        rate_limiter: HostRateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        html_parser: str | None = None,
     ):
         """
         Constructor
 
         Args:
-            baseurl(str): the baseurl of the CEUR-WS website,
+            baseurl(str): the baseurl of the CEUR-WS website - default: CEURWS.URL
             timeout(float): the number of seconds to wait
             showHtml(bool): if True show the HTML code
             debug(bool): if True switch debugging on
+            rate_limiter(HostRateLimiter): optional rate limiter for fetching volume pages
+            retry_policy(RetryPolicy): optional retry policy for fetching volume pages
+            circuit_breaker(CircuitBreaker): optional circuit breaker for fetching volume pages
+            html_parser(str): the BeautifulSoup tree builder for the volume pages see WebScrape
         """
         Textparser.__init__(self, debug=debug)
         self.showHtml = showHtml
-        self.baseurl = baseurl
+        self.baseurl = baseurl if baseurl is not None else CEURWS.URL
         self.timeout = timeout
-        self.scrape = WebScrape(timeout=timeout)
+        self.scrape = WebScrape(
+            timeout=timeout,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+            html_parser=html_parser,
+        )
+        # the volumes whose page could not be fetched due to a transient error with the reason by number
+        self.failed_volumes: dict[int, str] = {}
 
     def volumeUrl(self, volnumber: str | int):
         """
@@ -102,12 +119,42 @@ class VolumeParser(Textparser):
         if not recache and VolumePageCache.is_cached(number):
             volume_page = VolumePageCache.get(number)
         else:
-            url = self.volumeUrl(number)
-            volume_page = self.scrape.get_html_from_url(url)
-            if volume_page:
-                VolumePageCache.cache(number, volume_page)
+            volume_page, _modified = self.revalidate_volume_page(number)
         return volume_page
 
+    def revalidate_volume_page(self, number: int) -> tuple[str | bytes | None, bool]:
+        """
+        fetch the volume page of the given volume number from ceur-ws.org
+        conditionally using the ETag and Last-Modified metadata of the cached page.
+        The cache is only written if the page has been modified.
+
+        Args:
+            number: volume number
+
+        Returns:
+            tuple: the html of the volume page or None if not available
+            and a flag that is False if the cached page is still valid
+        """
+        meta = VolumePageCache.get_meta(number) if VolumePageCache.is_cached(number) else None
+        url = self.volumeUrl(number)
+        fetch_result = self.scrape.fetch(
+            url,
+            etag=meta.get("etag") if meta else None,
+            last_modified=meta.get("last_modified") if meta else None,
+        )
+        if fetch_result.failed:
+            self.failed_volumes[number] = str(fetch_result.error)
+        else:
+            self.failed_volumes.pop(number, None)
+        if fetch_result.not_modified:
+            VolumePageCache.set_meta(number, fetch_result.as_meta())
+            return VolumePageCache.get(number), False
+        volume_page = fetch_result.html
+        if volume_page:
+            VolumePageCache.cache(number, volume_page)
+            VolumePageCache.set_meta(number, fetch_result.as_meta())
+        return volume_page, True
+
     def parse_volume(self, number: int, use_cache: bool = True) -> tuple[dict, BeautifulSoup | None]:
         """
         parse the given volume
@@ -121,6 +168,34 @@ class VolumeParser(Textparser):
             dict: extracted information
         """
         soup = self.get_volume_soup(number, use_cache=use_cache)
+        return self.parse_volume_soup(number, soup)
+
+    def parse_volume_page(self, number: int, html: str | bytes | None) -> tuple[dict, BeautifulSoup | None]:
+        """
+        parse the given html of the volume page of the given volume
+        e.g. a page that has already been fetched by a VolumePageFetcher
+
+        Args:
+            number: volume number of the volume to parse
+            html: the html of the volume page
+
+        Returns:
+            dict: extracted information
+        """
+        soup = self.scrape.get_soup_from_string(html, show_html=self.showHtml) if html is not None else None
+        return self.parse_volume_soup(number, soup)
+
+    def parse_volume_soup(self, number: int, soup: BeautifulSoup | None) -> tuple[dict, BeautifulSoup | None]:
+        """
+        parse the given soup of the volume page of the given volume
+
+        Args:
+            number: volume number of the volume to parse
+            soup: the soup of the volume page
+
+        Returns:
+            dict: extracted information
+        """
         parsed_dict = self.parse_soup(number=str(number), soup=soup) if soup else {}
         self.check_parsed_dict(parsed_dict)
         return parsed_dict, soup
@@ -198,7 +273,7 @@ class VolumeParser(Textparser):
         # first h3 has loctime
         firstH3 = soup.find("h3")
         if firstH3 is not None:
-            h3 = firstH3.text
+            h3 = self.getHeadingText(firstH3)
             h3 = Textparser.sanitize(h3)
             scrapedDict["h3"] = h3
 
@@ -216,6 +291,49 @@ class VolumeParser(Textparser):
         # scrapedDict["editors"] = editorsRecords
         return scrapedDict
 
+    # the elements that end a heading - html.parser nests the rest of a legacy page
+    # in a heading without end tag while lxml closes the heading before them
+    HEADING_END_TAGS = {
+        "blockquote",
+        "center",
+        "div",
+        "dl",
+        "form",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "hr",
+        "ol",
+        "p",
+        "pre",
+        "table",
+        "ul",
+    }
+
+    @classmethod
+    def getHeadingText(cls, heading: Tag) -> str:
+        """
+        get the text of the given heading up to the first element that ends it
+        so that the text is the same for both tree builders
+
+        Args:
+            heading(Tag): the heading element
+
+        Returns:
+            str: the text of the heading
+        """
+        texts = []
+        for node in heading.descendants:
+            if isinstance(node, Tag):
+                if node.name in cls.HEADING_END_TAGS:
+                    break
+            elif isinstance(node, tuple(heading.interesting_string_types)):
+                texts.append(str(node))
+        return "".join(texts)
+
     def parseEditors(self, soup: BeautifulSoup):
         """
         parse all editor information contained in the given soup
@@ -437,9 +555,89 @@ class VolumeParser(Textparser):
 class VolumePageCache:
     """
     Cache interface for ceur-ws volume pages
+
+    the pages are kept in a pluggable VolumePageStore - by default one file per volume
+    in the cache_location directory, see use_archive for the single file archive
     """
 
     cache_location: Path = CEURWS.CACHE_DIR / "volumes"
+    archive_location: Path = CEURWS.CACHE_DIR / "volumes.db"
+    store: VolumePageStore | None = None
+
+    @classmethod
+    def get_store_config_path(cls) -> Path:
+        """
+        get the path of the persisted store choice - kept in the cache_location directory
+        """
+        return cls.cache_location / "volume_store.json"
+
+    @classmethod
+    def get_store(cls) -> VolumePageStore:
+        """
+        get the store of the volume pages
+
+        Returns:
+            VolumePageStore: the configured store, the archive chosen by a previous use_archive
+            or the directory store at cache_location
+        """
+        if cls.store is not None:
+            return cls.store
+        store_config = cls.read_meta(cls.get_store_config_path())
+        if store_config is not None and store_config.get("store") == "archive":
+            cls.store = SqliteVolumePageStore(Path(store_config["archive_path"]))
+            return cls.store
+        return DirectoryVolumePageStore(cls.cache_location)
+
+    @classmethod
+    def use_archive(cls, archive_path: Path | None = None, import_directory: bool = True) -> int:
+        """
+        keep the volume pages in a single compressed SQLite archive
+        the choice is persisted so that later runs use the archive as well
+
+        Args:
+            archive_path: the path of the archive - defaults to archive_location
+            import_directory: if True and the archive is empty import the pages from cache_location
+
+        Returns:
+            int: the number of imported volume pages
+        """
+        store = SqliteVolumePageStore(archive_path if archive_path is not None else cls.archive_location)
+        imported = 0
+        if import_directory and not store.numbers():
+            imported = store.copy_from(DirectoryVolumePageStore(cls.cache_location))
+        if cls.store is not None:
+            cls.store.close()
+        cls.store = store
+        cls.cache_location.mkdir(parents=True, exist_ok=True)
+        cls.write_meta(cls.get_store_config_path(), {"store": "archive", "archive_path": str(store.db_path.absolute())})
+        return imported
+
+    @classmethod
+    def use_directory(cls):
+        """
+        keep the volume pages in one file per volume at cache_location
+        the choice is persisted so that later runs use the directory as well
+        """
+        if cls.store is not None:
+            cls.store.close()
+        cls.store = None
+        store_config_path = cls.get_store_config_path()
+        if store_config_path.is_file():
+            store_config_path.unlink()
+
+    @classmethod
+    def export_directory(cls, location: Path | None = None) -> int:
+        """
+        export the volume pages of the current store to the directory layout
+
+        Args:
+            location: the target directory - defaults to cache_location
+
+        Returns:
+            int: the number of exported volume pages
+        """
+        target = DirectoryVolumePageStore(location if location is not None else cls.cache_location)
+        return target.copy_from(cls.get_store())
 
     @classmethod
     def is_cached(cls, number: int) -> bool:
@@ -451,7 +649,7 @@ class VolumePageCache:
         Returns:
             True if the corresponding volume page is cached
         """
-        return cls._get_volume_cache_path(number).is_file()
+        return cls.get_store().is_cached(number)
 
     @classmethod
     def cache(cls, number: int, html: str | bytes):
@@ -463,19 +661,55 @@ class VolumePageCache:
         """
         if html is None:
             return
-        Path(cls.cache_location).mkdir(parents=True, exist_ok=True)
-        filename = cls._get_volume_cache_path(number)
-        mode = "wb" if isinstance(html, bytes) else "w"
-        encoding = None if isinstance(html, bytes) else "utf-8"
-        with open(filename, mode=mode, encoding=encoding) as f:
-            f.write(html)
+        cls.get_store().put(number, html)
+
+    @classmethod
+    def get_meta(cls, number: int) -> dict | None:
+        """
+        get the fetch metadata (etag, last_modified, fetched) of the cached volume page
+
+        Args:
+            number: volume number
+
+        Returns:
+            dict: the metadata or None if there is none
+        """
+        return cls.get_store().get_meta(number)
 
     @classmethod
-    def _get_volume_cache_path(cls, number: int) -> Path:
+    def set_meta(cls, number: int, meta: dict):
+        """
+        set the fetch metadata of the cached volume page
+
+        Args:
+            number: volume number
+            meta: the metadata to store
+        """
+        cls.get_store().set_meta(number, meta)
+
+    @staticmethod
+    def read_meta(meta_path: Path) -> dict | None:
+        """
+        read the fetch metadata from the given json file
+
+        Args:
+            meta_path: path of the metadata file
+
+        Returns:
+            dict: the metadata or None if the file does not exist or is invalid
+        """
+        return DirectoryVolumePageStore.read_meta(meta_path)
+
+    @staticmethod
+    def write_meta(meta_path: Path, meta: dict):
         """
-        get the name of the volume cache file
+        write the given fetch metadata to the given json file
+
+        Args:
+            meta_path: path of the metadata file
+            meta: the metadata to write
         """
-        return cls.cache_location / f"Vol-{number}.html"
+        DirectoryVolumePageStore.write_meta(meta_path, meta)
 
     @classmethod
     def get(cls, number: int) -> str | bytes | None:
@@ -490,14 +724,17 @@ class VolumePageCache:
             bytes: if the cached volume page contains encoding errors
             None: if no volume with the given number is cached
         """
-        volume_page: str | bytes | None = None
-        if cls.is_cached(number):
-            filepath = cls._get_volume_cache_path(number)
-            try:
-                volume_page = filepath.read_text()
-            except UnicodeDecodeError as _ex:
-                volume_page = filepath.read_bytes()
-        return volume_page
+        return cls.get_store().get(number)
+
+    @classmethod
+    def iter_pages(cls) -> Iterator[tuple[int, str | bytes]]:
+        """
+        iterate over all cached volume pages in the order of the volume numbers
+
+        Yields:
+            tuple: volume number and volume page
+        """
+        yield from cls.get_store().iter_pages()
 
     @classmethod
     def delete(cls, number: int):
@@ -506,6 +743,4 @@ class VolumePageCache:
         Args:
             number: volume number
         """
-        if cls.is_cached(number):
-            filepath = cls._get_volume_cache_path(number)
-            os.remove(filepath)
+        cls.get_store().delete(number)
@@ -5,17 +5,25 @@ Created on 2024-02-22
 """
 
 import os
+import sys
+from collections.abc import Callable, Hashable, Iterable
 from pathlib import Path
+from typing import Any
 
 import orjson
-from fastapi import HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from ngwidgets.input_webserver import InputWebserver, InputWebSolution
 from ngwidgets.webserver import WebserverConfig
-from nicegui import Client, app, ui
+from nicegui import Client, app, run, ui
 from nicegui.events import ValueChangeEventArguments
 
-from ceurws.models.dblp import DblpPaper, DblpProceeding, DblpScholar
+from ceurws.dblp_index import DblpIndex, SortedStore
+from ceurws.models.dblp import DblpPaper, DblpProceeding, DblpScholar, lod_storable_default
+from ceurws.record_pager import RecordPager
+from ceurws.response_cache import ResponseCache
+from ceurws.single_flight import SingleFlight
 from ceurws.version import Version
 from ceurws.volume_view import VolumeListView, VolumeView
 from ceurws.wikidata_view import WikidataView
@@ -46,6 +54,16 @@ class CeurWsWebServer(InputWebserver):
         constructor
         """
         InputWebserver.__init__(self, config=CeurWsWebServer.get_config())
+        self.volumePager = RecordPager(key="number")
+        self.paperPager = RecordPager(key="id")
+        # the proceedings are paged in SQL by their URN see proceedingsPagedResponse
+        self.proceedingsPager = RecordPager(key="URN_NBN")
+        # the maximum page size of the dblp list routes see dblpPage
+        self.dblpMaxLimit = 10000
+        # blocking loads run in the thread pool - concurrent cold requests share one load
+        self.singleFlight = SingleFlight()
+        # serialized complete datasets with ETags
+        self.responseCache = ResponseCache()
 
         @ui.page("/volumes")
         async def show_volumes(client: Client):
@@ -60,97 +78,171 @@ class CeurWsWebServer(InputWebserver):
             return await self.page(client, CeurWsSolution.wikidatasync)
 
         @app.get("/volumes.json", response_class=JSONResponse)
-        async def volumes():
+        async def volumes(
+            request: Request,
+            cursor: str | None = None,
+            limit: int | None = None,
+            fields: str | None = None,
+            format: str = "json",
+        ):
             """
             direct fastapi return of volumes
+
+            paged by volume number with the cursor of the X-Next-Cursor header if a limit is given
+            fields is a comma separated list of the fields to return
+            format ndjson streams one JSON record per line
             """
+            # the version before the list so that a concurrent update does not go unnoticed
+            version = self.wdSync.vm.dataVersion
             volumeList = self.wdSync.vm.getList()
-            return volumeList
+            if cursor is None and limit is None and fields is None and format == "json":
+                return await self.cachedResponse(request, "volumes", version, lambda: jsonable_encoder(volumeList))
+            return self.pagedResponse(request, self.volumePager, volumeList, version, cursor, limit, fields, format)
 
         @app.get("/proceedings.json")
-        async def proceedings():
+        async def proceedings(
+            request: Request,
+            cursor: str | None = None,
+            limit: int | None = None,
+            fields: str | None = None,
+            format: str = "json",
+        ):
             """
             direct fastapi return of proceedings
+
+            paged by URN - see volumes.json for the paging, field selection and format parameters
             """
-            proceedingsList = self.wdSync.loadProceedingsFromCache()
-            return proceedingsList
+            if cursor is None and limit is None and fields is None and format == "json":
+                proceedingsList = await self.singleFlight.do("proceedings", self.wdSync.loadProceedingsFromCache)
+                return proceedingsList
+            return await run.io_bound(self.proceedingsPagedResponse, request, cursor, limit, fields, format)
 
         @app.get("/papers.json")
-        async def papers():
+        async def papers(
+            request: Request,
+            cursor: str | None = None,
+            limit: int | None = None,
+            fields: str | None = None,
+            format: str = "json",
+        ):
             """
             direct fastapi return of papers
+
+            paged by paper id - see volumes.json for the paging, field selection and format parameters
             """
+            version = self.wdSync.pm.dataVersion
             paperList = self.wdSync.pm.getList()
-            return paperList
+            if cursor is None and limit is None and fields is None and format == "json":
+                return await self.cachedResponse(request, "papers", version, lambda: jsonable_encoder(paperList))
+            return self.pagedResponse(request, self.paperPager, paperList, version, cursor, limit, fields, format)
 
         @app.get(
             "/papers_dblp.json",
             tags=["dblp complete dataset"],
             # response_model= List[DblpPaper]
         )
-        async def papers_dblp():
+        async def papers_dblp(request: Request):
             """
             direct fastapi return of paper information from dblp
             """
-            self.wdSync.dblpEndpoint.dblp_papers.load()
-            papers = self.wdSync.dblpEndpoint.dblp_papers.papers
-            records = [p.to_json() for p in papers]
-            lod = [orjson.loads(json_str) for json_str in records]
-            return lod
+            dblp_papers = self.wdSync.dblpEndpoint.dblp_papers
+            if dblp_papers.papers is None:
+                await self.singleFlight.do("dblp/papers", dblp_papers.load)
+            return await self.cachedResponse(
+                request,
+                "papers_dblp",
+                dblp_papers.dataVersion,
+                lambda: dblp_papers.papers,
+                default=lod_storable_default,
+            )
 
         @app.get(
             "/authors_dblp.json",
             tags=["dblp complete dataset"],
             # response_model=List[DblpAuthor]
         )
-        async def authors_papers_dblp():
+        async def authors_papers_dblp(request: Request):
             """
             direct fastapi return of paper information from dblp
             """
             authors = self.wdSync.dblpEndpoint.dblp_authors
-            authors.load()
-            return authors.lod
+            if authors.authors is None:
+                await self.singleFlight.do("dblp/authors", authors.load)
+            return await self.cachedResponse(request, "authors_dblp", authors.dataVersion, lambda: authors.lod)
 
         @app.get("/dblp/papers", tags=["dblp complete dataset"])
-        async def dblp_papers(limit: int = 100, offset: int = 0) -> list[DblpPaper]:
+        async def dblp_papers(
+            response: Response,
+            limit: int = 100,
+            offset: int = 0,
+            cursor: str | None = None,
+            volume_from: int | None = None,
+            volume_to: int | None = None,
+            author_id: str | None = None,
+        ) -> list[DblpPaper]:
             """
-            Get ceur-ws volumes form dblp
+            Get ceur-ws papers from dblp sorted by volume number
             Args:
                 limit: max number of returned papers
-                offset:
+                offset: number of papers to skip
+                cursor: the X-Next-Cursor header of the previous page
+                volume_from: lowest volume number
+                volume_to: highest volume number
+                author_id: dblp author id of the papers
 
             Returns:
+                the papers of the page
             """
-            self.wdSync.dblpEndpoint.dblp_papers.load()
-            papers = self.wdSync.dblpEndpoint.dblp_papers.papers
-            return papers[offset:limit]
+            dblp_index = await self.getDblpIndex()
+            lookups = {"author": author_id} if author_id else None
+            return self.dblpPage(response, dblp_index.papers, limit, offset, cursor, volume_from, volume_to, lookups)
 
         @app.get("/dblp/editors", tags=["dblp complete dataset"])
-        async def dblp_editors(limit: int = 100, offset: int = 0) -> list[DblpScholar]:
+        async def dblp_editors(
+            response: Response,
+            limit: int = 100,
+            offset: int = 0,
+            cursor: str | None = None,
+        ) -> list[DblpScholar]:
             """
-            Get ceur-ws volume editors form dblp
+            Get ceur-ws volume editors from dblp sorted by dblp author id
             Args:
-                limit: max number of returned papers
-                offset:
+                limit: max number of returned editors
+                offset: number of editors to skip
+                cursor: the X-Next-Cursor header of the previous page
 
             Returns:
+                the editors of the page
             """
-            self.wdSync.dblpEndpoint.dblp_editors.load()
-            editors = self.wdSync.dblpEndpoint.dblp_editors.lod
-            return editors[offset:limit]
+            dblp_index = await self.getDblpIndex()
+            return self.dblpPage(response, dblp_index.editors, limit, offset, cursor)
 
         @app.get("/dblp/volumes", tags=["dblp complete dataset"])
-        async def dblp_volumes(limit: int = 100, offset: int = 0) -> list[DblpProceeding]:
+        async def dblp_volumes(
+            response: Response,
+            limit: int = 100,
+            offset: int = 0,
+            cursor: str | None = None,
+            volume_from: int | None = None,
+            volume_to: int | None = None,
+            editor_id: str | None = None,
+        ) -> list[DblpProceeding]:
             """
-            Get ceur-ws volumes form dblp
+            Get ceur-ws volumes from dblp sorted by volume number
             Args:
-                limit: max number of returned papers
-                offset:
+                limit: max number of returned volumes
+                offset: number of volumes to skip
+                cursor: the X-Next-Cursor header of the previous page
+                volume_from: lowest volume number
+                volume_to: highest volume number
+                editor_id: dblp author id of an editor of the volumes
 
             Returns:
+                the volumes of the page
             """
-            proceedings = self.wdSync.dblpEndpoint.dblp_volumes.load()
-            return proceedings[offset:limit]
+            dblp_index = await self.getDblpIndex()
+            lookups = {"editor": editor_id} if editor_id else None
+            return self.dblpPage(response, dblp_index.volumes, limit, offset, cursor, volume_from, volume_to, lookups)
 
         @app.get("/dblp/volume/{volume_number}", tags=["dblp"])
         async def dblp_volume(volume_number: int) -> DblpProceeding:
@@ -158,7 +250,7 @@ class CeurWsWebServer(InputWebserver):
             Get ceur-ws volume form dblp
             """
             try:
-                proceeding = self.wdSync.dblpEndpoint.get_ceur_proceeding(volume_number)
+                proceeding = await self.getDblpProceeding(volume_number)
             except Exception as e:
                 raise HTTPException(status_code=404, detail=str(e)) from e
             if proceeding:
@@ -172,11 +264,11 @@ class CeurWsWebServer(InputWebserver):
             Get ceur-ws volume editors form dblp
             """
             try:
-                proceeding = self.wdSync.dblpEndpoint.get_ceur_proceeding(volume_number)
+                proceeding = await self.getDblpProceeding(volume_number)
             except Exception as e:
                 raise HTTPException(status_code=404, detail=str(e)) from e
             if proceeding:
-                return proceeding.editors
+                return proceeding.editors or []
             else:
                 raise HTTPException(status_code=404, detail="Volume not found")
 
@@ -189,7 +281,11 @@ class CeurWsWebServer(InputWebserver):
 
             Returns:
             """
-            papers = self.wdSync.dblpEndpoint.get_ceur_volume_papers(volume_number)
+            papers = await self.singleFlight.do(
+                f"dblp/Vol-{volume_number}/papers",
+                self.wdSync.dblpEndpoint.get_ceur_volume_papers,
+                volume_number,
+            )
             return papers
 
         @app.get("/dblp/volume/{volume_number}/paper/{paper_id}", tags=["dblp"])
@@ -197,14 +293,7 @@ class CeurWsWebServer(InputWebserver):
             """
             Get ceur-ws volume paper form dblp
             """
-            papers = self.wdSync.dblpEndpoint.get_ceur_volume_papers(volume_number)
-            if papers:
-                for paper in papers:
-                    if paper.pdf_id == f"Vol-{volume_number}/{paper_id}":
-                        return paper
-                raise HTTPException(status_code=404, detail="Paper not found")
-            else:
-                raise HTTPException(status_code=404, detail="Volume not found")
+            return await self.getDblpPaper(volume_number, paper_id)
 
         @app.get(
             "/dblp/volume/{volume_number}/paper/{paper_id}/author",
@@ -214,14 +303,209 @@ class CeurWsWebServer(InputWebserver):
             """
             Get ceur-ws volume paper form dblp
             """
-            papers = self.wdSync.dblpEndpoint.get_ceur_volume_papers(volume_number)
-            if papers:
-                for paper in papers:
-                    if paper.pdf_id == f"Vol-{volume_number}/{paper_id}":
-                        return paper.authors
-                raise HTTPException(status_code=404, detail="Paper not found")
-            else:
+            paper = await self.getDblpPaper(volume_number, paper_id)
+            return paper.authors or []
+
+    async def getDblpIndex(self) -> DblpIndex:
+        """
+        get the dblp index - the first call loads it in a background thread
+        """
+        dblp_endpoint = self.wdSync.dblpEndpoint
+        if dblp_endpoint.dblp_index is not None:
+            return dblp_endpoint.dblp_index
+        return await self.singleFlight.do("dblp", dblp_endpoint.get_dblp_index)
+
+    async def getDblpPaper(self, volume_number: int, paper_id: str) -> DblpPaper:
+        """
+        get the dblp paper with the given id of the given volume with a dictionary lookup
+
+        Raises:
+            HTTPException: if the volume or paper is not found
+        """
+        await self.getDblpIndex()
+        dblp_papers = self.wdSync.dblpEndpoint.dblp_papers
+        paper = self.wdSync.dblpEndpoint.get_ceur_volume_paper(volume_number, paper_id)
+        if paper is None:
+            if volume_number not in dblp_papers.papers_by_volume:
                 raise HTTPException(status_code=404, detail="Volume not found")
+            raise HTTPException(status_code=404, detail="Paper not found")
+        return paper
+
+    async def getDblpProceeding(self, volume_number: int) -> DblpProceeding:
+        """
+        get the dblp proceeding of the given volume from its cache file
+        """
+        return await self.singleFlight.do(
+            f"dblp/Vol-{volume_number}/metadata",
+            self.wdSync.dblpEndpoint.get_ceur_proceeding,
+            volume_number,
+        )
+
+    async def cachedResponse(
+        self,
+        request: Request,
+        name: str,
+        version: Hashable,
+        get_data: Callable[[], Any],
+        default: Callable[[Any], Any] | None = None,
+    ) -> Response:
+        """
+        get the response of the given complete dataset from the response cache
+        serializing it in the thread pool if the dataset version changed
+
+        Args:
+            request: the request with the If-None-Match and Accept-Encoding headers
+            name: the name of the response
+            version: the version of the dataset e.g. the data version of the manager it is built from
+            get_data: the function to get the data
+            default: the orjson default function for types orjson does not serialize natively
+        """
+        entry = self.responseCache.lookup(name, version)
+        if entry is None:
+            entry = await self.singleFlight.do(
+                f"response/{name}", self.responseCache.build, name, version, get_data, default
+            )
+        return self.responseCache.response(request, entry)
+
+    def recordsResponse(
+        self, request: Request, items: Iterable[dict], next_cursor: str | None, format: str
+    ) -> Response:
+        """
+        get the response for the given records as JSON list or streamed NDJSON lines
+        with the cursor of the next page in the X-Next-Cursor and Link headers
+
+        Args:
+            request: the request for the link to the next page
+            items: the records
+            next_cursor: the cursor of the next page - None for the last page
+            format: json or ndjson
+        """
+        headers = {}
+        if next_cursor is not None:
+            headers["X-Next-Cursor"] = next_cursor
+            next_url = request.url.include_query_params(cursor=next_cursor)
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        if format == "ndjson":
+            return StreamingResponse(RecordPager.to_ndjson(items), media_type="application/x-ndjson", headers=headers)
+        return Response(orjson.dumps(list(items), default=str), media_type="application/json", headers=headers)
+
+    def checkFormat(self, format: str):
+        """
+        check the given response format
+
+        Raises:
+            HTTPException: for an unknown format
+        """
+        if format not in ("json", "ndjson"):
+            raise HTTPException(status_code=400, detail=f"unknown format {format} - use json or ndjson")
+
+    def pagedResponse(
+        self,
+        request: Request,
+        pager: RecordPager,
+        records: list,
+        version: int,
+        cursor: str | None,
+        limit: int | None,
+        fields: str | None,
+        format: str,
+    ) -> Response:
+        """
+        get the response for a page of the given records
+        the sorted records are reused by the pager as long as their data version is unchanged
+
+        Raises:
+            HTTPException: for an invalid cursor, limit or format
+        """
+        self.checkFormat(format)
+        fieldList = RecordPager.parse_fields(fields)
+        try:
+            if limit is None:
+                # stream all records after the cursor - which is checked before streaming starts
+                items: Iterable[dict] = pager.iter_records(records, cursor, None, fieldList, version)
+                next_cursor = None
+            else:
+                items, next_cursor = pager.page(records, cursor, limit, fieldList, version)
+        except ValueError as ex:
+            raise HTTPException(status_code=400, detail=str(ex)) from ex
+        return self.recordsResponse(request, items, next_cursor, format)
+
+    def proceedingsPagedResponse(
+        self,
+        request: Request,
+        cursor: str | None,
+        limit: int | None,
+        fields: str | None,
+        format: str,
+    ) -> Response:
+        """
+        get the response for a page of the proceedings table paged by URN
+        so that only the requested rows are read
+
+        Raises:
+            HTTPException: for an invalid cursor, limit or format
+        """
+        self.checkFormat(format)
+        fieldList = RecordPager.parse_fields(fields)
+        pager = self.proceedingsPager
+        try:
+            after = RecordPager.decode_cursor(cursor) if cursor is not None else ""
+            if not isinstance(after, str):
+                raise ValueError(f"invalid cursor {cursor}")
+            pager.check_limit(limit)
+        except ValueError as ex:
+            raise HTTPException(status_code=400, detail=str(ex)) from ex
+        if limit is None:
+            rows = self.wdSync.iterProceedingsFromCache(after)
+            items: Iterable[dict] = (RecordPager.select(record, fieldList) for record in rows)
+            return self.recordsResponse(request, items, None, format)
+        # one more row to know whether there is a next page
+        records = list(self.wdSync.iterProceedingsFromCache(after, limit + 1))
+        next_cursor = RecordPager.encode_cursor(records[limit - 1][pager.key]) if len(records) > limit else None
+        items = [RecordPager.select(record, fieldList) for record in records[:limit]]
+        return self.recordsResponse(request, items, next_cursor, format)
+
+    def dblpPage(
+        self,
+        response: Response,
+        store: SortedStore,
+        limit: int,
+        offset: int,
+        cursor: str | None,
+        volume_from: int | None = None,
+        volume_to: int | None = None,
+        lookups: dict[str, str] | None = None,
+    ) -> list:
+        """
+        get a page of the given dblp store setting the X-Next-Cursor header for the next page
+
+        Raises:
+            HTTPException: for an invalid limit, offset or cursor
+        """
+        if not 0 < limit <= self.dblpMaxLimit or offset < 0:
+            raise HTTPException(
+                status_code=400,
+                detail=f"limit must be between 1 and {self.dblpMaxLimit} and offset must not be negative",
+            )
+        after = None
+        if cursor is not None:
+            try:
+                after = RecordPager.decode_cursor(cursor)
+                if not isinstance(after, list):
+                    raise ValueError(f"invalid cursor {cursor}")
+            except ValueError as ex:
+                raise HTTPException(status_code=400, detail=str(ex)) from ex
+        items, last_key = store.query(
+            offset=offset,
+            limit=limit,
+            after=tuple(after) if after is not None else None,
+            volume_from=volume_from,
+            volume_to=volume_to,
+            lookups=lookups,
+        )
+        if last_key is not None:
+            response.headers["X-Next-Cursor"] = RecordPager.encode_cursor(list(last_key))
+        return items
 
     def configure_run(self):
         """
@@ -229,7 +513,16 @@ class CeurWsWebServer(InputWebserver):
         """
         InputWebserver.configure_run(self)
         self.wdSync = WikidataSync.from_args(self.args)
-        # self.wdSync.dblpEndpoint.load_all()
+        app.on_startup(self.warmUp)
+
+    async def warmUp(self):
+        """
+        load the dblp data in the background at server start
+        so that the first requests do not have to wait for it
+        """
+        errors = await self.singleFlight.warm_up({"dblp": self.wdSync.dblpEndpoint.get_dblp_index})
+        for key, ex in errors.items():
+            print(f"warm up of {key} failed: {ex}", file=sys.stderr)
 
 
 class CeurWsSolution(InputWebSolution):
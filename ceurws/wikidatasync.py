@@ -7,6 +7,9 @@ Created on 2022-08-14
 import datetime
 import os
 import sys
+import time
+from collections import Counter
+from collections.abc import Iterator, Sequence
 
 from ez_wikidata.wdproperty import PropertyMapping, WdDatatype
 from ez_wikidata.wikidata import UrlReference, Wikidata, WikidataResult
@@ -19,6 +22,7 @@ from ceurws.ceur_ws import PaperManager, Volume, VolumeManager
 from ceurws.config import CEURWS
 from ceurws.dblp import DblpAuthorIdentifier, DblpEndpoint
 from ceurws.indexparser import ParserConfig
+from ceurws.proceedings_index import ProceedingsIndex
 
 
 class WikidataSync:
@@ -26,6 +30,11 @@ class WikidataSync:
     synchronize with wikidata
     """
 
+    # number of VALUES per batched SPARQL query
+    batchSize = 100
+    # number of seconds after which the snapshot of the Proceedings table is stale
+    proceedingsMaxAge = 86400
+
     def __init__(
         self,
         baseurl: str = "https://www.wikidata.org",
@@ -49,9 +58,18 @@ class WikidataSync:
         self.wd = Wikidata(debug=debug)
         self.sqldb = SQLDB(CEURWS.CACHE_FILE, check_same_thread=False)
         self.procRecords = None
-        self.procsByVolnumber = None
+        # the indexed volume number columns of the Proceedings table
+        self.procVolumeColumns: list[str] | None = None
         self.dblpEndpoint = DblpEndpoint(endpoint=dblp_endpoint_url)
         self.wikidata_endpoint: Endpoint | None = None
+        # results of the batched lookups see prefetchVolumes
+        self.qidsByVolnumber: dict[int, str | None] = {}
+        self.eventsByVolnumber: dict[int, list[str]] = {}
+        self.proceedingsFromByVolnumber: dict[int, bool] = {}
+        self.proceedingWdItemsByUrn: dict[str, list[str]] = {}
+        self.proceedingsIndex: ProceedingsIndex | None = None
+        # number of live queries by lookup
+        self.liveQueries: Counter = Counter()
 
     @classmethod
     def from_args(cls, args) -> "WikidataSync":
@@ -148,14 +166,15 @@ class WikidataSync:
         self.volumeList.append(volume)
         self.volumesByNumber[volume.number] = volume
         self.volumeCount += 1
+        self.vm.bumpDataVersion()
 
-    def getRecentlyAddedVolumeList(self) -> tuple[dict[int, dict], list[dict]]:
+    def getRecentlyAddedVolumeList(self) -> tuple[dict[int, Volume], list[int]]:
         """
         get the list of volumes that have recently been added
         we do not expect deletions
 
         Returns:
-            list[int]: list of volume numbers recently added
+            tuple: the volumes at the top of the index by number and the list of volume numbers recently added
 
         """
         self.prepareVolumeManager()
@@ -163,8 +182,13 @@ class WikidataSync:
         parser_config = ParserConfig()
         parser_config.force_download = True
         self.vm.set_down_to_volume(parser_config)
-        refreshVm.loadFromIndexHtml(parser_config=parser_config)
-        refreshVolumesByNumber, _duplicates = LOD.getLookup(refreshVm.getList(), "number")
+        # only the top of the index down to the latest known volume is parsed
+        refreshVolumesByNumber: dict[int, Volume] = {}
+        for volume in refreshVm.iterVolumesFromIndexHtml(parser_config=parser_config):
+            if volume.number is not None:
+                refreshVolumesByNumber[volume.number] = volume
+        if self.debug and not refreshVm.indexModified:
+            print("index.html not modified since the last fetch")
         # https://stackoverflow.com/questions/3462143/get-difference-between-two-lists
         newVolumes = list(set(list(refreshVolumesByNumber.keys())) - set(list(self.volumesByNumber.keys())))
         return refreshVolumesByNumber, newVolumes
@@ -262,8 +286,16 @@ class WikidataSync:
             failIfTooFew=False,
         )
         procsByURN, duplicates = LOD.getLookup(wd_proceedings_records, "URN_NBN")
+        updated = time.time()
         if withStore:
             self.sqldb.store(procsByURN.values(), entityInfo, executeMany=True, fixNone=True)
+            ProceedingsIndex.storeUpdated(self.sqldb, updated)
+        # the table has been recreated
+        self.procRecords = None
+        self.procVolumeColumns = ProceedingsIndex.createVolumeIndices(self.sqldb) if withStore else None
+        self.proceedingsIndex = ProceedingsIndex(
+            wd_proceedings_records, updated=updated, max_age=self.proceedingsMaxAge
+        )
         if self.debug:
             print(f"stored {len(procsByURN.values())} proceedings records")
         if len(duplicates) > 0:
@@ -272,6 +304,14 @@ class WikidataSync:
                 print(duplicates)
         return wd_proceedings_records
 
+    def getProceedingsIndex(self) -> ProceedingsIndex:
+        """
+        get the in memory index of the Proceedings table - loading it on first use
+        """
+        if self.proceedingsIndex is None:
+            self.proceedingsIndex = ProceedingsIndex.fromSqlDB(self.sqldb, max_age=self.proceedingsMaxAge)
+        return self.proceedingsIndex
+
     def loadProceedingsFromCache(self):
         """
         load the proceedings records from the cache
@@ -280,6 +320,24 @@ class WikidataSync:
         self.procRecords = self.sqldb.query(sqlQuery)
         return self.procRecords
 
+    def iterProceedingsFromCache(self, after: str = "", limit: int | None = None) -> Iterator[dict]:
+        """
+        iterate over the proceedings records of the cache in the order of their URN
+        without loading the whole table
+
+        the URN is the primary key of the Proceedings table so that the order
+        is stable when update recreates the table - records without a URN are skipped
+
+        Args:
+            after: the URN after which to start
+            limit: the maximum number of records - None for all
+
+        Yields:
+            dict: the proceedings record
+        """
+        sqlQuery = "SELECT * FROM Proceedings WHERE URN_NBN > ? ORDER BY URN_NBN LIMIT ?"
+        yield from self.sqldb.queryGen(sqlQuery, (after, limit if limit is not None else -1))
+
     def getProceedingsForVolume(self, searchVolnumber: int) -> dict | None:
         """
         get the proceedings record for the given searchVolnumber
@@ -291,18 +349,9 @@ class WikidataSync:
             dict: the record for the proceedings in wikidata
             None: if the proceeding record in not found for the given searchVolnumber
         """
-        if self.procRecords is None:
-            self.loadProceedingsFromCache()
-        if self.procsByVolnumber is None:
-            self.procsByVolnumber: dict[int, dict] = {}
-            if isinstance(self.procRecords, list):
-                for procRecord in self.procRecords:
-                    volnumber = procRecord.get("sVolume", None)
-                    if volnumber is None:
-                        procRecord.get("Volume", None)
-                    if volnumber is not None:
-                        self.procsByVolnumber[int(volnumber)] = procRecord
-        volProcRecord = self.procsByVolnumber.get(searchVolnumber, None)
+        if self.procVolumeColumns is None:
+            self.procVolumeColumns = ProceedingsIndex.createVolumeIndices(self.sqldb)
+        volProcRecord = ProceedingsIndex.queryVolume(self.sqldb, searchVolnumber, self.procVolumeColumns)
         return volProcRecord
 
     def getProceedingWdItemsByUrn(self, urn: str) -> list[str]:
@@ -314,6 +363,12 @@ class WikidataSync:
         Returns:
             List of corresponding wikidata item ids or empty list of no matching item is found
         """
+        if urn in self.proceedingWdItemsByUrn:
+            return list(self.proceedingWdItemsByUrn[urn])
+        index = self.getProceedingsIndex()
+        if index.canAnswerUrn(urn):
+            return index.getProceedingUrlsByUrn(urn)
+        self.liveQueries["getProceedingWdItemsByUrn"] += 1
         query = f"""SELECT ?proceeding WHERE{{ ?proceeding wdt:P4109 "{urn}"}}"""
         qres = self.sparql.queryAsListOfDicts(query)
         wdItems = [record.get("proceeding") for record in qres]
@@ -356,6 +411,9 @@ class WikidataSync:
         Returns:
             List of the events
         """
+        number = self.toVolnumber(volnumber)
+        if number is not None and number in self.eventsByVolnumber:
+            return list(self.eventsByVolnumber[number])
         query = f"""SELECT ?event
                     WHERE {{
                     ?proceeding wdt:P31 wd:Q1143604;
@@ -366,6 +424,181 @@ class WikidataSync:
         wdItems = [record.get("event")[len("http://www.wikidata.org/entity/") :] for record in qres]
         return wdItems
 
+    @staticmethod
+    def toVolnumber(volnumber: int | str | None) -> int | None:
+        """
+        convert the given volume number to an int
+
+        Args:
+            volnumber: the volume number e.g. as the string value of a P478 qualifier
+
+        Returns:
+            int: the volume number or None if it is not a number
+        """
+        try:
+            return int(volnumber) if volnumber is not None else None
+        except ValueError:
+            return None
+
+    def queryWithValues(self, queryTemplate: str, values: list[str]) -> list[dict]:
+        """
+        run the given query for the given VALUES in chunks of batchSize values per query
+
+        Args:
+            queryTemplate: SPARQL query with a $values placeholder for the VALUES terms
+            values: the SPARQL terms e.g. quoted strings or wd: prefixed item ids
+
+        Returns:
+            list: the records of all chunks
+        """
+        lod: list[dict] = []
+        for start in range(0, len(values), self.batchSize):
+            chunk = values[start : start + self.batchSize]
+            query = queryTemplate.replace("$values", " ".join(chunk))
+            qres = self.sparql.queryAsListOfDicts(query)
+            if qres:
+                lod.extend(qres)
+        return lod
+
+    def getWikidataIdsByVolumeNumbers(self, numbers: Sequence[int | str]) -> dict[int, str | None]:
+        """
+        batched getWikidataIdByVolumeNumber
+
+        Args:
+            numbers: volume numbers
+
+        Returns:
+            dict: the wikidata id of the proceedings by volume number - None if not found or not unique
+        """
+        volnumbers = sorted({n for n in (self.toVolnumber(number) for number in numbers) if n is not None})
+        query = """SELECT ?volnumber ?proceeding
+WHERE {
+  VALUES ?volnumber { $values }
+  ?proceeding p:P179 [ps:P179 wd:Q27230297; pq:P478 ?volnumber].
+}"""
+        lod = self.queryWithValues(query, [f'"{volnumber}"' for volnumber in volnumbers])
+        qidsByVolnumber: dict[int, list[str]] = {volnumber: [] for volnumber in volnumbers}
+        for record in lod:
+            volnumber = self.toVolnumber(record.get("volnumber"))
+            proceeding = record.get("proceeding")
+            if volnumber is not None and volnumber in qidsByVolnumber and proceeding is not None:
+                qidsByVolnumber[volnumber].append(proceeding.split("/")[-1])
+        result: dict[int, str | None] = {}
+        for volnumber, qids in qidsByVolnumber.items():
+            result[volnumber] = None
+            if len(qids) > 1:
+                print(f"CEUR-WS volume number {volnumber} is not unique")
+            elif len(qids) == 1:
+                result[volnumber] = qids[0]
+        return result
+
+    def getEventsOfProceedingsByVolnumbers(self, volnumbers: Sequence[int | str]) -> dict[int, list[str]]:
+        """
+        batched getEventsOfProceedingsByVolnumber
+
+        Args:
+            volnumbers: volume numbers of the proceedings
+
+        Returns:
+            dict: the list of event item ids by volume number
+        """
+        numbers = sorted({n for n in (self.toVolnumber(volnumber) for volnumber in volnumbers) if n is not None})
+        query = """SELECT ?volnumber ?event
+WHERE {
+  VALUES ?volnumber { $values }
+  ?proceeding wdt:P31 wd:Q1143604;
+              p:P179 [ps:P179 wd:Q27230297; pq:P478 ?volnumber];
+              wdt:P4745 ?event.
+}"""
+        lod = self.queryWithValues(query, [f'"{number}"' for number in numbers])
+        eventsByVolnumber: dict[int, list[str]] = {number: [] for number in numbers}
+        for record in lod:
+            volnumber = self.toVolnumber(record.get("volnumber"))
+            event = record.get("event")
+            if volnumber is not None and volnumber in eventsByVolnumber and event is not None:
+                eventsByVolnumber[volnumber].append(event[len("http://www.wikidata.org/entity/") :])
+        return eventsByVolnumber
+
+    def checkIfProceedingsFromExistsForVolumes(self, volumeNumbers: Sequence[int | str]) -> dict[int, bool]:
+        """
+        batched checkIfProceedingsFromExists for any event
+
+        Args:
+            volumeNumbers: volume numbers of the proceedings
+
+        Returns:
+            dict: True by volume number if any proceedings item of the volume is linked to an event
+        """
+        numbers = sorted({n for n in (self.toVolnumber(number) for number in volumeNumbers) if n is not None})
+        query = """SELECT DISTINCT ?volnumber
+WHERE {
+  VALUES ?volnumber { $values }
+  ?proceeding p:P179 [ps:P179 wd:Q27230297; pq:P478 ?volnumber];
+              wdt:P4745 ?event.
+}"""
+        lod = self.queryWithValues(query, [f'"{number}"' for number in numbers])
+        linkedVolnumbers = {self.toVolnumber(record.get("volnumber")) for record in lod}
+        result = {number: number in linkedVolnumbers for number in numbers}
+        return result
+
+    def getProceedingWdItemsByUrns(self, urns: list[str]) -> dict[str, list[str]]:
+        """
+        batched getProceedingWdItemsByUrn
+
+        Args:
+            urns: URN ids to query for
+
+        Returns:
+            dict: the list of wikidata item urls by URN
+        """
+        urnList = sorted({urn for urn in urns if urn})
+        query = """SELECT ?urn ?proceeding
+WHERE {
+  VALUES ?urn { $values }
+  ?proceeding wdt:P4109 ?urn.
+}"""
+        lod = self.queryWithValues(query, [f'"{urn}"' for urn in urnList])
+        wdItemsByUrn: dict[str, list[str]] = {urn: [] for urn in urnList}
+        for record in lod:
+            urn = record.get("urn")
+            proceeding = record.get("proceeding")
+            if urn in wdItemsByUrn and proceeding is not None:
+                wdItemsByUrn[urn].append(proceeding)
+        return wdItemsByUrn
+
+    def prefetchVolumes(self, volumes: list[Volume]):
+        """
+        look up the proceedings, events and URNs of the given volumes with batched queries
+        so that the per volume workflow does not need a round trip for each of these lookups
+
+        Args:
+            volumes: the volumes to be synchronized
+        """
+        numbers = [volume.number for volume in volumes if volume.number is not None]
+        urns = [volume.urn for volume in volumes if getattr(volume, "urn", None)]
+        self.qidsByVolnumber.update(self.getWikidataIdsByVolumeNumbers(numbers))
+        self.proceedingsFromByVolnumber.update(self.checkIfProceedingsFromExistsForVolumes(numbers))
+        self.eventsByVolnumber.update(self.getEventsOfProceedingsByVolnumbers(numbers))
+        self.proceedingWdItemsByUrn.update(self.getProceedingWdItemsByUrns(urns))
+
+    def invalidatePrefetched(self, volnumber: int | str | None = None, urn: str | None = None):
+        """
+        forget the prefetched lookup results of the given volume e.g. after adding items to wikidata
+
+        Args:
+            volnumber: the volume number
+            urn: the URN of the volume
+        """
+        number = self.toVolnumber(volnumber)
+        if number is not None:
+            self.qidsByVolnumber.pop(number, None)
+            self.eventsByVolnumber.pop(number, None)
+            self.proceedingsFromByVolnumber.pop(number, None)
+        if urn is not None:
+            self.proceedingWdItemsByUrn.pop(urn, None)
+        if self.proceedingsIndex is not None:
+            self.proceedingsIndex.invalidate(volnumber=number, urn=urn)
+
     def addProceedingsToWikidata(self, record: dict, write: bool = True, ignoreErrors: bool = False):
         """
         Creates a wikidata entry for the given record
@@ -470,6 +703,7 @@ class WikidataSync:
             ignore_errors=ignoreErrors,
             reference=reference,
         )
+        self.invalidatePrefetched(record.get("volume"), record.get("urn"))
         return result
 
     def askWikidata(self, askQuery: str) -> bool:
@@ -482,11 +716,23 @@ class WikidataSync:
 
     def checkIfProceedingsFromExists(self, volumeNumber: int, eventItemQid: str | None) -> bool:
         """Returns True if the is proceedings from relation already exists between the given proceedings and event"""
+        volnumber = self.toVolnumber(volumeNumber)
+        if eventItemQid is None and volnumber in self.proceedingsFromByVolnumber:
+            return self.proceedingsFromByVolnumber[volnumber]
+        index = self.getProceedingsIndex()
+        if volnumber is not None and index.canAnswerVolume(volnumber):
+            eventQids = index.getEventQidsByVolnumber(volnumber)
+            linked = eventItemQid in eventQids if eventItemQid is not None else len(eventQids) > 0
+            # only a found link is answered - the link might have been added since the snapshot
+            if linked:
+                return True
+        self.liveQueries["checkIfProceedingsFromExists"] += 1
         eventVar = "?event"
         if eventItemQid is not None:
             eventVar = f"wd:{eventItemQid}"
-        proceedingsWikidataId = self.getWikidataIdByVolumeNumber(number=volumeNumber)
-        query = f"""ASK{{ wd:{proceedingsWikidataId} wdt:P4745 {eventVar}.}}"""
+        # any proceedings item of the volume - also if the volume number is not unique
+        query = f"""ASK{{ ?proceeding p:P179 [ps:P179 wd:Q27230297; pq:P478 "{volumeNumber}"];
+                    wdt:P4745 {eventVar}.}}"""
         proceedingExists = self.askWikidata(query)
         return proceedingExists
 
@@ -499,6 +745,11 @@ class WikidataSync:
         Returns:
             True if the item has the property else False
         """
+        index = self.getProceedingsIndex()
+        # only a found value is answered - the value might have been added since the snapshot
+        if index.canAnswerItem(item) and index.hasPropertyValue(item, propertyId):
+            return True
+        self.liveQueries["hasItemPropertyValueFor"] += 1
         query = f"""ASK{{ wd:{item} wdt:{propertyId} ?value.}}"""
         return self.askWikidata(query)
 
@@ -550,6 +801,9 @@ class WikidataSync:
             ignore_errors=ignoreErrors,
             reference=reference,
         )
+        self.invalidatePrefetched(volumeNumber)
+        if self.proceedingsIndex is not None:
+            self.proceedingsIndex.invalidate(qid=proceedingsWikidataId)
         return result
 
     def doAddEventToWikidata(self, record: dict, write: bool = True, ignoreErrors: bool = False):
@@ -718,6 +972,8 @@ class WikidataSync:
             ignore_errors=ignoreErrors,
             reference=reference,
         )
+        if self.proceedingsIndex is not None:
+            self.proceedingsIndex.invalidate(qid=proceedingsWikidataId)
         return result
 
     def addAcronymToItem(
@@ -758,6 +1014,8 @@ class WikidataSync:
             write=write,
             ignoreErrors=ignoreErrors,
         )
+        if self.proceedingsIndex is not None:
+            self.proceedingsIndex.invalidate(qid=itemId)
         return qId, errors
 
     def addOfficialWebsiteToItem(
@@ -803,6 +1061,8 @@ class WikidataSync:
             write=write,
             ignore_errors=ignoreErrors,
         )
+        if self.proceedingsIndex is not None:
+            self.proceedingsIndex.invalidate(qid=itemId)
         return qId, errors
 
     def getWikidataIdByVolumeNumber(self, number: int | None) -> str | None:
@@ -817,6 +1077,13 @@ class WikidataSync:
         """
         if number is None:
             return None
+        volnumber = self.toVolnumber(number)
+        if volnumber in self.qidsByVolnumber:
+            return self.qidsByVolnumber[volnumber]
+        index = self.getProceedingsIndex()
+        if volnumber is not None and index.canAnswerVolume(volnumber):
+            return index.getQidByVolnumber(volnumber)
+        self.liveQueries["getWikidataIdByVolumeNumber"] += 1
         query = f"""SELECT * WHERE{{ ?proceeding p:P179 [ps:P179 wd:Q27230297; pq:P478 "{number}"].}}"""
         qres = self.sparql.queryAsListOfDicts(query)
         qid = None
@@ -8,6 +8,8 @@ from urllib.request import urlopen
 
 import xmltodict
 
+from ceurws.config import CEURWS
+
 
 class Workshop:
     """
@@ -21,7 +23,7 @@ class Workshop:
 
     @staticmethod
     def ofURI(uri):
-        xml = urlopen(uri).read().decode()
+        xml = urlopen(CEURWS.rebase_url(uri)).read().decode()
         ws = Workshop()
         ws.wsdict = xmltodict.parse(xml)
         return ws
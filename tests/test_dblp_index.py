@@ -0,0 +1,191 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import tempfile
+import time
+
+from ceurws.dblp import DblpEndpoint
+from ceurws.dblp_index import DblpIndex
+from ceurws.models.dblp import DblpPaper, DblpProceeding, DblpScholar
+from tests.basetest import Basetest
+
+
+class TestDblpIndex(Basetest):
+    """
+    test the sorted and indexed dblp stores
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.scholars = [DblpScholar(dblp_author_id=f"pid/{i:02}", label=f"Scholar {i}") for i in range(10)]
+        papers = []
+        volumes = []
+        for number in range(100, 0, -1):
+            proceeding_id = f"conf/test/{number}"
+            vol_papers = []
+            for i in range(3):
+                authors = [self.scholars[(number + i) % 10], self.scholars[(number * i) % 10]]
+                paper = DblpPaper(
+                    dblp_publication_id=f"{proceeding_id}/paper{i}",
+                    dblp_proceeding_id=proceeding_id,
+                    volume_number=number,
+                    title=f"Paper {i} of Vol-{number}",
+                    authors=authors,
+                )
+                vol_papers.append(paper)
+            papers.extend(vol_papers)
+            volumes.append(
+                DblpProceeding(
+                    dblp_publication_id=proceeding_id,
+                    volume_number=number,
+                    title=f"Vol-{number}",
+                    editors=[self.scholars[number % 10]],
+                    papers=vol_papers,
+                )
+            )
+        self.papers = papers
+        self.index = DblpIndex(papers, list(reversed(self.scholars)), volumes)
+
+    def test_offset_and_keyset(self):
+        """
+        test that offset and keyset pagination both visit every paper once in order
+        """
+        store = self.index.papers
+        self.assertEqual(300, len(store))
+        offset_ids = []
+        for offset in range(0, 300, 7):
+            items, _last_key = store.query(offset=offset, limit=7)
+            offset_ids.extend(paper.dblp_publication_id for paper in items)
+        keyset_ids = []
+        after = None
+        while True:
+            items, after = store.query(limit=7, after=after)
+            keyset_ids.extend(paper.dblp_publication_id for paper in items)
+            if after is None:
+                break
+        self.assertEqual(offset_ids, keyset_ids)
+        self.assertEqual(300, len(set(keyset_ids)))
+        self.assertEqual("conf/test/1/paper0", keyset_ids[0])
+        # the former slice papers[offset:limit] returned nothing for offset >= limit
+        items, _last_key = store.query(offset=100, limit=10)
+        self.assertEqual(10, len(items))
+        editors, _last_key = self.index.editors.query(limit=3)
+        self.assertEqual(["pid/00", "pid/01", "pid/02"], [editor.dblp_author_id for editor in editors])
+
+    def test_filters(self):
+        """
+        test the volume range and author filters against linear scans
+        """
+        store = self.index.papers
+        items, last_key = store.query(volume_from=10, volume_to=12, limit=100)
+        self.assertEqual({10, 11, 12}, {paper.volume_number for paper in items})
+        self.assertEqual(9, len(items))
+        self.assertIsNone(last_key)
+        author_id = "pid/03"
+        expected = sorted(
+            (paper.volume_number, paper.dblp_publication_id)
+            for paper in self.papers
+            if 20 <= paper.volume_number <= 60 and author_id in [author.dblp_author_id for author in paper.authors]
+        )
+        actual = []
+        after = None
+        while True:
+            items, after = store.query(
+                limit=5, after=after, volume_from=20, volume_to=60, lookups={"author": author_id}
+            )
+            actual.extend((paper.volume_number, paper.dblp_publication_id) for paper in items)
+            if after is None:
+                break
+        self.assertEqual(expected, actual)
+        volumes, _last_key = self.index.volumes.query(limit=100, lookups={"editor": "pid/07"})
+        self.assertEqual([7, 17, 27, 37, 47, 57, 67, 77, 87, 97], [volume.volume_number for volume in volumes])
+        items, _last_key = store.query(lookups={"author": "pid/unknown"})
+        self.assertEqual([], items)
+
+    def storeLods(self, endpoint: DblpEndpoint):
+        """
+        store small cached dblp lists for the given endpoint
+        """
+        lods = {
+            "dblp/authors": [{"dblp_author_id": "https://dblp.org/pid/01", "label": "Scholar 1"}],
+            "dblp/editors": [{"dblp_author_id": "https://dblp.org/pid/02", "label": "Scholar 2"}],
+            "dblp/papers": [
+                {
+                    "paper": f"https://dblp.org/rec/conf/test/3185/paper{i}",
+                    "proceeding": "https://dblp.org/rec/conf/test/3185",
+                    "volume_number": "3185",
+                    "title": f"Paper {i}",
+                    "pdf_url": f"https://ceur-ws.org/Vol-3185/paper{i}.pdf",
+                    "author": "https://dblp.org/pid/01",
+                }
+                for i in range(1, 4)
+            ],
+            "dblp/volumes": [
+                {
+                    "proceeding": "https://dblp.org/rec/conf/test/3185",
+                    "volume_number": "3185",
+                    "title": "Vol-3185",
+                    "editor": "https://dblp.org/pid/02",
+                }
+            ],
+        }
+        for cache_name, lod in lods.items():
+            endpoint.cache_manager.store(cache_name, lod)
+
+    def test_paper_by_pdf_id(self):
+        """
+        test the lookup of a paper of a volume by its pdf id from the cached dblp lists
+        """
+        endpoint = DblpEndpoint("https://qlever.cs.uni-freiburg.de/api/dblp")
+        with tempfile.TemporaryDirectory() as base_dir:
+            endpoint.cache_manager.base_dir = base_dir
+            self.storeLods(endpoint)
+            paper = endpoint.get_ceur_volume_paper(3185, "paper2")
+            self.assertEqual("https://dblp.org/rec/conf/test/3185/paper2", paper.dblp_publication_id)
+            self.assertEqual(["Scholar 1"], [author.label for author in paper.authors])
+            self.assertIs(paper, endpoint.dblp_papers.papersById[paper.dblp_publication_id])
+            self.assertIsNone(endpoint.get_ceur_volume_paper(3185, "paper4"))
+            self.assertIsNone(endpoint.get_ceur_volume_paper(3184, "paper2"))
+            self.assertEqual(1, len(endpoint.get_dblp_index().volumes))
+
+    def test_load_all(self):
+        """
+        test loading the dblp managers in parallel in the order of their dependencies
+        """
+        endpoint = DblpEndpoint("https://qlever.cs.uni-freiburg.de/api/dblp")
+        loaded = []
+        # the start and end time of the query of each manager
+        spans: dict[str, tuple[float, float]] = {}
+        get_lod = endpoint.get_lod
+
+        def slow_get_lod(cache_name: str, query_name: str, force_query: bool = False) -> list:
+            start = time.monotonic()
+            # a slow query of the authors and editors
+            if cache_name in ["dblp/authors", "dblp/editors"]:
+                time.sleep(0.3)
+            lod = get_lod(cache_name, query_name, force_query=force_query)
+            spans[cache_name] = (start, time.monotonic())
+            return lod
+
+        endpoint.get_lod = slow_get_lod
+        with tempfile.TemporaryDirectory() as base_dir:
+            endpoint.cache_manager.base_dir = base_dir
+            self.storeLods(endpoint)
+            timings = endpoint.load_all(on_loaded=lambda cache_name, _duration: loaded.append(cache_name))
+        self.assertEqual(set(endpoint.DEPENDENCIES), set(timings))
+        for cache_name, dependencies in endpoint.DEPENDENCIES.items():
+            for dependency in dependencies:
+                self.assertLess(loaded.index(dependency), loaded.index(cache_name))
+                # a manager is only queried after the managers it depends on are loaded
+                self.assertLessEqual(spans[dependency][1], spans[cache_name][0])
+        # authors and editors are loaded at the same time
+        authors_start, authors_end = spans["dblp/authors"]
+        editors_start, editors_end = spans["dblp/editors"]
+        self.assertLess(max(authors_start, editors_start), min(authors_end, editors_end))
+        self.assertEqual(3, len(endpoint.dblp_volumes.volumes[0].papers))
+        endpoint.DEPENDENCIES = {"dblp/authors": ["dblp/volumes"], "dblp/volumes": ["dblp/authors"]}
+        with self.assertRaises(ValueError):
+            endpoint.load_all()
@@ -0,0 +1,94 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import time
+
+import orjson
+
+from ceurws.dblp import DblpEndpoint
+from ceurws.models import dblp
+from ceurws.models.dblp import DblpPaper, DblpProceeding, DblpScholar
+from tests.basetest import Basetest
+
+
+class TestDblpJson(Basetest):
+    """
+    test the direct JSON serialization of the dblp models
+    """
+
+    def makePapers(self, count: int) -> list[DblpPaper]:
+        """
+        get the given number of synthetic papers
+        """
+        scholars = [
+            DblpScholar(dblp_author_id=f"https://dblp.org/pid/{i}", label=f"Scholar {i}", orcid_id=None)
+            for i in range(100)
+        ]
+        papers = []
+        for i in range(count):
+            paper = DblpPaper(
+                dblp_publication_id=f"https://dblp.org/rec/conf/test/{i // 20}/paper{i}",
+                dblp_proceeding_id=f"https://dblp.org/rec/conf/test/{i // 20}",
+                volume_number=i // 20,
+                title=f'Paper {i} with Ümlauts and "quotes"',
+                pdf_id=f"Vol-{i // 20}/paper{i}",
+                authors=[scholars[i % 100], scholars[(i * 7) % 100]],
+            )
+            papers.append(paper)
+        return papers
+
+    def checkSerialization(self, papers: list[DblpPaper]) -> tuple[float, float]:
+        """
+        check that the direct serialization gives the same result as the to_json round trip
+
+        Returns:
+            tuple: the time of the to_json round trip and of the direct serialization
+        """
+        start = time.perf_counter()
+        lod = [orjson.loads(paper.to_json()) for paper in papers]
+        legacy = orjson.dumps(lod)
+        legacy_time = time.perf_counter() - start
+        start = time.perf_counter()
+        direct = dblp.dumps(papers)
+        direct_time = time.perf_counter() - start
+        self.assertEqual(legacy, direct)
+        return legacy_time, direct_time
+
+    def test_parity(self):
+        """
+        test the direct serialization of all dblp models
+        """
+        papers = self.makePapers(100)
+        self.checkSerialization(papers)
+        proceeding = DblpProceeding(
+            dblp_publication_id="https://dblp.org/rec/conf/test/1",
+            volume_number=1,
+            title="Proceedings",
+            papers=papers[:3],
+            editors=papers[0].authors,
+        )
+        self.assertEqual(orjson.loads(proceeding.to_json()), orjson.loads(dblp.dumps(proceeding)))
+        self.assertEqual(b"[]", dblp.dumps([]))
+        with self.assertRaises(TypeError):
+            dblp.dumps([object()])
+
+    def test_benchmark(self):
+        """
+        compare the to_json round trip and the direct serialization
+        on the cached dblp paper set or a synthetic set of the same size
+        """
+        endpoint = DblpEndpoint("https://qlever.cs.uni-freiburg.de/api/dblp")
+        if all(endpoint.cache_manager.get_cache_by_name(name).is_stored for name in ["dblp/papers", "dblp/authors"]):
+            endpoint.dblp_papers.load()
+            papers = endpoint.dblp_papers.papers
+        else:
+            papers = self.makePapers(60000)
+        legacy_time, direct_time = self.checkSerialization(papers)
+        print(
+            f"{len(papers)} dblp papers: to_json round trip {legacy_time:.2f} s direct {direct_time:.3f} s"
+            f" ({legacy_time / direct_time:.0f}x)"
+        )
+        self.assertLess(direct_time, legacy_time)
@@ -0,0 +1,109 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from ceurws.ceur_ws import Paper, PaperManager, Volume, VolumeManager
+from tests.basetest import Basetest
+
+
+class TestEntityUpsert(Basetest):
+    """
+    test the row level upsert of volumes and papers
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cacheFile = str(Path(self.tmpdir.name) / "ceurws.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        Basetest.tearDown(self)
+
+    def getVolume(self, number: int, title: str) -> Volume:
+        """
+        get a volume with the given number and title
+        """
+        volume = Volume()
+        volume.fromDict({"number": number, "title": title, "acronym": f"WS{number}"})
+        return volume
+
+    def getPaper(self, number: int, position: int, title: str) -> Paper:
+        """
+        get a paper of the given volume
+        """
+        paper = Paper()
+        paper.fromDict({"id": f"Vol-{number}/paper{position}", "vol_number": str(number), "title": title})
+        return paper
+
+    def query(self, sql: str) -> list:
+        """
+        query my cache file
+        """
+        connection = sqlite3.connect(self.cacheFile)
+        try:
+            return connection.execute(sql).fetchall()
+        finally:
+            connection.close()
+
+    def test_upsert_volumes(self):
+        """
+        test that only the given volumes are written
+        """
+        vm = VolumeManager()
+        vm.volumes = [self.getVolume(number, f"title {number}") for number in [3, 2, 1]]
+        vm.storeLoD(vm.getLoD(), cacheFile=self.cacheFile, sampleRecordCount=-1)
+        written = vm.upsert([self.getVolume(4, "title 4"), self.getVolume(2, "changed")], cacheFile=self.cacheFile)
+        self.assertEqual(2, written)
+        rows = self.query("SELECT number, title FROM volumes ORDER BY number")
+        self.assertEqual([(1, "title 1"), (2, "changed"), (3, "title 3"), (4, "title 4")], rows)
+        # a new column needs a full store
+        volume = self.getVolume(5, "title 5")
+        volume.h1 = "new column"
+        self.assertIsNone(vm.upsert([volume], cacheFile=self.cacheFile))
+        # as does a missing table
+        pm = PaperManager()
+        self.assertIsNone(pm.upsert([self.getPaper(1, 1, "paper")], cacheFile=self.cacheFile))
+
+    def test_upsert_papers(self):
+        """
+        test that the papers of a reparsed volume are replaced
+        """
+        pm = PaperManager()
+        pm.papers = [self.getPaper(number, position, "old") for number in [1, 2] for position in [1, 2]]
+        pm.storeLoD(pm.getLoD(), cacheFile=self.cacheFile, sampleRecordCount=-1)
+        written = pm.upsert(
+            [self.getPaper(2, 1, "new")],
+            deleteColumn="vol_number",
+            deleteValues=["2"],
+            cacheFile=self.cacheFile,
+        )
+        self.assertEqual(1, written)
+        rows = self.query("SELECT id, title FROM papers ORDER BY id")
+        self.assertEqual(
+            [("Vol-1/paper1", "old"), ("Vol-1/paper2", "old"), ("Vol-2/paper1", "new")],
+            rows,
+        )
+
+    def test_data_version(self):
+        """
+        test that the data version is bumped when the entities are reloaded or stored
+        """
+        vm = VolumeManager()
+        other = VolumeManager()
+        self.assertNotEqual(vm.dataVersion, other.dataVersion)
+        vm.volumes = [self.getVolume(number, f"title {number}") for number in [1, 2]]
+        versions = [vm.dataVersion]
+        vm.storeLoD(vm.getLoD(), cacheFile=self.cacheFile, sampleRecordCount=-1)
+        versions.append(vm.dataVersion)
+        vm.upsert([self.getVolume(3, "title 3")], cacheFile=self.cacheFile)
+        versions.append(vm.dataVersion)
+        other.setListFromLoD([volume.__dict__ for volume in vm.volumes])
+        versions.append(other.dataVersion)
+        self.assertEqual(sorted(set(versions)), versions)
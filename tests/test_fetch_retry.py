@@ -0,0 +1,184 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import datetime
+import email.utils
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.error import HTTPError
+
+from ceurws.ceur_ws import Volume, VolumeManager
+from ceurws.indexparser import ParserConfig
+from ceurws.utils.webscrape import CircuitBreaker, HttpPool, RetryPolicy, WebScrape
+from ceurws.volume_pipeline import FailedVolumes, VolumePageFetcher
+from ceurws.volumeparser import VolumePageCache
+from tests.basetest import Basetest
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """
+    stand-in for ceur-ws.org failing with 503 for the first requests of a page
+
+    /Vol-N/ fails N times, /Vol-9999/ always fails
+    """
+
+    protocol_version = "HTTP/1.1"
+    requests: Counter = Counter()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            self.requests[self.path] += 1
+            count = self.requests[self.path]
+        number = int(self.path.strip("/").split("-")[1])
+        if number == 9999 or count <= number:
+            body = b"service unavailable"
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+        else:
+            body = f"<html><title>Vol-{number}</title></html>".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestFetchRetry(Basetest):
+    """
+    test retries, backoff and the circuit breaker of the volume page fetches
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        FlakyHandler.requests = Counter()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.baseurl = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        Basetest.tearDown(self)
+
+    def test_retry_policy(self):
+        """
+        test the backoff delays and the Retry-After parsing
+        """
+        policy = RetryPolicy(max_retries=3, backoff_factor=0.5, max_backoff=1.5)
+        for attempt in range(5):
+            delay = policy.get_delay(attempt)
+            self.assertTrue(0 <= delay <= min(1.5, 0.5 * 2**attempt))
+        self.assertEqual(7.0, policy.get_delay(0, "7"))
+        retry_date = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=60)
+        delay = policy.get_delay(0, email.utils.format_datetime(retry_date, usegmt=True))
+        self.assertTrue(55 < delay <= 60)
+        self.assertEqual(300.0, policy.get_delay(0, "86400"))
+        self.assertIsNone(policy.parse_retry_after("soon"))
+        self.assertTrue(policy.is_retryable(503))
+        self.assertTrue(policy.is_retryable(None))
+        self.assertFalse(policy.is_retryable(404))
+        self.assertFalse(RetryPolicy(max_retries=0).is_retryable(503))
+
+    def test_retries(self):
+        """
+        test retrying transient errors against the local stand-in
+        """
+        scrape = WebScrape(timeout=5, http_pool=HttpPool(), retry_policy=RetryPolicy(max_retries=3))
+        html = scrape.get_html_from_url(f"{self.baseurl}/Vol-2/")
+        self.assertEqual("<html><title>Vol-2</title></html>", html)
+        self.assertEqual(3, FlakyHandler.requests["/Vol-2/"])
+        fetch_result = scrape.fetch(f"{self.baseurl}/Vol-9999/")
+        self.assertTrue(fetch_result.failed)
+        self.assertEqual(503, fetch_result.status)
+        self.assertIsInstance(fetch_result.error, HTTPError)
+        self.assertEqual(4, FlakyHandler.requests["/Vol-9999/"])
+        # without retries
+        fetch_result = WebScrape(timeout=5, http_pool=HttpPool()).fetch(f"{self.baseurl}/Vol-1/")
+        self.assertEqual(503, fetch_result.status)
+
+    def test_circuit_breaker(self):
+        """
+        test that the circuit of a failing host opens and pauses its fetches
+        """
+        breaker = CircuitBreaker(failure_rate=0.5, window=4, min_requests=4, cooldown=0.3)
+        url = f"{self.baseurl}/Vol-9999/"
+        scrape = WebScrape(timeout=5, http_pool=HttpPool(), circuit_breaker=breaker)
+        for _i in range(4):
+            scrape.fetch(url)
+        self.assertTrue(breaker.is_open(url))
+        self.assertFalse(breaker.is_open("https://example.org/"))
+        self.assertEqual(1, breaker.opened)
+        start = time.monotonic()
+        # half open - the failure opens the circuit again
+        scrape.fetch(url)
+        self.assertGreaterEqual(time.monotonic() - start, 0.25)
+        self.assertEqual(2, breaker.opened)
+        breaker.wait(url)
+        scrape.fetch(f"{self.baseurl}/Vol-0/")
+        self.assertFalse(breaker.is_open(url))
+        self.assertEqual({}, breaker.outcomes)
+
+    def test_failed_volumes(self):
+        """
+        test that the volumes failing after all retries are recorded for a follow-up retry pass
+        """
+        cache_location = VolumePageCache.cache_location
+        try:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                VolumePageCache.cache_location = Path(tmpdir)
+                parser_config = ParserConfig(
+                    requests_per_second=0, max_retries=2, backoff_factor=0.01, circuit_cooldown=0.1
+                )
+                fetcher = VolumePageFetcher(parser_config)
+                fetcher.volume_parser.baseurl = self.baseurl
+                fetcher.volume_parser.scrape.http_pool = HttpPool()
+                pages = list(fetcher.fetch([9999, 2, 1]))
+                self.assertEqual(
+                    [None, "<html><title>Vol-2</title></html>", "<html><title>Vol-1</title></html>"], pages
+                )
+                self.assertEqual([9999], list(fetcher.failed_volumes.keys()))
+                self.assertIn("503", fetcher.failed_volumes[9999])
+                failed_volumes = FailedVolumes(Path(tmpdir) / "failed_volumes.json")
+                failed_volumes.save(fetcher.failed_volumes)
+                self.assertEqual(fetcher.failed_volumes, failed_volumes.load())
+                failed_volumes.save({})
+                self.assertEqual({}, failed_volumes.load())
+        finally:
+            VolumePageCache.cache_location = cache_location
+
+    def test_retry_failed_volumes(self):
+        """
+        test that failed volumes below down_to_volume are retried and kept until they are fetched
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            failed_volumes = FailedVolumes(Path(tmpdir) / "failed_volumes.json")
+            failed_volumes.save({3: "503", 5: "503"})
+            # volume 3 is fetched again, volume 7 fails for the first time and volume 5 is not fetched
+            merged = failed_volumes.merge([3, 7, 8], {7: "timeout"})
+            self.assertEqual({5: "503", 7: "timeout"}, merged)
+            self.assertEqual(merged, failed_volumes.load())
+            self.assertEqual({}, failed_volumes.merge([5, 7], {}))
+            self.assertFalse(failed_volumes.path.exists())
+        previousVolumes = {}
+        for number in range(1, 9):
+            volume = Volume()
+            volume.fromDict({"number": number})
+            previousVolumes[number] = volume
+        # an update walks the index down to volume 8 only
+        indexVolume = Volume()
+        indexVolume.fromDict({"number": 8})
+        retryVolumes = VolumeManager.getRetryVolumes([indexVolume], {3: "503", 5: "503", 8: "503"}, previousVolumes)
+        self.assertEqual([5, 3], [volume.number for volume in retryVolumes])
+        self.assertIs(previousVolumes[5], retryVolumes[0])
@@ -0,0 +1,182 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import time
+
+from ceurws.papertocparser import PaperTocParser
+from ceurws.replay_server import ReplayCorpus
+from ceurws.utils.webscrape import WebScrape
+from ceurws.volumeparser import VolumePageCache, VolumeParser
+from tests.basetest import Basetest
+
+# a volume page of the current CEUR-WS template
+MODERN_PAGE = """<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN"
+ "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">
+<html xmlns="http://www.w3.org/1999/xhtml" lang="en">
+<head>
+<meta http-equiv="Content-Type" content="text/html; charset=UTF-8" />
+<meta name="description" content="CEUR Workshop Proceedings Vol-2436: SIAU 2019" />
+<title>CEUR-WS.org/Vol-2436 - Semantic Web meets Health Data (SIAU 2019)</title>
+</head>
+<body>
+<table style="border: 0; width: 100%;">
+<tr><td style="text-align: left;"><a href="http://ceur-ws.org/"><img src="CEUR-WS-logo.png" alt="[CEUR-WS]"></a></td>
+<td style="text-align: right;">Vol-<span class="CEURVOLNR">2436</span><br/>
+<span class="CEURURN">urn:nbn:de:0074-2436-8</span></td></tr></table>
+<hr />
+<h1><a href="http://siau.example.org"><span class="CEURVOLACRONYM">SIAU 2019</span></a><br/>
+<span class="CEURFULLTITLE">Proceedings of the Workshop on Semantic&nbsp;Web &amp; Health</span></h1>
+<br/>
+<h2>co-located with <span class="CEURCOLOCATED">IJCAI 2019</span></h2>
+<h3><span class="CEURLOCTIME">Macao, China, August 11, 2019</span>.</h3>
+<br/>
+<b> Edited by </b>
+<h3>
+<a href="http://a.example.org"><span class="CEURVOLEDITOR">Wolfgang Fahl</span></a> <sup>1</sup><br/>
+<span class="CEURVOLEDITOR">Jane Doe</span> <sup>2,3</sup><br/>
+</h3>
+<sup>1</sup> RWTH Aachen University, Germany <br/>
+<sup>2</sup> Example Org, Italy, <a href="http://x.example.org">x</a><br/>
+<sup>3</sup> Université de Test, France<br/>
+<hr />
+<br/>
+Table of Contents
+<div class="CEURTOC">
+<ul>
+<li id="preface"><a href="preface.pdf"><span class="CEURTITLE">Preface</span></a>
+<span class="CEURPAGES">1-2</span> <br/>
+<span class="CEURAUTHOR">Wolfgang Fahl</span>
+</li>
+<li id="paper1"><a href="paper1.pdf"><span class="CEURTITLE">Paper <i>One</i> &ndash; Ümlauts</span></a>
+<span class="CEURPAGES">3-10</span> <br/>
+<span class="CEURAUTHOR">Alice</span>,
+<span class="CEURAUTHOR">Bob</span>
+</li>
+<li id="paper1"><a href="paper2.pdf"><span class="CEURTITLE">Duplicate id</span></a>
+<span class="CEURAUTHOR">Carol</span>
+</li>
+</ul>
+</div>
+<hr/>
+<span class="CEURPUBDATE">2019-08-31</span>: submitted by Wolfgang Fahl
+<span class="CEURPUBYEAR">2019</span>
+</body></html>
+"""
+
+# a legacy volume page relying on implied end tags
+LEGACY_PAGE = """<HTML>
+<HEAD>
+<META NAME="descripton" CONTENT="CEUR Workshop Proceedings KRDB-98">
+<TITLE>CEUR-WS.org/Vol-10 - KRDB-98</TITLE>
+</HEAD>
+<BODY BGCOLOR="#FFFFFF">
+<H1><A HREF="http://krdb.example.org">KRDB-98</A><BR>
+Knowledge Representation meets Databases</H1>
+<H3>Seattle, WA, USA, June 1, 1998
+<P>
+<B>Edited by</B>
+<H3>
+Alex Borgida<sup>1</sup><BR>
+Vinay Chaudhri<sup>2</sup><BR>
+</H3>
+<sup>1</sup> Rutgers University<BR>
+<sup>2</sup> SRI International<BR>
+<HR>
+<H2>Table of Contents</H2>
+<UL>
+<LI><A HREF="borgida.pdf">Description Logics</A><BR>
+Alex Borgida, Vinay Chaudhri
+<LI><A HREF="third.pdf">Third <FONT SIZE=-1>paper</A>
+</UL>
+</BODY>
+"""
+
+
+class TestHtmlParser(Basetest):
+    """
+    test the parity of the tree builders for the volume pages
+    """
+
+    def getVolumePages(self, limit: int | None = None) -> dict[str, str | bytes]:
+        """
+        get the cached volume pages or the fixture pages if there are none
+
+        Args:
+            limit: the maximum number of cached volume pages
+
+        Returns:
+            dict: the pages by name
+        """
+        pages: dict[str, str | bytes] = {}
+        store = VolumePageCache.get_store()
+        numbers = store.numbers()
+        if limit is not None:
+            numbers = numbers[-limit:]
+        for number in numbers:
+            page = store.get(number)
+            if page is not None:
+                pages[f"Vol-{number}"] = page
+        if not pages:
+            pages["modern"] = MODERN_PAGE
+            pages["modern bytes"] = MODERN_PAGE.encode()
+            pages["legacy"] = LEGACY_PAGE
+            for number in range(1, 21):
+                pages[f"corpus Vol-{number}"] = ReplayCorpus.make_volume_html(number, papers=20)
+        return pages
+
+    def parseVolumePage(self, volume_parser: VolumeParser, page: str | bytes) -> tuple:
+        """
+        parse the given volume page with the tree builder of the given volume parser
+        """
+        soup = volume_parser.scrape.get_soup_from_string(page)
+        return (
+            volume_parser.parse_soup(soup),
+            volume_parser.parseEditors(soup),
+            PaperTocParser(number="1", soup=soup).parsePapers(),
+        )
+
+    def test_parity(self):
+        """
+        test that parse_soup, parseEditors and PaperTocParser give the same results
+        with the lxml tree builder as with html.parser
+        """
+        reference = VolumeParser(html_parser="html.parser")
+        lxml = VolumeParser(html_parser="lxml")
+        for name, page in self.getVolumePages().items():
+            with self.subTest(name=name):
+                self.assertEqual(self.parseVolumePage(reference, page), self.parseVolumePage(lxml, page))
+        # the unclosed h3 of the legacy page ends at the next block element
+        volume_record = self.parseVolumePage(reference, LEGACY_PAGE)[0]
+        self.assertEqual("Seattle, WA, USA, June 1, 1998", volume_record["h3"])
+        self.assertEqual("lxml", WebScrape.default_html_parser())
+        self.assertEqual("lxml", VolumeParser().scrape.html_parser)
+        for html_parser in ["auto", "html5"]:
+            with self.subTest(html_parser=html_parser), self.assertRaises(ValueError):
+                WebScrape(html_parser=html_parser)
+
+    def test_benchmark(self):
+        """
+        benchmark the soup construction and parsing of the volume pages with the tree builders
+        - the best of 5 runs of each
+        """
+        pages = list(self.getVolumePages().values())
+        timings = {}
+        for html_parser in WebScrape.HTML_PARSERS:
+            volume_parser = VolumeParser(html_parser=html_parser)
+            # the best of several runs so that a busy machine does not decide the comparison
+            best = None
+            for _run in range(5):
+                start = time.perf_counter()
+                for page in pages:
+                    self.parseVolumePage(volume_parser, page)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[html_parser] = best
+        print(
+            f"{len(pages)} volume pages: "
+            + " ".join(f"{html_parser} {timing:.3f} s" for html_parser, timing in timings.items())
+        )
+        self.assertLess(timings["lxml"], timings["html.parser"])
@@ -0,0 +1,113 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import gzip
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError, URLError
+
+from ceurws.utils.webscrape import HttpPool, WebScrape
+from tests.basetest import Basetest
+
+
+class VolumePageHandler(BaseHTTPRequestHandler):
+    """
+    keep-alive handler serving gzip compressed volume pages
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path.startswith("/Vol-"):
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("ETag", '"v1"')
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = f"<html><title>{self.path[1:]} – Übersicht</title></html>".encode()
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                body = gzip.compress(body)
+                self.send_response(200)
+                self.send_header("Content-Encoding", "gzip")
+            else:
+                self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("ETag", '"v1"')
+        else:
+            body = b"not found"
+            self.send_response(404)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpPool(Basetest):
+    """
+    test the pooled keep-alive connections of WebScrape against a local server
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), VolumePageHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.baseurl = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        Basetest.tearDown(self)
+
+    def test_connection_reuse(self):
+        """
+        test that separate WebScrape instances reuse the connection of the pool
+        """
+        http_pool = HttpPool()
+        for number in range(1, 6):
+            scrape = WebScrape(timeout=5, http_pool=http_pool)
+            html = scrape.get_html_from_url(f"{self.baseurl}/Vol-{number}/")
+            self.assertEqual(f"<html><title>Vol-{number}/ – Übersicht</title></html>", html)
+        stats = http_pool.get_stats()
+        self.assertEqual(5, stats["requests"])
+        self.assertEqual(1, stats["connections"])
+        self.assertEqual(4, stats["reused"])
+        self.assertIs(HttpPool.get_shared(), WebScrape().http_pool)
+
+    def test_status(self):
+        """
+        test conditional requests, missing pages and unreachable hosts
+        """
+        scrape = WebScrape(timeout=5, http_pool=HttpPool())
+        fetch_result = scrape.fetch(f"{self.baseurl}/Vol-1/", etag='"v1"')
+        self.assertTrue(fetch_result.not_modified)
+        self.assertIsNone(fetch_result.html)
+        fetch_result = scrape.fetch(f"{self.baseurl}/index.html")
+        self.assertEqual(404, fetch_result.status)
+        self.assertIsInstance(fetch_result.error, HTTPError)
+        self.assertEqual(404, fetch_result.error.code)
+        # a port nobody listens on
+        with socket.socket() as closed_socket:
+            closed_socket.bind(("127.0.0.1", 0))
+            port = closed_socket.getsockname()[1]
+        fetch_result = scrape.fetch(f"http://127.0.0.1:{port}/Vol-2/")
+        self.assertTrue(fetch_result.failed)
+        self.assertIsNone(fetch_result.html)
+        self.assertIsInstance(fetch_result.error, URLError)
+        # the shared scrape does not keep the error of a fetch
+        self.assertIsNone(scrape.err)
+        self.assertIsNone(scrape.get_html_from_url(f"{self.baseurl}/index.html"))
+        self.assertIsInstance(scrape.err, HTTPError)
+        # concurrent failing fetches of a shared scrape each get their own error
+        urls = [f"{self.baseurl}/missing-{i}" for i in range(16)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            fetch_results = list(executor.map(scrape.fetch, urls))
+        self.assertEqual(urls, [fetch_result.error.url for fetch_result in fetch_results])
@@ -6,15 +6,180 @@ Created on 2022-08-11
 
 import datetime
 import logging
+import random
+import re
+import time
 from random import sample
 
 from lodstorage.lod import LOD
 
 from ceurws.ceur_ws import VolumeManager
+from ceurws.config import CEURWS
 from ceurws.indexparser import IndexHtmlParser, ParserConfig
 from tests.basetest import Basetest
 
 
+class LegacyIndexHtmlParser(IndexHtmlParser):
+    """
+    the line search index.html parser that the single pass tokenizer replaced
+    kept as the reference for the parity tests
+    """
+
+    def __init__(self, htmlText: str, config: ParserConfig | None = None):
+        IndexHtmlParser.__init__(self, htmlText, config)
+        # Pre-compile patterns used in find and findVolume
+        self.thColspanPattern = re.compile(r"^.*<th\s*colspan", re.I)
+        self.trStartPattern = re.compile(r"^\s*<tr>", re.I)
+        self.trEndPattern = re.compile(r"^\s*</tr>", re.I)
+        # Pre-compile patterns used in setVolumeTitle
+        self.editedByPattern = re.compile("Edited by:")
+        self.tdBgColorPattern = re.compile("<td bgcolor", re.I)
+
+    def find(self, startLine: int, compiledPattern, step: int = 1) -> int | None:
+        """
+        find the next line with the given compiled regular expression pattern
+
+        Args:
+            startLine(int): index of the line to start search
+            compiledPattern(re.Pattern): the compiled regular expression pattern to search for
+            step(int): the steps to take e.g. +1 for forward -1 for backwards
+
+        Return:
+            int: the line number of the line or None if nothing was found
+        """
+        lineNo = startLine
+        while 0 < lineNo < len(self.lines) + 1:
+            line = self.lines[lineNo - 1]
+            if compiledPattern.match(line):
+                return lineNo
+            lineNo += step
+        return None
+
+    def findVolume(
+        self,
+        volCount: int,
+        startLine: int,
+        expectedTr: int = 3,
+        progress: int = 10,
+    ) -> tuple[int | None, int | None]:
+        """
+        find Volume lines from the given startLine
+
+        Args:
+            volCount(int): the volumeCount before the startLine
+            startLine(int): index of the line to search
+            expectedTr(int): number of <tr> tags expected
+            progress(int): how often to show the progress
+
+        Returns:
+            endLine of the volume html or None
+        """
+        trStartLine = self.find(startLine, self.thColspanPattern)
+        if trStartLine is not None:
+            lineNo = trStartLine + 1
+            trCount = 1
+            while lineNo < len(self.lines):
+                trLine = self.find(lineNo, self.trStartPattern)
+                if trLine is None:
+                    break
+                else:
+                    lineNo = trLine + 1
+                    trCount += 1
+                    if trCount == expectedTr:
+                        trEndLine = self.find(lineNo + 1, self.trEndPattern)
+                        if volCount % progress == 0 and self.config.verbose:
+                            print(f"volume count {volCount + 1:4}: lines {trStartLine:6}-{trEndLine:6}")
+                        return trStartLine, trEndLine
+        return None, None
+
+    def setVolumeTitle(self, volume: dict, lineIndex: int):
+        """
+        set the volume title
+
+        Args:
+            volume(dict): the volumeRecord to modify
+            lineIndex: where to start setting the volumeTitle
+        """
+        editedByLine = self.find(lineIndex, self.editedByPattern)
+        if editedByLine is not None:
+            tdLine = self.find(editedByLine, self.tdBgColorPattern, step=-1)
+            if tdLine is not None:
+                tdIndex = tdLine - 1
+                tdLines = []
+                while tdIndex < len(self.lines):
+                    line = self.lines[tdIndex]
+                    if line.startswith("Edited by:"):
+                        break
+                    tdLines.append(line)
+                    tdIndex += 1
+                volume["tdtitle"] = self.get_td_title(tdLines)
+
+    def parseVolume(self, volCount: int, fromLine: int, toLine: int, verbose: bool):
+        """
+        parse a volume from the given line range
+        """
+        lineCount = toLine - fromLine
+        volume = {
+            "fromLine": fromLine,
+            "toLine": toLine,
+            "valid": None,
+            "url": None,
+            "acronym": None,
+            "title": None,
+            "loctime": None,
+        }
+        self.setVolumeTitle(volume, fromLine)
+        self.setSeeAlsoVolumes(volume, fromLine, toLine)
+
+        for lineIndex in range(fromLine, toLine):
+            line = self.lines[lineIndex]
+            for info, pattern in self.infoPatterns.items():
+                self.getInfo(volume, info, pattern, line)
+            self.setVolumeName(volume, line)
+            if verbose:
+                print(line)
+        volumeNumber = volume.get("number", "?")
+        acronym = volume.get("acronym", "?")
+        self.log(f"{volumeNumber:4}-{volCount:4}:{fromLine}+{lineCount} {acronym}")
+        return volume
+
+    def parse(self, vol_limit: int | None = None) -> dict[int, dict]:
+        """
+        parse my html code for Volume info
+        by searching the lines of each volume with findVolume
+        """
+        lineNo = self.find(1, self.mainTablePattern)
+        volCount = 0
+        volumes = {}
+        while self.lines and lineNo and lineNo < len(self.lines):
+            if vol_limit and volCount >= vol_limit:
+                break
+            expectedTr = 3
+            volStartLine, volEndLine = self.findVolume(volCount, lineNo, expectedTr=expectedTr)
+            if volStartLine is None or volEndLine is None:
+                break
+            else:
+                volCount += 1
+                volume = self.parseVolume(
+                    volCount,
+                    volStartLine,
+                    volEndLine,
+                    verbose=self.config.verbose,
+                )
+                # synchronize on <tr><th and not on end since trailing TR might be missing
+                lineNo = volStartLine + 1
+                if "number" in volume:
+                    volume_number = volume["number"]
+                    if volume_number < self.config.down_to_volume:
+                        break
+                    volumes[volume_number] = volume
+                    if self.config.progress_bar is not None:
+                        self.config.progress_bar.update()
+                else:
+                    self.log(f"volume not found for volume at {volStartLine}")
+        return volumes
+
+
 class TestIndexHtml(Basetest):
     """
     Test reading the index HTML
@@ -174,3 +339,94 @@ class TestIndexHtml(Basetest):
                 actual_see_also = volumes.get(volume_number).get("seealso", None)
                 see_also = [f"Vol-{vn}" for vn in see_also]
                 self.assertListEqual(see_also, actual_see_also)
+
+    def makeIndexHtml(self, volumes: int, seed: int) -> str:
+        """
+        make a synthetic index.html with the given number of volumes
+        and random variations of the volume entries e.g. missing <tr> lines
+        """
+        rnd = random.Random(seed)
+        lines = ["<html>", '<td bgcolor="#FFFFFF">header', '<TABLE id="MAINTABLE" width="100%">']
+        for number in range(volumes, 0, -1):
+            th = rnd.choice(['<tr><th colspan="3" align="left">', '<TR><TH COLSPAN="3">', "<th colspan=3>"])
+            lines.append(f'{th}<a name="Vol-{number}">Vol-{number}</a></th></tr>')
+            if rnd.random() < 0.8:
+                lines.append("<tr>")
+            td = rnd.choice(['<TD bgcolor="#FFFFFF">&nbsp;</TD><TD bgcolor="#FFFFFF">', '<td bgcolor="#FFFFFF">'])
+            name = "deleted upon editor request" if rnd.random() < 0.05 else f"WS{number} &amp; Co"
+            lines.append(f'{td}<a href="https://ceur-ws.org/Vol-{number}/">{name}</a>\r')
+            if rnd.random() < 0.3:
+                lines.append(f'<font>see also: <a href="#Vol-{max(1, number - 3)}">x</a></font>')
+            lines.append(f"Proceedings of the Workshop {number} &amp; more<BR>")
+            lines.append(f"Vienna, Austria, March {number % 28 + 1}, 2020.<br>")
+            if rnd.random() < 0.9:
+                lines.append(f"Edited by: Alice &uuml; {number}, Bob<br>")
+            if rnd.random() < 0.7:
+                lines.append(f"  Submitted by: Alice {number}<br>")
+            pub = rnd.choice([f"{number % 28 + 1:02d}-Mar-2020", "unknown 2019"])
+            lines.append(f"Published on CEUR-WS: {pub}<br>")
+            lines.append(
+                f'ONLINE: <a href="https://ceur-ws.org/Vol-{number}/">https://ceur-ws.org/Vol-{number}/</a><br>'
+            )
+            if rnd.random() < 0.8:
+                lines.append(f'URN: <a href="https://nbn-resolving.org/urn:nbn:de:0074-{number}-1">urn</a><br>')
+            lines.append("</td>")
+            if rnd.random() < 0.85:
+                lines.append("</tr>")
+            if rnd.random() < 0.8:
+                lines.append("<tr><td>&nbsp;</td></tr>")
+        lines.append("</TABLE>")
+        return "\n".join(lines)
+
+    def checkParserParity(self, htmlText: str, parser_config: ParserConfig | None = None, vol_limit=None):
+        """
+        check that the tokenizer based and the legacy parse give the same volumes
+
+        Returns:
+            tuple: the number of volumes and the legacy and tokenizer parse times
+        """
+        start = time.time()
+        legacy_volumes = LegacyIndexHtmlParser(htmlText, parser_config).parse(vol_limit)
+        legacy_time = time.time() - start
+        start = time.time()
+        volumes = IndexHtmlParser(htmlText, parser_config).parse(vol_limit)
+        parse_time = time.time() - start
+        self.assertEqual(legacy_volumes, volumes)
+        return len(volumes), legacy_time, parse_time
+
+    def testTokenizerParity(self):
+        """
+        test the single pass tokenizer against the legacy parser
+        on synthetic index pages
+        """
+        for seed in range(20):
+            htmlText = self.makeIndexHtml(40, seed)
+            for down_to_volume, vol_limit in [(1, None), (20, None), (1, 7)]:
+                with self.subTest(seed=seed, down_to_volume=down_to_volume, vol_limit=vol_limit):
+                    self.checkParserParity(htmlText, ParserConfig(down_to_volume=down_to_volume), vol_limit)
+
+    def testTokenizerBenchmark(self):
+        """
+        compare the tokenizer and the legacy parser on the cached index.html
+        """
+        if not CEURWS.CACHE_HTML.is_file():
+            self.skipTest(f"{CEURWS.CACHE_HTML} not cached")
+        vm = VolumeManager()
+        htmlText = vm.getIndexHtml()
+        count, legacy_time, parse_time = self.checkParserParity(htmlText)
+        print(f"{count} volumes: legacy parse {legacy_time:.2f} s tokenizer parse {parse_time:.2f} s")
+
+    def testIterVolumes(self):
+        """
+        test that iter_volumes stops at down_to_volume reading only the top of the index
+        """
+        htmlText = self.makeIndexHtml(400, 1)
+        indexParser = IndexHtmlParser(htmlText, ParserConfig(down_to_volume=396))
+        volumes = {volume["number"]: volume for volume in indexParser.iter_volumes()}
+        self.assertTrue(len(volumes) > 0)
+        self.assertTrue(all(number >= 396 for number in volumes))
+        legacyParser = LegacyIndexHtmlParser(htmlText, ParserConfig(down_to_volume=396))
+        self.assertEqual(legacyParser.parse(), volumes)
+        # only the top of the index has been tokenized
+        lastTokenLine = indexParser.tokenLines[-1]
+        self.assertLess(lastTokenLine, len(indexParser.lines) // 10)
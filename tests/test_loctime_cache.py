@@ -0,0 +1,96 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import datetime
+import tempfile
+from pathlib import Path
+
+from ceurws.ceur_ws import Volume
+from ceurws.loctime_cache import LoctimeCache
+from tests.basetest import Basetest
+
+
+class CountingVolume(Volume):
+    """
+    volume counting the expensive loctime resolutions
+    """
+
+    resolutions = 0
+
+    def resolveLoctimeValues(self, loctime: str) -> dict:
+        CountingVolume.resolutions += 1
+        return {
+            "city": "Vienna",
+            "cityWikidataId": "Q1741",
+            "country": "Austria",
+            "countryWikidataId": "Q40",
+            "dateFrom": datetime.date(2022, 7, 25),
+            "dateTo": datetime.date(2022, 7, 26),
+        }
+
+
+class TestLoctimeCache(Basetest):
+    """
+    test the loctime resolution cache
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmpdir.name) / "ceurws.db"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        Basetest.tearDown(self)
+
+    def test_lru(self):
+        """
+        test the eviction of the least recently used loctime and the hit rate
+        """
+        cache = LoctimeCache(maxsize=2, db_path=self.db_path)
+        cache.put("Vienna, Austria, July 25, 2022", {"city": "Vienna"})
+        cache.put("Aachen, Germany, 2023", {"city": "Aachen"})
+        # whitespace differences map to the same key
+        self.assertEqual({"city": "Vienna"}, cache.get(" Vienna,  Austria, July 25, 2022."))
+        cache.put("Rome, Italy, 2024", {"city": "Rome"})
+        self.assertIsNone(cache.get("Aachen, Germany, 2023"))
+        self.assertEqual(2, len(cache))
+        stats = cache.get_stats()
+        self.assertEqual(1, stats["hits"])
+        self.assertEqual(1, stats["misses"])
+        self.assertAlmostEqual(0.5, stats["hit_rate"])
+
+    def test_persistence(self):
+        """
+        test saving and loading the cache
+        """
+        cache = LoctimeCache(db_path=self.db_path)
+        values = {"city": "Vienna", "dateFrom": datetime.date(2022, 7, 25), "virtualEvent": True}
+        cache.put("Vienna, Austria, July 25, 2022", values)
+        cache.put("Online, 2021", {"virtualEvent": True})
+        self.assertEqual(2, cache.save())
+        loaded = LoctimeCache(db_path=self.db_path)
+        self.assertEqual(2, loaded.load())
+        self.assertEqual(["Vienna, Austria, July 25, 2022", "Online, 2021"], list(loaded.entries))
+        self.assertEqual(values, loaded.get("Vienna, Austria, July 25, 2022"))
+
+    def test_resolve_once(self):
+        """
+        test that each distinct loctime of a set of volumes is resolved only once
+        """
+        CountingVolume.resolutions = 0
+        cache = LoctimeCache(db_path=self.db_path)
+        loctimes = ["Vienna, Austria, July 25-26, 2022", "Vienna, Austria, July 25-26, 2022", "Online, 2021"]
+        volumes = []
+        for number, loctime in enumerate(loctimes, start=1):
+            volume = CountingVolume(number=number)
+            volume.loctime = loctime
+            volume.resolveLoctime(cache)
+            volumes.append(volume)
+        self.assertEqual(2, CountingVolume.resolutions)
+        self.assertEqual("Q1741", volumes[1].cityWikidataId)
+        self.assertEqual(datetime.date(2022, 7, 26), volumes[1].dateTo)
+        self.assertEqual(1, cache.hits)
@@ -0,0 +1,125 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import time
+
+from lodstorage.sql import SQLDB
+
+from ceurws.proceedings_index import ProceedingsIndex
+from tests.basetest import Basetest
+
+
+class TestProceedingsIndex(Basetest):
+    """
+    test the in memory index of the Proceedings table
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        entity = "http://www.wikidata.org/entity"
+        self.records = [
+            {
+                "item": f"{entity}/Q113519123",
+                "sVolume": 3185,
+                "URN_NBN": "urn:nbn:de:0074-3185-4",
+                "event": f"{entity}/Q113574688",
+                "dblpProceedingsId": "conf/aiia/2022apai",
+            },
+            {
+                "item": f"{entity}/Q113512180",
+                "Volume": "3184",
+                "URN_NBN": "urn:nbn:de:0074-3184-1",
+                "event": f"{entity}/Q113512465|{entity}/Q113512468",
+            },
+            {"item": f"{entity}/Q1", "sVolume": 1, "URN_NBN": "urn:nbn:de:0074-1-a"},
+            {"item": f"{entity}/Q2", "sVolume": 1, "URN_NBN": "urn:nbn:de:0074-1-b"},
+        ]
+
+    def test_lookups(self):
+        """
+        test the lookups by volume number, URN and Qid
+        """
+        index = ProceedingsIndex(self.records, updated=time.time())
+        self.assertTrue(index.isFresh())
+        self.assertEqual(4, len(index))
+        self.assertEqual("Q113519123", index.getQidByVolnumber(3185))
+        self.assertEqual("Q113512180", index.getQidByVolnumber(3184))
+        # not unique
+        self.assertIsNone(index.getQidByVolnumber(1))
+        self.assertIsNone(index.getQidByVolnumber(4000))
+        self.assertEqual(["Q113512465", "Q113512468"], index.getEventQidsByVolnumber(3184))
+        self.assertEqual(
+            ["http://www.wikidata.org/entity/Q113519123"], index.getProceedingUrlsByUrn("urn:nbn:de:0074-3185-4")
+        )
+        self.assertEqual([], index.getProceedingUrlsByUrn("urn:nbn:incorrectId"))
+        self.assertTrue(index.canAnswerItem("Q113519123"))
+        self.assertFalse(index.canAnswerItem("Q113574688"))
+        self.assertTrue(index.hasPropertyValue("Q113519123", "P8978"))
+        self.assertFalse(index.hasPropertyValue("Q113512180", "P8978"))
+        self.assertIsNone(index.hasPropertyValue("Q113512180", "P31"))
+        self.assertEqual(1, len(index.recordsByEventQid["Q113512465"]))
+
+    def test_freshness(self):
+        """
+        test that stale snapshots and invalidated keys are not answered from the index
+        """
+        stale = ProceedingsIndex(self.records, updated=time.time() - 7200, max_age=3600)
+        self.assertFalse(stale.canAnswerVolume(3185))
+        unknown = ProceedingsIndex(self.records)
+        self.assertFalse(unknown.canAnswerUrn("urn:nbn:de:0074-3185-4"))
+        index = ProceedingsIndex(self.records, updated=time.time())
+        self.assertTrue(index.canAnswerVolume(3185))
+        self.assertTrue(index.canAnswerUrn("urn:nbn:de:0074-3185-4"))
+        # a miss might have been created on Wikidata since the snapshot
+        self.assertFalse(index.canAnswerVolume(4000))
+        self.assertFalse(index.canAnswerUrn("urn:nbn:de:0074-4000-1"))
+        index.invalidate(volnumber=3185, urn="urn:nbn:de:0074-3185-4", qid="Q113519123")
+        self.assertFalse(index.canAnswerVolume(3185))
+        self.assertFalse(index.canAnswerUrn("urn:nbn:de:0074-3185-4"))
+        self.assertFalse(index.canAnswerItem("Q113519123"))
+
+    def test_from_sqldb(self):
+        """
+        test loading the index from the Proceedings table
+        """
+        sqldb = SQLDB()
+        empty = ProceedingsIndex.fromSqlDB(sqldb)
+        self.assertEqual(0, len(empty))
+        self.assertFalse(empty.isFresh())
+        entityInfo = sqldb.createTable(self.records, "Proceedings", "URN_NBN", sampleRecordCount=-1)
+        sqldb.store(self.records, entityInfo, fixNone=True)
+        self.assertFalse(ProceedingsIndex.fromSqlDB(sqldb).isFresh())
+        ProceedingsIndex.storeUpdated(sqldb)
+        index = ProceedingsIndex.fromSqlDB(sqldb)
+        self.assertTrue(index.isFresh())
+        self.assertEqual("Q113519123", index.getQidByVolnumber(3185))
+        self.assertEqual("Q113512180", index.getQidByVolnumber(3184))
+
+    def test_query_volume(self):
+        """
+        test the indexed lookup of the proceedings record of a volume
+        including the fallback to the Volume column
+        """
+        sqldb = SQLDB()
+        self.assertEqual([], ProceedingsIndex.createVolumeIndices(sqldb))
+        self.assertIsNone(ProceedingsIndex.queryVolume(sqldb, 3185, []))
+        entityInfo = sqldb.createTable(self.records, "Proceedings", "URN_NBN", sampleRecordCount=-1)
+        sqldb.store(self.records, entityInfo, fixNone=True)
+        volumeColumns = ProceedingsIndex.createVolumeIndices(sqldb)
+        self.assertEqual(["sVolume", "Volume"], volumeColumns)
+        indices = {row[0] for row in sqldb.c.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        self.assertIn("Proceedings_sVolume", indices)
+        self.assertEqual("urn:nbn:de:0074-3185-4", ProceedingsIndex.queryVolume(sqldb, 3185, volumeColumns)["URN_NBN"])
+        # only available with the Volume property
+        self.assertEqual("urn:nbn:de:0074-3184-1", ProceedingsIndex.queryVolume(sqldb, 3184, volumeColumns)["URN_NBN"])
+        # the last record wins
+        self.assertEqual("urn:nbn:de:0074-1-b", ProceedingsIndex.queryVolume(sqldb, 1, volumeColumns)["URN_NBN"])
+        self.assertIsNone(ProceedingsIndex.queryVolume(sqldb, 4000, volumeColumns))
+        plan = sqldb.c.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM Proceedings WHERE sVolume=? OR (sVolume IS NULL AND Volume=?)",
+            (3185, "3185"),
+        ).fetchall()
+        self.assertIn("INDEX", str(plan))
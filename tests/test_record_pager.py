@@ -0,0 +1,100 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import orjson
+
+from ceurws.ceur_ws import Paper
+from ceurws.record_pager import RecordPager
+from tests.basetest import Basetest
+
+
+class TestRecordPager(Basetest):
+    """
+    test the cursor based pagination of records
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.papers = []
+        for number in range(1, 51):
+            for position in range(1, 5):
+                paper = Paper(id=f"Vol-{number:04}/paper{position}", title=f"Paper {position} of {number}")
+                self.papers.append(paper)
+        # the pager sorts by the key
+        self.papers.reverse()
+
+    def test_paging(self):
+        """
+        test paging through all papers with the cursor
+        """
+        pager = RecordPager(key="id")
+        cursor = None
+        ids = []
+        pages = 0
+        while True:
+            items, cursor = pager.page(self.papers, cursor=cursor, limit=17, fields=["title"])
+            pages += 1
+            self.assertTrue(all(list(item.keys()) == ["title"] for item in items))
+            ids.extend(item["title"] for item in items)
+            if cursor is None:
+                break
+        self.assertEqual(12, pages)
+        self.assertEqual(200, len(ids))
+        self.assertEqual(200, len(set(ids)))
+        self.assertEqual("Paper 1 of 1", ids[0])
+
+    def test_cursor_and_limit(self):
+        """
+        test invalid cursors and limits and a cursor of a deleted record
+        """
+        pager = RecordPager(key="id", max_limit=100)
+        with self.assertRaises(ValueError):
+            pager.page(self.papers, limit=0)
+        with self.assertRaises(ValueError):
+            pager.page(self.papers, limit=101)
+        with self.assertRaises(ValueError):
+            pager.page(self.papers, cursor="not a cursor!", limit=10)
+        # the cursor still works if its record is gone
+        cursor = RecordPager.encode_cursor("Vol-0010/paper2x")
+        items, _next_cursor = pager.page(self.papers, cursor=cursor, limit=2)
+        self.assertEqual(["Vol-0010/paper3", "Vol-0010/paper4"], [item["id"] for item in items])
+        self.assertEqual(12345, RecordPager.decode_cursor(RecordPager.encode_cursor(12345)))
+        # a cursor whose key is not of the type of the ids
+        for value in [12345, ["Vol-0010/paper2"], None]:
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    pager.page(self.papers, cursor=RecordPager.encode_cursor(value), limit=10)
+                with self.assertRaises(ValueError):
+                    pager.iter_records(self.papers, cursor=RecordPager.encode_cursor(value))
+
+    def test_version(self):
+        """
+        test that the sorted records are reused as long as their version is unchanged
+        """
+        pager = RecordPager(key="id")
+        items, _next_cursor = pager.page(self.papers, limit=1, version=1)
+        self.assertEqual("Vol-0001/paper1", items[0]["id"])
+        # an in place change of the same list is only seen with a new version
+        first = Paper(id="Vol-0000/paper1", title="Paper 1 of 0")
+        self.papers[0] = first
+        items, _next_cursor = pager.page(self.papers, limit=1, version=1)
+        self.assertEqual("Vol-0001/paper1", items[0]["id"])
+        items, _next_cursor = pager.page(self.papers, limit=1, version=2)
+        self.assertEqual("Vol-0000/paper1", items[0]["id"])
+        # without a version the records are sorted every time
+        items, _next_cursor = pager.page(list(reversed(self.papers)), limit=1)
+        self.assertEqual("Vol-0000/paper1", items[0]["id"])
+        self.assertEqual(2, pager.sorted_records[0] if pager.sorted_records is not None else None)
+
+    def test_ndjson(self):
+        """
+        test streaming the records as NDJSON lines
+        """
+        pager = RecordPager(key="id")
+        lines = list(RecordPager.to_ndjson(pager.iter_records(self.papers, fields=["id", "title"])))
+        self.assertEqual(200, len(lines))
+        self.assertTrue(all(line.endswith(b"\n") for line in lines))
+        self.assertEqual({"id": "Vol-0001/paper1", "title": "Paper 1 of 1"}, orjson.loads(lines[0]))
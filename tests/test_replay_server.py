@@ -0,0 +1,198 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import gzip
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from ceurws.ceur_ws import VolumeManager
+from ceurws.config import CEURWS
+from ceurws.indexparser import ParserConfig
+from ceurws.loctime import LoctimeParser
+from ceurws.replay_server import ReplayCorpus, ReplayServer, main
+from ceurws.utils.webscrape import HttpPool, WebScrape
+from ceurws.volume_pipeline import VolumePageFetcher
+from ceurws.volumeparser import VolumePageCache, VolumeParser
+from tests.basetest import Basetest
+
+
+class TestReplayServer(Basetest):
+    """
+    test the offline replay of the ceur-ws.org pages
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.location = Path(self.tmpdir.name) / "volumes"
+        self.index_path = Path(self.tmpdir.name) / "index.html"
+        self.saved = (
+            CEURWS.URL,
+            CEURWS.CACHE_HTML,
+            CEURWS.CACHE_HTML_META,
+            VolumePageCache.cache_location,
+            VolumePageCache.store,
+        )
+
+    def tearDown(self):
+        (
+            CEURWS.URL,
+            CEURWS.CACHE_HTML,
+            CEURWS.CACHE_HTML_META,
+            VolumePageCache.cache_location,
+            VolumePageCache.store,
+        ) = self.saved
+        self.tmpdir.cleanup()
+        Basetest.tearDown(self)
+
+    def test_generate_location(self):
+        """
+        test that a generated corpus never overwrites the cached volume pages
+        """
+        VolumePageCache.cache_location = self.location
+        CEURWS.CACHE_HTML = self.index_path
+        with self.assertRaises(ValueError):
+            ReplayCorpus.get_location(self.location)
+        for argv in [
+            ["--generate", "3", "--volumes_dir", str(self.location)],
+            [
+                "--generate",
+                "3",
+                "--volumes_dir",
+                str(Path(self.tmpdir.name) / "corpus"),
+                "--index",
+                str(self.index_path),
+            ],
+        ]:
+            with self.subTest(argv=argv), self.assertRaises(SystemExit):
+                main(argv)
+        self.assertFalse(self.location.exists())
+        self.assertFalse(self.index_path.exists())
+        location = ReplayCorpus.get_location()
+        try:
+            self.assertTrue(location.is_dir())
+            self.assertNotEqual(self.location, location)
+        finally:
+            shutil.rmtree(location)
+
+    def test_replay(self):
+        """
+        test replaying the index and volume pages
+        """
+        store = ReplayCorpus.generate(self.location, volumes=5, papers=3, index_path=self.index_path)
+        self.assertEqual([1, 2, 3, 4, 5], store.numbers())
+        with ReplayServer(store=store, index_path=self.index_path) as replay:
+            http_pool = HttpPool()
+            scrape = WebScrape(timeout=5, http_pool=http_pool)
+            index_html = scrape.get_html_from_url(replay.url)
+            self.assertIn('<a href="https://ceur-ws.org/Vol-5/">WS5 2020</a>', index_html)
+            self.assertEqual(index_html, scrape.get_html_from_url(f"{replay.url}/index.html"))
+            for path in ["/Vol-3", "/Vol-3/", "/Vol-3/index.html"]:
+                fetch_result = scrape.fetch(f"{replay.url}{path}")
+                self.assertEqual(200, fetch_result.status)
+                self.assertEqual(store.get(3), fetch_result.html)
+            not_modified = scrape.fetch(f"{replay.url}/Vol-3/", etag=fetch_result.etag)
+            self.assertTrue(not_modified.not_modified)
+            self.assertEqual(404, scrape.fetch(f"{replay.url}/Vol-6/").status)
+            self.assertEqual(404, scrape.fetch(f"{replay.url}/Vol-3/paper1.pdf").status)
+            # the pages are served gzip compressed
+            raw = http_pool.pool_manager.request(
+                "GET", f"{replay.url}/Vol-1/", headers={"Accept-Encoding": "gzip"}, decode_content=False
+            )
+            self.assertEqual("gzip", raw.headers.get("Content-Encoding"))
+            self.assertEqual(store.get(1), gzip.decompress(raw.data).decode())
+            self.assertEqual(1, http_pool.get_stats()["connections"])
+        self.assertEqual(2, replay.stats["not_found"])
+        self.assertEqual(1, replay.stats["not_modified"])
+
+    def test_fault_injection(self):
+        """
+        test the injected latency, errors and dropped connections
+        """
+        store = ReplayCorpus.generate(self.location, volumes=2, papers=1, index_path=self.index_path)
+        with ReplayServer(store=store, index_path=self.index_path, error_rate=1.0, error_status=429) as replay:
+            fetch_result = WebScrape(timeout=5, http_pool=HttpPool()).fetch(f"{replay.url}/Vol-1/")
+            self.assertEqual(429, fetch_result.status)
+            self.assertTrue(fetch_result.failed)
+        with ReplayServer(store=store, index_path=self.index_path, drop_rate=1.0) as replay:
+            fetch_result = WebScrape(timeout=5, http_pool=HttpPool()).fetch(f"{replay.url}/Vol-1/")
+            self.assertIsNone(fetch_result.status)
+            self.assertTrue(fetch_result.failed)
+            self.assertEqual(1, replay.stats["dropped"])
+        with ReplayServer(store=store, index_path=self.index_path, latency=0.1) as replay:
+            start = time.monotonic()
+            fetch_result = WebScrape(timeout=5, http_pool=HttpPool()).fetch(f"{replay.url}/Vol-2/")
+            self.assertGreaterEqual(time.monotonic() - start, 0.1)
+            self.assertEqual(store.get(2), fetch_result.html)
+
+    def test_rebase_url(self):
+        """
+        test rebasing ceur-ws.org urls on an overridden CEURWS.URL
+        """
+        url = "http://ceur-ws.org/Vol-2436/paper1.pdf"
+        CEURWS.URL = CEURWS.DEFAULT_URL
+        self.assertEqual(url, CEURWS.rebase_url(url))
+        CEURWS.URL = "http://127.0.0.1:8765"
+        self.assertEqual("http://127.0.0.1:8765/Vol-2436/paper1.pdf", CEURWS.rebase_url(url))
+        self.assertEqual("https://example.org/", CEURWS.rebase_url("https://example.org/"))
+        self.assertEqual("http://127.0.0.1:8765", VolumeParser().baseurl)
+
+    def test_pipeline_benchmark(self):
+        """
+        benchmark fetching and parsing the index and volume pages end to end
+        against a replay server with latency and injected errors
+        """
+        volumes = 200
+        store = ReplayCorpus.generate(self.location, volumes=volumes, papers=10, index_path=self.index_path)
+        cache_dir = Path(self.tmpdir.name) / "cache"
+        cache_dir.mkdir()
+        CEURWS.CACHE_HTML = cache_dir / "index.html"
+        CEURWS.CACHE_HTML_META = cache_dir / "index.meta.json"
+        VolumePageCache.cache_location = cache_dir / "volumes"
+        VolumePageCache.store = None
+        with ReplayServer(
+            store=store,
+            index_path=self.index_path,
+            latency=0.002,
+            jitter=0.003,
+            error_rate=0.05,
+            drop_rate=0.01,
+            seed=42,
+        ) as replay:
+            CEURWS.URL = replay.url
+            parser_config = ParserConfig(
+                force_download=True,
+                fetch_workers=8,
+                requests_per_second=0,
+                max_retries=5,
+                backoff_factor=0.01,
+                circuit_cooldown=0.1,
+            )
+            start = time.perf_counter()
+            vm = VolumeManager()
+            index_volumes = list(vm.iterVolumesFromIndexHtml(parser_config))
+            index_time = time.perf_counter() - start
+            fetcher = VolumePageFetcher(parser_config)
+            pages = list(fetcher.fetch([volume.number for volume in index_volumes]))
+            fetch_time = time.perf_counter() - start - index_time
+            volume_parser = VolumeParser()
+            loctime_parser = LoctimeParser()
+            results = [
+                vm.parseVolume(volume, page, volume_parser, loctime_parser)
+                for volume, page in zip(index_volumes, pages, strict=True)
+            ]
+            parse_time = time.perf_counter() - start - index_time - fetch_time
+        self.assertEqual(volumes, len(index_volumes))
+        self.assertEqual({}, fetcher.failed_volumes)
+        self.assertEqual(VolumePageCache.get_store().numbers(), store.numbers())
+        self.assertEqual([10] * volumes, [len(result["papers"]) for result in results])
+        self.assertEqual("Paper 1 of Workshop 200", results[0]["papers"][0]["title"])
+        print(
+            f"{volumes} volumes: index {index_time:.2f} s fetch {fetch_time:.2f} s"
+            f" ({volumes / fetch_time:.0f} pages/s) parse {parse_time:.2f} s - {dict(replay.stats)}"
+        )
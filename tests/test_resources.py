@@ -0,0 +1,67 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ceurws.resources import ResourceRegistry, get_loctime_parser
+from tests.basetest import Basetest
+
+
+class TestResources(Basetest):
+    """
+    test the lazy registry of heavy resources
+    """
+
+    def tearDown(self):
+        ResourceRegistry.loaders.pop("test.slow", None)
+        ResourceRegistry.reset("test.slow")
+        Basetest.tearDown(self)
+
+    def test_build_once(self):
+        """
+        test that a resource requested from many threads is built exactly once
+        """
+        calls = []
+        lock = threading.Lock()
+
+        def slow_loader():
+            with lock:
+                calls.append(1)
+            time.sleep(0.2)
+            return object()
+
+        ResourceRegistry.register("test.slow", slow_loader)
+        self.assertFalse(ResourceRegistry.is_loaded("test.slow"))
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            resources = list(executor.map(lambda _i: ResourceRegistry.get("test.slow"), range(16)))
+        self.assertEqual(1, len(calls))
+        self.assertEqual(1, len({id(resource) for resource in resources}))
+        self.assertTrue(ResourceRegistry.is_loaded("test.slow"))
+        self.assertGreaterEqual(ResourceRegistry.get_metrics()["test.slow"], 0.2)
+        ResourceRegistry.reset("test.slow")
+        self.assertFalse(ResourceRegistry.is_loaded("test.slow"))
+        with self.assertRaises(KeyError):
+            ResourceRegistry.get("test.unknown")
+
+    def test_loctime_parser(self):
+        """
+        test that the LoctimeParser is shared
+        """
+        loctime_parser = get_loctime_parser()
+        self.assertIs(loctime_parser, get_loctime_parser())
+        self.assertIn("loctime_parser", ResourceRegistry.get_metrics())
+
+    def test_lazy_import(self):
+        """
+        test that importing the volume manager does not import geograpy
+        """
+        code = "import sys, ceurws.ceur_ws; print('geograpy' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual("False", output.stdout.strip())
@@ -0,0 +1,84 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import gzip
+
+import orjson
+from fastapi import Request
+
+from ceurws import response_cache
+from ceurws.response_cache import ResponseCache
+from tests.basetest import Basetest
+
+
+class TestResponseCache(Basetest):
+    """
+    test the cache of serialized responses with ETags
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.volumes = [{"number": number, "title": f"Proceedings of Workshop {number}"} for number in range(1, 200)]
+
+    def request(self, **headers) -> Request:
+        """
+        get a request with the given headers
+        """
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/volumes.json",
+            "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+        }
+        return Request(scope)
+
+    def test_versions(self):
+        """
+        test that the body is only rebuilt for a new dataset version
+        """
+        cache = ResponseCache()
+        builds = []
+
+        def get_data():
+            builds.append(1)
+            return self.volumes
+
+        self.assertIsNone(cache.lookup("volumes", 1))
+        entry = cache.build("volumes", 1, get_data)
+        self.assertIs(entry, cache.lookup("volumes", 1))
+        self.assertIsNone(cache.lookup("volumes", 2))
+        changed = cache.build("volumes", 2, lambda: self.volumes[:10])
+        self.assertNotEqual(entry.etag, changed.etag)
+        self.assertEqual(1, len(builds))
+        self.assertEqual(1, cache.hits["volumes"])
+        self.assertEqual(2, cache.misses["volumes"])
+        self.assertEqual(self.volumes, orjson.loads(entry.bodies["identity"]))
+        self.assertEqual(entry.bodies["identity"], gzip.decompress(entry.bodies["gzip"]))
+        small = cache.build("small", 1, lambda: [])
+        self.assertEqual(["identity"], list(small.bodies.keys()))
+
+    def test_conditional_requests(self):
+        """
+        test content negotiation and If-None-Match
+        """
+        cache = ResponseCache()
+        entry = cache.build("volumes", 1, lambda: self.volumes)
+        plain = cache.response(self.request(), entry)
+        self.assertEqual(200, plain.status_code)
+        self.assertEqual(entry.etag, plain.headers["etag"])
+        self.assertNotIn("content-encoding", plain.headers)
+        zipped = cache.response(self.request(accept_encoding="gzip;q=1.0, br;q=0"), entry)
+        self.assertEqual("gzip", zipped.headers["content-encoding"])
+        self.assertEqual(self.volumes, orjson.loads(gzip.decompress(zipped.body)))
+        not_modified = cache.response(self.request(accept_encoding="gzip", if_none_match=zipped.headers["etag"]), entry)
+        self.assertEqual(304, not_modified.status_code)
+        self.assertEqual(b"", not_modified.body)
+        self.assertEqual(304, cache.response(self.request(if_none_match=f'"x", W/{entry.etag}'), entry).status_code)
+        self.assertEqual(200, cache.response(self.request(if_none_match='"outdated"'), entry).status_code)
+        if response_cache.brotli is not None:
+            compressed = cache.response(self.request(accept_encoding="gzip, deflate, br"), entry)
+            self.assertEqual("br", compressed.headers["content-encoding"])
+            self.assertEqual(entry.bodies["identity"], response_cache.brotli.decompress(compressed.body))
@@ -0,0 +1,135 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import random
+import time
+
+from bs4 import BeautifulSoup
+
+from ceurws.papertocparser import PaperTocParser
+from ceurws.replay_server import ReplayCorpus
+from ceurws.utils.webscrape import ScrapeDescription, ScrapeExtractor, WebScrape
+from tests.basetest import Basetest
+from tests.test_html_parser import LEGACY_PAGE, MODERN_PAGE
+
+# the rdfa descriptions of the volume pages and the descriptions of the papers
+SCRAPE_DESCR = [
+    ScrapeDescription(key=key.lower(), tag="span", attribute="class", value=key)
+    for key in [
+        "CEURVOLNR",
+        "CEURURN",
+        "CEURPUBYEAR",
+        "CEURPUBDATE",
+        "CEURVOLACRONYM",
+        "CEURVOLTITLE",
+        "CEURFULLTITLE",
+        "CEURLOCTIME",
+        "CEURCOLOCATED",
+        "CEURTITLE",
+        "CEURPAGES",
+    ]
+] + [
+    ScrapeDescription(key="authors", tag="span", attribute="class", value="CEURAUTHOR", multi=True),
+    ScrapeDescription(key="editors", tag="span", attribute="class", value="CEURVOLEDITOR", multi=True),
+]
+
+
+class TestScrapeExtractor(Basetest):
+    """
+    test the single traversal extraction of ScrapeDescriptions
+    """
+
+    def fromTags(self, soup: BeautifulSoup, scrapeDescr: list[ScrapeDescription]) -> dict:
+        """
+        extract the given descriptions with one find_all per description as reference
+        """
+        scrape = WebScrape()
+        return {
+            item.key: scrape.fromTag(soup, item.tag, item.attribute, item.value, multi=item.multi)
+            for item in scrapeDescr
+        }
+
+    def getPages(self) -> dict[str, str]:
+        """
+        get the fixture and replay corpus pages
+        """
+        pages = {"modern": MODERN_PAGE, "legacy": LEGACY_PAGE}
+        for number in range(1, 11):
+            pages[f"corpus Vol-{number}"] = ReplayCorpus.make_volume_html(number, papers=20)
+        return pages
+
+    def test_parity(self):
+        """
+        test that the extractor gives the same results as fromTag for every description
+        """
+        for name, page in self.getPages().items():
+            with self.subTest(name=name):
+                soup = BeautifulSoup(page, "html.parser")
+                self.assertEqual(self.fromTags(soup, SCRAPE_DESCR), ScrapeExtractor(SCRAPE_DESCR).extract(soup))
+                for paper_li in soup.find_all("li"):
+                    self.assertEqual(
+                        self.fromTags(paper_li, SCRAPE_DESCR), ScrapeExtractor(SCRAPE_DESCR).extract(paper_li)
+                    )
+        soup = BeautifulSoup(MODERN_PAGE, "html.parser")
+        papers = PaperTocParser(number="2436", soup=soup).parsePapers()
+        self.assertEqual(["Alice", "Bob"], papers[1]["authors"])
+        self.assertEqual("3-10", papers[1]["pages"])
+        self.assertIs(ScrapeExtractor.compile(SCRAPE_DESCR), ScrapeExtractor.compile(list(SCRAPE_DESCR)))
+
+    def test_parity_random(self):
+        """
+        test the parity for random nested elements with multiple classes and other attributes
+        """
+        rnd = random.Random(2436)
+        classes = ["CEURA", "CEURB", "CEURA CEURB", "CEURB CEURA", " CEURA ", "ceura", ""]
+        tags = ["span", "div", "a", "li"]
+        scrapeDescr = [
+            ScrapeDescription(key="a", tag="span", attribute="class", value="CEURA"),
+            ScrapeDescription(key="a_multi", tag="span", attribute="class", value="CEURA", multi=True),
+            ScrapeDescription(key="ab", tag="span", attribute="class", value="CEURA CEURB", multi=True),
+            ScrapeDescription(key="b_div", tag="div", attribute="class", value="CEURB", multi=True),
+            ScrapeDescription(key="id", tag="a", attribute="id", value="p1", multi=True),
+            ScrapeDescription(key="li", tag="li", attribute=None, value=None, multi=True),
+            ScrapeDescription(key="li_first", tag="li", attribute="class", value=None),
+            ScrapeDescription(key="missing", tag="table", attribute="class", value="CEURA"),
+        ]
+
+        def makeHtml(depth: int) -> str:
+            parts = []
+            for _i in range(rnd.randint(0, 3)):
+                parts.append(rnd.choice(["", "x", " y "]))
+                if depth < 4:
+                    tag = rnd.choice(tags)
+                    attrs = f'class="{rnd.choice(classes)}" id="{rnd.choice(["p1", "p2"])}"'
+                    parts.append(f"<{tag} {attrs}>{makeHtml(depth + 1)}</{tag}>")
+            return "".join(parts)
+
+        extractor = ScrapeExtractor(scrapeDescr)
+        for _i in range(500):
+            html = f"<ul>{makeHtml(0)}</ul>"
+            soup = BeautifulSoup(html, "html.parser")
+            self.assertEqual(self.fromTags(soup, scrapeDescr), extractor.extract(soup), html)
+
+    def test_benchmark(self):
+        """
+        benchmark the extraction with one find_all per description against the single traversal
+        """
+        soups = [BeautifulSoup(page, "html.parser") for page in self.getPages().values()]
+        timings = {}
+        start = time.perf_counter()
+        for soup in soups:
+            self.fromTags(soup, SCRAPE_DESCR)
+        timings["find_all"] = time.perf_counter() - start
+        start = time.perf_counter()
+        extractor = ScrapeExtractor.compile(SCRAPE_DESCR)
+        for soup in soups:
+            extractor.extract(soup)
+        timings["extractor"] = time.perf_counter() - start
+        print(
+            f"{len(soups)} volume pages {len(SCRAPE_DESCR)} descriptions: "
+            + " ".join(f"{name} {timing:.3f} s" for name, timing in timings.items())
+        )
+        self.assertLess(timings["extractor"], timings["find_all"])
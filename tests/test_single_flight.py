@@ -0,0 +1,81 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import asyncio
+import threading
+import time
+
+from ceurws.single_flight import SingleFlight
+from tests.basetest import Basetest
+
+
+class TestSingleFlight(Basetest):
+    """
+    test sharing blocking calls run off the event loop
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.loads = 0
+        self.lock = threading.Lock()
+
+    def slow_load(self) -> list[int]:
+        """
+        a blocking load
+        """
+        with self.lock:
+            self.loads += 1
+        time.sleep(0.2)
+        return [1, 2, 3]
+
+    def test_concurrent_calls(self):
+        """
+        test that concurrent calls share one load and the event loop keeps running meanwhile
+        """
+
+        async def scenario():
+            single_flight = SingleFlight()
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while single_flight.inflight or ticks == 0:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            results = await asyncio.gather(tick(), *[single_flight.do("dblp", self.slow_load) for _i in range(5)])
+            return single_flight, ticks, results[1:]
+
+        single_flight, ticks, results = asyncio.run(scenario())
+        self.assertEqual(1, self.loads)
+        self.assertTrue(all(result == [1, 2, 3] for result in results))
+        self.assertEqual(5, single_flight.calls["dblp"])
+        self.assertEqual(4, single_flight.joined["dblp"])
+        # the loop was not blocked by the load
+        self.assertGreater(ticks, 5)
+        self.assertEqual({}, single_flight.inflight)
+
+    def test_errors_and_warm_up(self):
+        """
+        test that errors are passed to all callers and reported by the warm up
+        """
+
+        def failing_load():
+            raise ValueError("endpoint not available")
+
+        async def scenario():
+            single_flight = SingleFlight(offload=asyncio.to_thread)
+            with self.assertRaises(ValueError):
+                await single_flight.do("dblp", failing_load)
+            errors = await single_flight.warm_up({"dblp": failing_load, "papers": self.slow_load})
+            # a later call starts a new load
+            await single_flight.do("papers", self.slow_load)
+            return errors
+
+        errors = asyncio.run(scenario())
+        self.assertEqual(["dblp"], list(errors.keys()))
+        self.assertIsInstance(errors["dblp"], ValueError)
+        self.assertEqual(2, self.loads)
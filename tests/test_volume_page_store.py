@@ -0,0 +1,135 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ceurws.volume_page_store import DirectoryVolumePageStore, SqliteVolumePageStore, VolumePageStore
+from ceurws.volumeparser import VolumePageCache
+from tests.basetest import Basetest
+
+
+class TestVolumePageStore(Basetest):
+    """
+    test the storage backends of the volume page cache
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmpdir.name)
+        self.pages = {
+            1: "<html><body>Vol-1 ä</body></html>",
+            2: b"<html><body>Vol-2 \xe4 latin-1</body></html>",
+            10: "<html><body>Vol-10</body></html>",
+        }
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        Basetest.tearDown(self)
+
+    def check_store(self, store):
+        """
+        check the given store with my pages
+        """
+        for number, html in self.pages.items():
+            store.put(number, html)
+        store.set_meta(10, {"etag": '"x"'})
+        self.assertEqual([1, 2, 10], store.numbers())
+        for number, html in self.pages.items():
+            self.assertTrue(store.is_cached(number))
+            self.assertEqual(html, store.get(number))
+        self.assertEqual({"etag": '"x"'}, store.get_meta(10))
+        self.assertEqual(self.pages, dict(store.iter_pages()))
+        store.delete(10)
+        self.assertFalse(store.is_cached(10))
+        self.assertIsNone(store.get(10))
+        self.assertIsNone(store.get_meta(10))
+        # meta without a page is not counted as cached
+        store.set_meta(11, {"etag": '"y"'})
+        self.assertFalse(store.is_cached(11))
+        self.assertEqual([1, 2], store.numbers())
+
+    def test_directory_store(self):
+        """
+        test the one file per volume store
+        """
+        self.check_store(DirectoryVolumePageStore(self.tmp_path / "volumes"))
+        with self.assertRaises(TypeError):
+            VolumePageStore()  # type: ignore[abstract]
+
+    def test_sqlite_store(self):
+        """
+        test the single file archive store
+        """
+        store = SqliteVolumePageStore(self.tmp_path / "volumes.db", batch_size=2)
+        self.check_store(store)
+        store.close()
+
+    def test_sqlite_connection(self):
+        """
+        test that the archive store keeps a single WAL connection until it is closed
+        """
+        store = SqliteVolumePageStore(self.tmp_path / "volumes.db", batch_size=2)
+        store.put(1, self.pages[1])
+        connection = store.connection
+        self.assertIsNotNone(connection)
+        self.assertEqual("wal", store.connect().execute("PRAGMA journal_mode").fetchone()[0])
+        numbers = list(range(1, 50))
+
+        def fetch(number: int) -> str | bytes | None:
+            store.set_meta(number, {"etag": f'"{number}"'})
+            store.put(number, f"<html>Vol-{number}</html>")
+            return store.get(number)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            pages = list(executor.map(fetch, numbers))
+        self.assertEqual([f"<html>Vol-{number}</html>" for number in numbers], pages)
+        self.assertIs(connection, store.connection)
+        # iterating in batches while reading metadata from the same store
+        metas = {number: store.get_meta(number) for number, _html in store.iter_pages()}
+        self.assertEqual(numbers, list(metas))
+        self.assertEqual({"etag": '"49"'}, metas[49])
+        store.close()
+        self.assertIsNone(store.connection)
+        store.close()
+        # a closed store reconnects on demand
+        self.assertEqual(numbers, store.numbers())
+        store.close()
+
+    def test_import_export(self):
+        """
+        test importing and exporting the directory layout
+        """
+        cache_location = VolumePageCache.cache_location
+        try:
+            VolumePageCache.cache_location = self.tmp_path / "volumes"
+            for number, html in self.pages.items():
+                VolumePageCache.cache(number, html)
+            VolumePageCache.set_meta(1, {"etag": '"1"'})
+            imported = VolumePageCache.use_archive(self.tmp_path / "volumes.db")
+            self.assertEqual(3, imported)
+            self.assertIsInstance(VolumePageCache.get_store(), SqliteVolumePageStore)
+            self.assertEqual(self.pages[2], VolumePageCache.get(2))
+            self.assertEqual({"etag": '"1"'}, VolumePageCache.get_meta(1))
+            VolumePageCache.cache(20, "<html>Vol-20</html>")
+            exported = VolumePageCache.export_directory(self.tmp_path / "export")
+            self.assertEqual(4, exported)
+            export_store = DirectoryVolumePageStore(self.tmp_path / "export")
+            self.assertEqual([1, 2, 10, 20], export_store.numbers())
+            self.assertEqual({"etag": '"1"'}, export_store.get_meta(1))
+            # the archive is used by later runs until use_directory is called
+            VolumePageCache.get_store().close()
+            VolumePageCache.store = None
+            self.assertIsInstance(VolumePageCache.get_store(), SqliteVolumePageStore)
+            self.assertEqual([1, 2, 10, 20], VolumePageCache.get_store().numbers())
+            VolumePageCache.use_directory()
+            self.assertIsInstance(VolumePageCache.get_store(), DirectoryVolumePageStore)
+            self.assertEqual([1, 2, 10], VolumePageCache.get_store().numbers())
+        finally:
+            VolumePageCache.use_directory()
+            VolumePageCache.cache_location = cache_location
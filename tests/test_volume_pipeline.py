@@ -0,0 +1,222 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from ceurws.ceur_ws import Volume, VolumeManager
+from ceurws.indexparser import ParserConfig
+from ceurws.loctime import LoctimeParser
+from ceurws.utils.webscrape import HostRateLimiter
+from ceurws.volume_fingerprint import VolumeFingerprints
+from ceurws.volume_pipeline import VolumePageFetcher
+from ceurws.volumeparser import VolumePageCache, VolumeParser
+from tests.basetest import Basetest
+
+
+class TestVolumePipeline(Basetest):
+    """
+    test the volume page fetch pipeline
+    """
+
+    def test_fetch_order_and_bound(self):
+        """
+        test that the pages are yielded in order and
+        that not more than fetch_workers pages are in flight
+        """
+        parser_config = ParserConfig(fetch_workers=4, requests_per_second=0)
+        fetcher = VolumePageFetcher(parser_config)
+        lock = threading.Lock()
+        in_flight = 0
+        max_in_flight = 0
+
+        def get_volume_page(number: int, recache: bool = False) -> str:
+            nonlocal in_flight, max_in_flight
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            time.sleep(random.uniform(0.001, 0.02))
+            with lock:
+                in_flight -= 1
+            return f"Vol-{number}"
+
+        fetcher.volume_parser.get_volume_page = get_volume_page
+        numbers = [30, 29, None, 27, 26, 25, 24, 23, 22, 21, 20]
+        pages = list(fetcher.fetch(numbers))
+        expected = [f"Vol-{number}" if number is not None else None for number in numbers]
+        self.assertEqual(expected, pages)
+        self.assertLessEqual(max_in_flight, 4)
+
+    def test_host_rate_limiter(self):
+        """
+        test that requests to the same host are spaced
+        """
+        limiter = HostRateLimiter(requests_per_second=50)
+        start = time.monotonic()
+        for i in range(5):
+            limiter.wait(f"https://ceur-ws.org/Vol-{i}/")
+        # another host is not delayed by the ceur-ws.org requests
+        delay = limiter.wait("https://example.org/")
+        elapsed = time.monotonic() - start
+        self.assertEqual(0.0, delay)
+        self.assertGreaterEqual(elapsed, 4 / 50 * 0.9)
+
+    def test_parse_in_pool(self):
+        """
+        test that parsing cached volume pages in a process pool
+        gives the same results as parsing them in the current process
+        """
+        html_template = """<html><head><title>CEUR-WS.org/Vol-{number} - Workshop {number}</title></head>
+<body><h1>Workshop {number}</h1>
+<div class="CEURTOC"><ul>
+<li id="paper1"><a href="paper1.pdf">Paper One</a><span class="CEURPAGES">1-10</span><br>
+<span class="CEURAUTHOR">Alice</span>, <span class="CEURAUTHOR">Bob</span></li>
+</ul></div></body></html>"""
+        cache_location = VolumePageCache.cache_location
+        with tempfile.TemporaryDirectory() as tmpdir:
+            VolumePageCache.cache_location = Path(tmpdir)
+            try:
+                numbers = [3001, 3002, 3003]
+                pages = {number: html_template.format(number=number) for number in numbers}
+                # a stale cached page must not be used by the workers
+                VolumePageCache.cache(3001, "<html><title>stale</title></html>")
+                results = {}
+                for workers in [1, 2]:
+                    volumes = []
+                    for number in numbers:
+                        volume = Volume()
+                        volume.fromDict(
+                            {
+                                "number": number,
+                                "url": f"http://ceur-ws.org/Vol-{number}/",
+                                "tdtitle": f"Workshop {number}, Vienna, Austria, March 3, 2020",
+                                "valid": True,
+                            }
+                        )
+                        volumes.append(volume)
+                    parser_config = ParserConfig(parse_workers=workers)
+                    vm = VolumeManager()
+                    if workers > 1:
+                        volume_pages = [(volume, pages[volume.number]) for volume in volumes]
+                        worker_results = []
+                        for volume, result in vm.parseVolumesInPool(volume_pages, parser_config):
+                            volume.fromDict(result["volume_dict"])
+                            worker_results.append(result)
+                    else:
+                        volume_parser = VolumeParser()
+                        loctime_parser = LoctimeParser()
+                        worker_results = [
+                            vm.parseVolume(volume, pages[volume.number], volume_parser, loctime_parser)
+                            for volume in volumes
+                        ]
+                    results[workers] = (
+                        [result["papers"] for result in worker_results],
+                        [result["loctime"] for result in worker_results],
+                        [(volume.title, volume.h1, volume.acronym) for volume in volumes],
+                    )
+                self.assertEqual(results[1], results[2])
+                papers = results[2][0]
+                self.assertEqual(3, len(papers))
+                self.assertEqual("Workshop 3001", results[2][2][0][1])
+                # a failed fetch is parsed without a page like in the current process
+                volume = Volume()
+                volume.fromDict({"number": 3001, "url": "http://ceur-ws.org/Vol-3001/", "valid": True})
+                parser_config = ParserConfig(parse_workers=2)
+                [(volume, result)] = list(vm.parseVolumesInPool([(volume, None)], parser_config))
+                self.assertEqual([], result["papers"])
+                self.assertNotEqual("stale", result["volume_dict"].get("title"))
+            finally:
+                VolumePageCache.cache_location = cache_location
+
+    def test_skip_unchanged_volumes(self):
+        """
+        test that only volumes with a changed fingerprint are passed on for parsing
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            volumeFingerprints = VolumeFingerprints(db_path=Path(tmpdir) / "ceurws.db")
+            vm = VolumeManager()
+            volumes = []
+            pages = []
+            for number in [3, 2, 1]:
+                volume = Volume()
+                volume.fromDict(
+                    {
+                        "number": number,
+                        "url": f"http://ceur-ws.org/Vol-{number}/",
+                        "fromLine": 100 - 10 * number,
+                        "toLine": 109 - 10 * number,
+                    }
+                )
+                vm.indexBlockHashes[number] = VolumeFingerprints.hash_index_block([f"<tr><th colspan>Vol-{number}"])
+                volumes.append(volume)
+                pages.append(f"<html>Vol-{number}</html>")
+            previousVolumes = {number: Volume() for number in [2, 1]}
+            for number, previousVolume in previousVolumes.items():
+                # the volumes of the last run before volume 3 was added at the top
+                previousVolume.fromDict(
+                    {
+                        "number": number,
+                        "url": f"http://ceur-ws.org/Vol-{number}/",
+                        "title": f"title {number}",
+                        "fromLine": 90 - 10 * number,
+                        "toLine": 99 - 10 * number,
+                    }
+                )
+            vm.volumes = list(previousVolumes.values())
+            cacheFile = str(Path(tmpdir) / "ceurws.db")
+            vm.storeLoD(vm.getLoD(), cacheFile=cacheFile, sampleRecordCount=-1)
+            previousPositions = {number: vm.getIndexPositions(volume) for number, volume in previousVolumes.items()}
+            stored = {
+                2: VolumeFingerprints.fingerprint(vm.indexBlockHashes[2], "<html>Vol-2</html>"),
+                1: VolumeFingerprints.fingerprint(vm.indexBlockHashes[1], "<html>Vol-1 old</html>"),
+            }
+            volumeFingerprints.store_fingerprints(stored)
+            fingerprints: dict[int, str] = {}
+            skipped: dict[int, Volume] = {}
+            changed = vm.iterChangedVolumes(
+                volumes, iter(pages), volumeFingerprints.get_fingerprints(), previousVolumes, fingerprints, skipped
+            )
+            changedNumbers = [volume.number for volume, _html in changed]
+            # 3 is new, 1 has a changed page and 2 is unchanged
+            self.assertEqual([3, 1], changedNumbers)
+            self.assertEqual([2], list(skipped))
+            self.assertIs(previousVolumes[2], skipped[2])
+            # the skipped volume has the line range of the current index
+            self.assertEqual((80, 89), (skipped[2].fromLine, skipped[2].toLine))
+            # the moved line range of the skipped volume is written to the database
+            parsedVolumes = [volume for volume in volumes if volume.number not in skipped]
+            for volume in parsedVolumes:
+                volume.title = f"title {volume.number}"
+            self.assertEqual(3, vm.upsertVolumes(parsedVolumes, skipped, previousPositions, cacheFile=cacheFile))
+            connection = sqlite3.connect(cacheFile)
+            try:
+                rows = connection.execute("SELECT number, fromLine, toLine FROM volumes ORDER BY number").fetchall()
+            finally:
+                connection.close()
+            self.assertEqual([(1, 90, 99), (2, 80, 89), (3, 70, 79)], rows)
+            volumeFingerprints.store_fingerprints(fingerprints)
+            self.assertEqual(fingerprints, volumeFingerprints.get_fingerprints())
+            # a parser change or a switch of the html parser changes all fingerprints
+            for parserKey in [
+                VolumeFingerprints.parser_key("html.parser"),
+                VolumeFingerprints.parser_key("lxml"),
+            ]:
+                with self.subTest(parserKey=parserKey):
+                    changed = vm.iterChangedVolumes(
+                        volumes,
+                        iter(pages),
+                        volumeFingerprints.get_fingerprints(),
+                        previousVolumes,
+                        {},
+                        {},
+                        parserKey=parserKey,
+                    )
+                    self.assertEqual([3, 2, 1], [volume.number for volume, _html in changed])
+            self.assertNotEqual(VolumeFingerprints.parser_key("lxml"), VolumeFingerprints.parser_key("html.parser"))
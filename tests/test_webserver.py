@@ -0,0 +1,230 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+from lodstorage.lod import LOD
+from lodstorage.sql import SQLDB
+from nicegui import app
+
+from ceurws.ceur_ws import Volume, VolumeManager
+from ceurws.dblp_index import SortedStore
+from ceurws.models.dblp import DblpPaper, DblpProceeding, DblpScholar
+from ceurws.record_pager import RecordPager
+from ceurws.webserver import CeurWsWebServer
+from ceurws.wikidatasync import WikidataSync
+from tests.basetest import Basetest
+
+
+class WikidataSyncStub:
+    """
+    stand-in for the WikidataSync of the webserver with an in memory Proceedings table
+    """
+
+    iterProceedingsFromCache = WikidataSync.iterProceedingsFromCache
+
+    def __init__(self, proceedings: list[dict]):
+        self.sqldb = SQLDB(check_same_thread=False)
+        entityInfo = self.sqldb.createTable(proceedings, "Proceedings", "URN_NBN", sampleRecordCount=-1)
+        self.sqldb.store(proceedings, entityInfo, fixNone=True)
+
+
+class DblpEndpointStub:
+    """
+    stand-in for the DblpEndpoint of the webserver with the given proceedings
+    """
+
+    def __init__(self, proceedings: list[DblpProceeding], papers: list[DblpPaper] | None = None):
+        self.proceedingsByVolume = {proceeding.volume_number: proceeding for proceeding in proceedings}
+        # the index is loaded
+        self.dblp_index = SortedStore([], sort_key=lambda paper: (paper.volume_number,))
+        self.dblp_papers = SimpleNamespace(
+            papers_by_volume=LOD.getLookup(papers or [], "volume_number", withDuplicates=True),
+            papersByPdfId={paper.pdf_id: paper for paper in papers or []},
+        )
+
+    def get_ceur_proceeding(self, volume_number: int) -> DblpProceeding | None:
+        return self.proceedingsByVolume.get(volume_number)
+
+    def get_ceur_volume_paper(self, volume_number: int, paper_id: str) -> DblpPaper | None:
+        return self.dblp_papers.papersByPdfId.get(f"Vol-{volume_number}/{paper_id}")
+
+
+class TestWebserver(Basetest):
+    """
+    test the JSON routes of the webserver
+    """
+
+    # the routes are registered on the global app so there is a single server per process
+    server: CeurWsWebServer | None = None
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        if TestWebserver.server is None:
+            TestWebserver.server = CeurWsWebServer()
+        self.server = TestWebserver.server
+        self.proceedings = [
+            {"URN_NBN": f"urn:nbn:de:0074-{number}-0", "item": f"http://www.wikidata.org/entity/Q{number}"}
+            for number in range(1, 26)
+        ]
+        self.server.wdSync = WikidataSyncStub(self.proceedings)
+        self.client = TestClient(app)
+
+    def test_proceedings_paging(self):
+        """
+        test paging the proceedings by URN
+        """
+        urns = []
+        cursor = None
+        while True:
+            params = {"limit": 10, "fields": "URN_NBN"}
+            if cursor is not None:
+                params["cursor"] = cursor
+            response = self.client.get("/proceedings.json", params=params)
+            self.assertEqual(200, response.status_code)
+            urns.extend(record["URN_NBN"] for record in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+            # the cursor stays valid when update recreates the table in another order
+            self.server.wdSync = WikidataSyncStub(list(reversed(self.proceedings)))
+        self.assertEqual(sorted(record["URN_NBN"] for record in self.proceedings), urns)
+        # a proceedings page is not limited by the volume pager
+        self.server.volumePager.max_limit = 5
+        try:
+            self.assertEqual(200, self.client.get("/proceedings.json", params={"limit": 10}).status_code)
+        finally:
+            self.server.volumePager.max_limit = 10000
+        max_limit = self.server.proceedingsPager.max_limit
+        response = self.client.get("/proceedings.json", params={"limit": max_limit + 1})
+        self.assertEqual(400, response.status_code)
+
+    def test_dblp_page_limit(self):
+        """
+        test that the dblp pages have their own page size limit
+        """
+        store = SortedStore(range(1, 101), sort_key=lambda number: (number,))
+        self.server.volumePager.max_limit = 5
+        try:
+            response = Response()
+            items = self.server.dblpPage(response, store, limit=10, offset=0, cursor=None)
+        finally:
+            self.server.volumePager.max_limit = 10000
+        self.assertEqual(list(range(1, 11)), items)
+        self.assertIn("X-Next-Cursor", response.headers)
+        for limit, offset in [(0, 0), (self.server.dblpMaxLimit + 1, 0), (10, -1)]:
+            with self.subTest(limit=limit, offset=offset), self.assertRaises(HTTPException):
+                self.server.dblpPage(Response(), store, limit=limit, offset=offset, cursor=None)
+
+    def test_dblp_volume_editors(self):
+        """
+        test the editors of a dblp volume - also for a volume without editors
+        """
+        editor = DblpScholar(dblp_author_id="https://dblp.org/pid/f/WolfgangFahl", label="Wolfgang Fahl")
+        self.server.wdSync.dblpEndpoint = DblpEndpointStub(
+            [
+                DblpProceeding(dblp_publication_id="conf/x/2020", volume_number=1, title="X", editors=[editor]),
+                DblpProceeding(dblp_publication_id="conf/y/2020", volume_number=2, title="Y", editors=None),
+            ]
+        )
+        response = self.client.get("/dblp/volume/1/editor")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(["Wolfgang Fahl"], [editor["label"] for editor in response.json()])
+        response = self.client.get("/dblp/volume/2/editor")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([], response.json())
+        self.assertEqual(404, self.client.get("/dblp/volume/3/editor").status_code)
+
+    def test_volumes_version(self):
+        """
+        test that the cached volumes are rebuilt when the volume manager bumps its data version
+        """
+        vm = VolumeManager()
+        volume = Volume()
+        volume.fromDict({"number": 1, "title": "old"})
+        vm.volumes = [volume]
+        self.server.wdSync.vm = vm
+        self.assertEqual(["old"], [record["title"] for record in self.client.get("/volumes.json").json()])
+        # an in place edit keeps the identity and length of the list
+        volume.title = "new"
+        vm.bumpDataVersion()
+        self.assertEqual(["new"], [record["title"] for record in self.client.get("/volumes.json").json()])
+        # the sorted volumes of the pager are rebuilt as well
+        params = {"limit": 10, "fields": "number"}
+        self.assertEqual([{"number": 1}], self.client.get("/volumes.json", params=params).json())
+        volume2 = Volume()
+        volume2.fromDict({"number": 2, "title": "added"})
+        vm.volumes.append(volume2)
+        vm.bumpDataVersion()
+        self.assertEqual([{"number": 1}, {"number": 2}], self.client.get("/volumes.json", params=params).json())
+
+    def test_volumes_cursor_type(self):
+        """
+        test that a cursor with a key of the wrong type is rejected
+        """
+        vm = VolumeManager()
+        for number in range(1, 4):
+            volume = Volume()
+            volume.fromDict({"number": number, "title": f"Volume {number}"})
+            vm.volumes.append(volume)
+        self.server.wdSync.vm = vm
+        cursor = RecordPager.encode_cursor(1)
+        response = self.client.get("/volumes.json", params={"limit": 1, "fields": "number", "cursor": cursor})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([{"number": 2}], response.json())
+        for value in ["Vol-1", [1], {"number": 1}]:
+            cursor = RecordPager.encode_cursor(value)
+            for params in [{"limit": 1}, {"format": "ndjson"}]:
+                with self.subTest(value=value, params=params):
+                    response = self.client.get("/volumes.json", params={**params, "cursor": cursor})
+                    self.assertEqual(400, response.status_code)
+                    self.assertIn("invalid cursor", response.json()["detail"])
+
+    def test_dblp_paper(self):
+        """
+        test the dblp paper and paper authors routes
+        """
+        author = DblpScholar(dblp_author_id="https://dblp.org/pid/f/WolfgangFahl", label="Wolfgang Fahl")
+        papers = [
+            DblpPaper(
+                dblp_publication_id="conf/x/2020/p1",
+                dblp_proceeding_id="conf/x/2020",
+                volume_number=1,
+                title="P1",
+                authors=[author],
+                pdf_id="Vol-1/paper1",
+            ),
+            DblpPaper(
+                dblp_publication_id="conf/x/2020/p2",
+                dblp_proceeding_id="conf/x/2020",
+                volume_number=1,
+                title="P2",
+                authors=[],
+                pdf_id="Vol-1/paper2",
+            ),
+        ]
+        self.server.wdSync.dblpEndpoint = DblpEndpointStub([], papers)
+        response = self.client.get("/dblp/volume/1/paper/paper1")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("P1", response.json()["title"])
+        response = self.client.get("/dblp/volume/1/paper/paper1/author")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(["Wolfgang Fahl"], [author["label"] for author in response.json()])
+        response = self.client.get("/dblp/volume/1/paper/paper2/author")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([], response.json())
+        for path, detail in [
+            ("/dblp/volume/1/paper/paper3", "Paper not found"),
+            ("/dblp/volume/2/paper/paper1", "Volume not found"),
+            ("/dblp/volume/2/paper/paper1/author", "Volume not found"),
+        ]:
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                self.assertEqual(404, response.status_code)
+                self.assertEqual(detail, response.json()["detail"])
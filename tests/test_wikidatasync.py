@@ -613,6 +613,32 @@ class TestWikidataSync(Basetest):
                 event_ids = self.wdSync.getEventsOfProceedingsByVolnumber(test_param.volumenumber)
                 self.assertListEqual(test_param.expected_qids, event_ids)
 
+    @unittest.skipIf(Basetest.inPublicCI(), "queries unreliable wikidata endpoint")
+    def test_batched_lookups(self):
+        """
+        test that the batched lookups give the same results as the per volume lookups
+        """
+        volnumbers = [1, 2400, 3185, 3200, -1]
+        urns = ["urn:nbn:de:0074-3185-4", "urn:nbn:de:0074-3184-1", "urn:nbn:incorrectId"]
+        self.wdSync.batchSize = 2
+        qidsByVolnumber = self.wdSync.getWikidataIdsByVolumeNumbers(volnumbers)
+        eventsByVolnumber = self.wdSync.getEventsOfProceedingsByVolnumbers(volnumbers)
+        linkedByVolnumber = self.wdSync.checkIfProceedingsFromExistsForVolumes(volnumbers)
+        wdItemsByUrn = self.wdSync.getProceedingWdItemsByUrns(urns)
+        for volnumber in volnumbers:
+            with self.subTest(volnumber=volnumber):
+                self.assertEqual(self.wdSync.getWikidataIdByVolumeNumber(volnumber), qidsByVolnumber[volnumber])
+                self.assertListEqual(
+                    sorted(self.wdSync.getEventsOfProceedingsByVolnumber(volnumber)),
+                    sorted(eventsByVolnumber[volnumber]),
+                )
+                self.assertEqual(
+                    self.wdSync.checkIfProceedingsFromExists(volnumber, None), linkedByVolnumber[volnumber]
+                )
+        for urn in urns:
+            with self.subTest(urn=urn):
+                self.assertListEqual(sorted(self.wdSync.getProceedingWdItemsByUrn(urn)), sorted(wdItemsByUrn[urn]))
+
     @unittest.skip("Only for manually adding missing event homepages")
     def test_add_missing_event_homepages(self):
         parser = VolumeParser("http://ceur-ws.org", showHtml=False)
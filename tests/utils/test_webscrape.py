@@ -0,0 +1,103 @@
+"""
+Created on 2026-10-17
+
+@author: wf
+"""
+
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from ceurws.utils.webscrape import WebScrape
+from ceurws.volumeparser import VolumePageCache, VolumeParser
+from tests.basetest import Basetest
+
+
+class ConditionalHandler(BaseHTTPRequestHandler):
+    """
+    serve a fixed page with an ETag and answer conditional requests with 304
+    """
+
+    etag = '"v1"'
+    body = b"<html><head><title>Vol-1</title></head><body><h1>Test</h1></body></html>"
+    requests: list[dict] = []
+
+    def do_GET(self):
+        ConditionalHandler.requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", self.etag)
+        self.send_header("Last-Modified", "Sat, 17 Oct 2026 10:00:00 GMT")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestWebScrape(Basetest):
+    """
+    test conditional fetching
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        ConditionalHandler.requests = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ConditionalHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        Basetest.tearDown(self)
+
+    def test_conditional_fetch(self):
+        """
+        test that a fetch with the etag of a previous fetch gives a 304
+        """
+        scrape = WebScrape(timeout=5)
+        url = f"{self.base_url}/Vol-1/"
+        first = scrape.fetch(url)
+        self.assertEqual(200, first.status)
+        self.assertEqual('"v1"', first.etag)
+        self.assertIn("<h1>Test</h1>", first.html)
+        second = scrape.fetch(url, etag=first.etag, last_modified=first.last_modified)
+        self.assertTrue(second.not_modified)
+        self.assertIsNone(second.html)
+        self.assertEqual('"v1"', ConditionalHandler.requests[-1].get("If-None-Match"))
+
+    def test_revalidate_volume_page(self):
+        """
+        test that a recache of an unmodified volume page does not rewrite the cache
+        """
+        cache_location = VolumePageCache.cache_location
+        with tempfile.TemporaryDirectory() as tmpdir:
+            VolumePageCache.cache_location = Path(tmpdir)
+            try:
+                volume_parser = VolumeParser(timeout=5)
+                volume_parser.volumeUrl = lambda number: f"{self.base_url}/Vol-{number}/"
+                page, modified = volume_parser.revalidate_volume_page(1)
+                self.assertTrue(modified)
+                self.assertEqual('"v1"', VolumePageCache.get_meta(1)["etag"])
+                cache_file = Path(tmpdir) / "Vol-1.html"
+                mtime = cache_file.stat().st_mtime_ns
+                page2, modified2 = volume_parser.revalidate_volume_page(1)
+                self.assertFalse(modified2)
+                self.assertEqual(page, page2)
+                self.assertEqual(mtime, cache_file.stat().st_mtime_ns)
+                # get_volume_page with recache uses the conditional request as well
+                self.assertEqual(page, volume_parser.get_volume_page(1, recache=True))
+                self.assertEqual(3, len(ConditionalHandler.requests))
+                VolumePageCache.delete(1)
+                self.assertIsNone(VolumePageCache.get_meta(1))
+            finally:
+                VolumePageCache.cache_location = cache_location